@@ -1,90 +1,221 @@
 from datetime import datetime, timedelta
 import sys
-import subprocess
 import streamlit as st
+import plotly.express as px
+import pandas as pd
 import os
-from streamlit_autorefresh import st_autorefresh
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 st.set_page_config(page_title="Portfolio Analysis", layout="wide")
-st_autorefresh(interval=60000, key="refresh_time")
 
-import pytz
-
-# --- Time Zones ---
-sgt = pytz.timezone("Asia/Singapore")
-ny = pytz.timezone("America/New_York")
-now_sgt = datetime.now(sgt)
-now_ny = datetime.now(ny)
-
-date_today = now_sgt.strftime("%A, %d %B %Y")
-time_sgt = now_sgt.strftime("%H:%M")
-time_ny = now_ny.strftime("%H:%M")
+from dashboard.artifacts import BACKTEST_ARTIFACT, IC_ARTIFACT, artifact_version, load_artifact, save_backtest_artifact
+from dashboard.backtest import run_from_database
+from dashboard.ic import ic_from_database, ic_significance, save_ic_result
+from dashboard.jobs import CANCELLED, DONE, analysis_jobs, backtest_jobs
+from dashboard.refresh import data_version, session_cached
+from dashboard.ui import clock_header, end_page, plotly_chart, start_page, watch_for_changes
 
 # --- Date & Time Display ---
-st.markdown(
-    f"""
-    <div style="text-align: center; padding: 5px 0; font-size: 16px; color: #444;">
-        <b>{date_today}</b><br>
-        Singapore: {time_sgt} &nbsp;&nbsp;|&nbsp;&nbsp; New York: {time_ny}
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+clock_header(padding="5px", font_size="16px")
+run_started = start_page()
  
 
 st.title("Portfolio Analysis")
 
+# Use correct relative path
+backtest_chart_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backtest/backtest_results/backtest_chart.html")
+
+# Get IC comparison chart path
+ic_comparison_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backtest/interactive_comparison_ic_and_rank_ic.html")
+
+# Columnar artifacts written by the in-process engines; the HTML files above
+# are only shown while no artifact exists yet
+backtest_artifact_path = os.path.join(os.path.dirname(backtest_chart_path), BACKTEST_ARTIFACT)
+ic_artifact_path = os.path.join(os.path.dirname(backtest_chart_path), IC_ARTIFACT)
+
+
+def result_files_version():
+    return tuple(artifact_version(path) for path in (backtest_artifact_path, ic_artifact_path, backtest_chart_path, ic_comparison_path))
+
+
+# --- Backtest and IC jobs ---
+# Run on the shared background pools: identical in-flight runs are shared
+# between sessions and results are cached per data version and parameters.
+# The IC analysis is its own job on the analysis queue, so a slow bootstrap
+# neither holds a backtest worker nor delays the backtest results.
+BACKTEST_PARAMS = {"sentiment_column": "Positive", "cost_bps": 10.0}
+
+
+def backtest_job(progress, cancelled):
+    results = run_from_database(progress=progress, cancelled=cancelled, **BACKTEST_PARAMS)
+    save_backtest_artifact(results, backtest_artifact_path)
+    return pd.DataFrame({name: result.stats for name, result in results.items()})
+
+
+def ic_job(progress, cancelled):
+    ic_result = ic_from_database(
+        progress=lambda fraction, message: progress(0.8 * fraction, message), cancelled=cancelled
+    )
+    progress(0.8, "Bootstrapping IC confidence intervals")
+    save_ic_result(ic_result, ic_artifact_path, significance=ic_significance(ic_result))
+
+
+# (label, session key of the job id, runner)
+RESULT_JOBS = [("Backtest", "backtest_job_id", backtest_jobs), ("IC analysis", "ic_job_id", analysis_jobs)]
+
+
+def session_jobs():
+    return [(label, key, runner.get(st.session_state.get(key))) for label, key, runner in RESULT_JOBS]
+
+
+def backtest_progress():
+    for label, key, job in session_jobs():
+        if job is None:
+            continue
+        if not job.finished:
+            st.progress(job.progress, text=f"{label}: {job.message}")
+            if st.button("Cancel", key=f"cancel_{key}"):
+                job.cancel()
+            continue
+
+        if st.session_state.get(f"{key}_shown") != job.id:
+            st.session_state[f"{key}_shown"] = job.id
+            if job.status == DONE:
+                st.rerun()  # Reload page to display new results
+        if job.status == DONE:
+            st.success(f"{label} completed!")
+        elif job.status == CANCELLED:
+            st.warning(f"{label} cancelled.")
+        else:
+            st.error(f"{label} failed: {job.message}")
+
+
 # Add backtest button
 col1, col2 = st.columns([1, 5])
 with col1:
     if st.button("Run Latest Backtest", help="Click to run backtest analysis with latest data"):
-        st.info("Running backtest analysis, please wait...")
-        
-        # Get backtest script path
-        backtest_script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backtest/vector_backtest.py")
+        watermark = data_version()
+        job = backtest_jobs.submit(("backtest", tuple(sorted(BACKTEST_PARAMS.items()))), backtest_job, watermark=watermark)
+        st.session_state["backtest_job_id"] = job.id
+        job = analysis_jobs.submit(("ic analysis",), ic_job, watermark=watermark)
+        st.session_state["ic_job_id"] = job.id
+        st.rerun()
+
+with col2:
+    # Poll every second only while one of this session's jobs is still running
+    running = any(job is not None and not job.finished for _, _, job in session_jobs())
+    st.fragment(backtest_progress, run_every=1 if running else None)()
+
+
+# --- Result figures, built once per artifact version ---
+STRATEGY_COLORS = {"without_sentiment": "#9e9e9e", "with_sentiment": "#1a73e8"}
+
+
+def build_backtest_figures(daily_df: pd.DataFrame):
+    daily_df = daily_df.assign(Strategy=daily_df["Strategy"].astype(str).str.replace("_", " ").str.capitalize())
+    color_map = {name.replace("_", " ").capitalize(): color for name, color in STRATEGY_COLORS.items()}
+
+    fig_equity = px.line(daily_df, x="Date", y="equity", color="Strategy", template="simple_white", color_discrete_map=color_map)
+    fig_equity.update_layout(xaxis_title="Date", yaxis_title="Equity", legend_title="", height=500)
+
+    fig_drawdown = px.area(daily_df, x="Date", y="drawdown", color="Strategy", template="simple_white", color_discrete_map=color_map)
+    fig_drawdown.update_layout(xaxis_title="Date", yaxis_title="Drawdown", yaxis=dict(tickformat=".0%"), legend_title="", height=300)
+    return fig_equity, fig_drawdown
+
+
+def build_ic_figure(ic_df: pd.DataFrame):
+    ic_df = ic_df.sort_values("Date")
+    cumulative = ic_df.assign(
+        **{
+            "Cumulative IC": ic_df.groupby("Factor", observed=True)["IC"].cumsum(),
+            "Cumulative Rank IC": ic_df.groupby("Factor", observed=True)["Rank IC"].cumsum(),
+        }
+    ).melt(
+        id_vars=["Date", "Factor"],
+        value_vars=["Cumulative IC", "Cumulative Rank IC"],
+        var_name="Measure",
+        value_name="Value"
+    )
+    fig = px.line(cumulative, x="Date", y="Value", color="Factor", line_dash="Measure", template="simple_white")
+    fig.update_layout(xaxis_title="Date", yaxis_title="Cumulative value", legend_title="", height=600)
+    return fig
+
+
+# --- Backtest panel ---
+# A fragment that reruns only when the watcher sees a rewritten result file;
+# native charts from the artifact replace the multi-megabyte HTML embed
+@st.fragment
+def backtest_panel():
+    version = artifact_version(backtest_artifact_path)
+    if version is not None:
+        daily_df, metadata = load_artifact(backtest_artifact_path)
+        st.dataframe(pd.DataFrame(metadata["stats"]).round(4), use_container_width=False)
+        fig_equity, fig_drawdown = session_cached("backtest_figs", version, lambda: build_backtest_figures(daily_df))
+        plotly_chart(fig_equity, "equity curve", use_container_width=True)
+        plotly_chart(fig_drawdown, "drawdown", use_container_width=True)
+
+    # Check if file exists
+    elif os.path.exists(backtest_chart_path):
+        # Read HTML file content
+        with open(backtest_chart_path, "r", encoding="utf-8") as f:
+            html_content = f.read()
         
-        # Use subprocess to run backtest script
-        try:
-            # Use python interpreter to run script, ensuring the same environment
-            python_executable = sys.executable
-            subprocess.run([python_executable, backtest_script_path], check=True)
-            st.success("Backtest completed!")
-            st.rerun()  # Reload page to display new results
-        except subprocess.CalledProcessError as e:
-            st.error(f"Backtest failed: {str(e)}")
-        except Exception as e:
-            st.error(f"Error occurred: {str(e)}")
+        # Increase height and width to fully display the chart
+        st.components.v1.html(html_content, height=1400, width=1500, scrolling=True)
+    else:
+        st.error(f"Backtest result file doesn't exist. Please run backtest first. Path: {backtest_artifact_path}")
 
-# Use correct relative path
-backtest_chart_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backtest/backtest_results/backtest_chart.html")
 
-# Check if file exists
-if os.path.exists(backtest_chart_path):
-    # Read HTML file content
-    with open(backtest_chart_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
-    
-    # Increase height and width to fully display the chart
-    st.components.v1.html(html_content, height=1400, width=1500, scrolling=True)
-else:
-    st.error(f"Backtest result file doesn't exist. Please run backtest first. Path: {backtest_chart_path}")
+backtest_panel()
 
 
 # Add IC Comparison Chart
 st.markdown("---")
 st.subheader("Cumulative IC and Rank IC Comparison Analysis")
 
-# Get IC comparison chart path
-ic_comparison_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backtest/interactive_comparison_ic_and_rank_ic.html")
 
-# Check if file exists
-if os.path.exists(ic_comparison_path):
-    # Read HTML file content
-    with open(ic_comparison_path, "r", encoding="utf-8") as f:
-        ic_html_content = f.read()
-    
-    # Display IC comparison chart
-    st.components.v1.html(ic_html_content, height=1200, width=1200, scrolling=True)
-else:
-    st.warning(f"IC comparison chart file does not exist. Path: {ic_comparison_path}")
\ No newline at end of file
+@st.fragment
+def ic_panel():
+    version = artifact_version(ic_artifact_path)
+    if version is not None:
+        ic_df, metadata = load_artifact(ic_artifact_path)
+        fig = session_cached("ic_fig", version, lambda: build_ic_figure(ic_df))
+        plotly_chart(fig, "ic curve", use_container_width=True)
+        if metadata.get("summary"):
+            summary_df = pd.DataFrame(metadata["summary"])
+            st.markdown("**IC summary by horizon (trading days)**")
+            st.dataframe(
+                summary_df[["Factor", "Horizon", "Mean IC", "ICIR", "Mean Rank IC", "Rank ICIR", "IC Hit Rate", "IC t-stat"]],
+                use_container_width=True,
+                hide_index=True
+            )
+            if metadata.get("significance"):
+                st.markdown(f"**Mean {metadata.get('horizon', 1)}-day IC, 95% block-bootstrap interval**")
+                st.dataframe(
+                    pd.DataFrame(metadata["significance"])[["Factor", "estimate", "ci_low", "ci_high", "p_value", "n"]].rename(
+                        columns={"estimate": "Mean IC", "ci_low": "CI Low", "ci_high": "CI High", "p_value": "p-value", "n": "Days"}
+                    ),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            st.markdown("**IC decay: mean Rank IC by horizon**")
+            st.dataframe(summary_df.pivot(index="Factor", columns="Horizon", values="Mean Rank IC"), use_container_width=True)
+
+    # Check if file exists
+    elif os.path.exists(ic_comparison_path):
+        # Read HTML file content
+        with open(ic_comparison_path, "r", encoding="utf-8") as f:
+            ic_html_content = f.read()
+        
+        # Display IC comparison chart
+        st.components.v1.html(ic_html_content, height=1200, width=1200, scrolling=True)
+    else:
+        st.warning(f"IC comparison chart file does not exist. Path: {ic_artifact_path}")
+
+
+ic_panel()
+
+end_page("Main Portfolio Analysis", run_started)
+
+# --- Change watcher: reruns the page only when a result file is rewritten ---
+watch_for_changes("backtest_results", result_files_version)
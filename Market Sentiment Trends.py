@@ -2,57 +2,54 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import numpy as np
-import pytz
-from datetime import datetime, timedelta
-from streamlit_autorefresh import st_autorefresh
-from sqlalchemy import create_engine
+from datetime import timedelta
+
+from dashboard.alignment import previous_trading_date
+from dashboard.book import BOOK_HISTORY_DAYS, cached_book_sentiment
+from dashboard.downsample import RANGE_DAYS, load_downsampled_sentiment
+from dashboard.features import WINDOW, current_feature_store
+from dashboard.live import LIVE_TAIL, TAIL_POLL_SECONDS, live_tail, merge_live_points
+from dashboard.loaders import (
+    CALENDAR_LOOKBACK_DAYS,
+    PNN_COLUMNS,
+    PREFETCH_UNIVERSE,
+    SENTIMENT_COLUMNS,
+    TIMEFRAME_DAYS,
+    load_latest_trading_date,
+    load_positions,
+    load_tickers,
+    load_trading_calendar,
+    load_universe_page_sentiment,
+    select_ticker,
+    slice_dates,
+)
+from dashboard.refresh import data_version, session_cached
+from dashboard.ui import clock_header, end_page, plotly_chart, start_page, watch_for_changes
 
 # --- Page Config ---
 st.set_page_config(page_title="Market Sentiment Trends", layout="wide")
-st_autorefresh(interval=60000, key="refresh_time")
-
-# --- Time Zones ---
-sgt = pytz.timezone("Asia/Singapore")
-ny = pytz.timezone("America/New_York")
-now_sgt = datetime.now(sgt)
-now_ny = datetime.now(ny)
-date_today = now_sgt.strftime("%A, %d %B %Y")
-time_sgt = now_sgt.strftime("%H:%M")
-time_ny = now_ny.strftime("%H:%M")
 
 # --- Date & Time Display ---
-st.markdown(
-    f"""
-    <div style="text-align: center; padding: 10px 0; font-size: 18px; color: #444;">
-        <b>{date_today}</b><br>
-        Singapore: {time_sgt} &nbsp;&nbsp;|&nbsp;&nbsp; New York: {time_ny}
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+clock_header()
+run_started = start_page()
 
 st.title("Market Sentiment Trends")
 
 # Spacer
 st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
 
-# --- DB Connection ---
-host = "134.122.167.14"
-port = "5555"
-database = "QF5214"
-user = "postgres"
-password = "qf5214"
-
-db_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
-engine = create_engine(db_url)
-
 # --- Get latest available date and tickers (long + short) ---
+# Everything below is keyed on the change probe: a tick with no new data
+# reuses this session's frames and figures and only the clock is redrawn.
 try:
-    date_query = "SELECT MAX(\"Date\") AS latest_date FROM tradingstrategy.dailytrading"
-    latest_date_result = pd.read_sql(date_query, engine)
-    latest_trading_date = latest_date_result["latest_date"].iloc[0]
-    latest_trading_date = pd.to_datetime(latest_trading_date).date()
-    sentiment_date_obj = latest_trading_date - timedelta(days=1)
+    version = data_version()
+    latest_trading_date = session_cached("latest_trading_date", version, load_latest_trading_date)
+    # T-1 is the previous trading day, not the previous calendar day
+    trading_calendar = session_cached(
+        "trading_calendar", version,
+        lambda: load_trading_calendar(latest_trading_date - timedelta(days=CALENDAR_LOOKBACK_DAYS))
+    )
+    sentiment_date_obj = previous_trading_date(latest_trading_date, trading_calendar)
     sentiment_date_str = sentiment_date_obj.strftime('%Y/%m/%d')
 
     st.markdown(
@@ -64,13 +61,7 @@ try:
         unsafe_allow_html=True
     )
 
-    ticker_query = f"""
-        SELECT DISTINCT "Ticker", "Position_Type"
-        FROM tradingstrategy.dailytrading
-        WHERE "Date" = '{latest_trading_date}'
-        LIMIT 10
-    """
-    tickers_df = pd.read_sql(ticker_query, engine)
+    tickers_df = session_cached("tickers_df", (version, latest_trading_date), lambda: load_tickers(latest_trading_date))
     available_tickers = tickers_df["Ticker"].tolist()
     ticker_position_map = dict(zip(tickers_df["Ticker"], tickers_df["Position_Type"]))
 
@@ -87,41 +78,31 @@ except Exception as e:
     selected_company = None
     position_type = None
 
-# --- Combine sentiment data from multiple sources ---
-def load_combined_sentiment_data(company: str, start_date: str, end_date: str):
-    tables = ["nlp.sentiment_aggregated_data", "nlp.sentiment_aggregated_live", "nlp.sentiment_aggregated_newdate"]
-    combined_df = pd.DataFrame()
-
-    for table in tables:
-        query = f"""
-            SELECT "Date", "company", "Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust", "Positive", "Negative", "Neutral", "Intent Sentiment"
-            FROM {table}
-            WHERE ("company" = '{company}' OR "company" = '${company}')
-            AND "Date" >= '{start_date}' AND "Date" <= '{end_date}'
-        """
-        try:
-            df = pd.read_sql(query, engine)
-            combined_df = pd.concat([combined_df, df], ignore_index=True)
-        except Exception as e:
-            st.warning(f"Failed to fetch from {table}: {e}")
-
-    if not combined_df.empty:
-        combined_df.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
-        combined_df["Date"] = pd.to_datetime(combined_df["Date"], errors='coerce')
-        combined_df = combined_df.dropna(subset=["Date"])
-        return combined_df.sort_values("Date")
-    return pd.DataFrame()
-
-
 st.markdown(f"<h5 style='margin-top: 20px;'> Selected Company: {selected_company} ({position_type})</h5>", unsafe_allow_html=True)
 
+# --- Page-level sentiment: one 1M fetch per data version ---
+# With PREFETCH_UNIVERSE every held ticker is loaded up front, so switching
+# company or timeframe is an in-memory lookup.
+page_sentiment_df = pd.DataFrame()
+if selected_company:
+    fetch_tickers = tuple(dict.fromkeys(available_tickers)) if PREFETCH_UNIVERSE else (selected_company,)
+    try:
+        universe_sentiment_df = session_cached(
+            "universe_sentiment_df",
+            (version, fetch_tickers, sentiment_date_obj),
+            lambda: load_universe_page_sentiment(list(fetch_tickers), sentiment_date_obj),
+        )
+        page_sentiment_df = select_ticker(universe_sentiment_df, selected_company)
+    except Exception as e:
+        st.error(f"Error loading sentiment data: {e}")
+
 # --- Two Column Layout: Sentiment Table (Left) & Position Table (Right) ---
 col1, col2 = st.columns([1, 1])
 
 with col1:
     # Place your existing sentiment table and overall sentiment display here
     try:
-        latest_sentiment_df = load_combined_sentiment_data(selected_company, sentiment_date_str, sentiment_date_str)
+        latest_sentiment_df = slice_dates(page_sentiment_df, sentiment_date_obj, sentiment_date_obj)
         if not latest_sentiment_df.empty:
             overall_sentiment = latest_sentiment_df["Intent Sentiment"].iloc[0].capitalize()
             bg_color_map = {
@@ -155,7 +136,7 @@ with col1:
             sentiment_cols = ["Positive", "Negative", "Neutral", "Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust"]
             scores_df = scores_df[sentiment_cols].T.reset_index()
             scores_df.columns = ["Sentiment", "Score"]
-            scores_df["Score"] = pd.to_numeric(scores_df["Score"], errors="coerce").round(3)
+            scores_df["Score"] = scores_df["Score"].astype(float).round(3)
 
             st.dataframe(scores_df.set_index("Sentiment"), use_container_width=False)
         else:
@@ -163,16 +144,31 @@ with col1:
     except Exception as e:
         st.error(f"Error loading sentiment score table: {e}")
 
-with col2:
+    # Rolling features come precomputed from the shared feature store, which
+    # only applies new rows on a data change instead of rescanning history
+    try:
+        if selected_company:
+            feature_store = current_feature_store(version)
+            features_df = feature_store.features(selected_company)
+            if not features_df.empty:
+                st.markdown(
+                    f"<h4 style='margin-top: 10px; font-weight: 700;'>Rolling Features</h4>"
+                    f"<p style='color: #666; margin-top: -8px;'>As of {feature_store.as_of(selected_company)}, "
+                    f"{WINDOW}-day window</p>",
+                    unsafe_allow_html=True
+                )
+                st.dataframe(
+                    features_df[["EWMA", "Rolling Mean", "Z-Score", "Momentum"]].round(3),
+                    use_container_width=False
+                )
+    except Exception as e:
+        st.error(f"Error loading rolling features: {e}")
+
+@st.fragment
+def holdings_table(version, latest_trading_date):
     try:
         # Display today’s long/short position breakdown
-        position_query = f"""
-            SELECT "Ticker", "Position_Type"
-            FROM tradingstrategy.dailytrading
-            WHERE "Date" = '{latest_trading_date}'
-            ORDER BY "Position_Type", "Ticker"
-        """
-        position_df = pd.read_sql(position_query, engine)
+        position_df = session_cached("position_df", (version, latest_trading_date), lambda: load_positions(latest_trading_date))
 
         if not position_df.empty:
             st.markdown("<h4 style='margin-top: 10px; font-weight: 700;'>Today's Holdings</h4>", unsafe_allow_html=True)
@@ -190,36 +186,166 @@ with col2:
         st.error(f"Error loading position summary: {e}")
 
 
+with col2:
+    try:
+        holdings_table(version, latest_trading_date)
+    except Exception as e:
+        st.error(f"Error loading position summary: {e}")
+
+
+
+
+# --- Book-level sentiment ---
+def build_book_figure(book_df: pd.DataFrame, column: str):
+    fig = px.line(
+        book_df,
+        x="Date", y=column, color="Book",
+        template="simple_white",
+        color_discrete_map={"Long": "#96C38D", "Short": "#e57373", "Net": "#555555"}
+    )
+    fig.add_hline(y=0, line_dash="dot", line_color="#bbbbbb")
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title=f"Position-weighted {column}",
+        yaxis=dict(tickformat=".2f"),
+        legend_title="",
+        height=380
+    )
+    return fig
 
 
-# --- Load PNN sentiment data ---
-def load_combined_pnn_data(company: str, start_date: str, end_date: str):
-    tables = ["nlp.sentiment_aggregated_data", "nlp.sentiment_aggregated_live", "nlp.sentiment_aggregated_newdate"]
-    combined_df = pd.DataFrame()
+@st.fragment
+def book_sentiment_panel(version, latest_trading_date):
+    try:
+        st.markdown(
+            "<h4 style='margin-top: 40px; font-weight: 700; margin-bottom: 5px;'>Book Sentiment</h4>"
+            "<p style='color: #666; margin-top: 0;'>Position-weighted T-1 sentiment of the long, short and net books</p>",
+            unsafe_allow_html=True
+        )
+        start_date = latest_trading_date - timedelta(days=BOOK_HISTORY_DAYS)
+        # One holdings fetch and one sentiment fetch, shared by every session
+        book_df = cached_book_sentiment(start_date, version)
+        if book_df.empty:
+            st.info("No holdings history available.")
+            return
+
+        column = st.selectbox("Sentiment", SENTIMENT_COLUMNS, index=SENTIMENT_COLUMNS.index("Positive"), key="book_column")
+        fig = session_cached("book_fig", (version, column), lambda: build_book_figure(book_df, column))
+        plotly_chart(fig, "book sentiment", use_container_width=True)
+
+        latest_df = book_df[book_df["Date"] == book_df["Date"].max()].set_index("Book")
+        st.dataframe(latest_df[SENTIMENT_COLUMNS + ["Positions"]].round(3), use_container_width=True)
+    except Exception as e:
+        st.error(f"Error loading book sentiment: {e}")
+
+
+if selected_company:
+    book_sentiment_panel(version, latest_trading_date)
+
+
+# --- Trend figure builders ---
+def build_emotion_figure(timeframe_df: pd.DataFrame, markers: bool = True):
+    history_df = timeframe_df.copy()
+    sentiment_cols = ["Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust"]
+    for col in sentiment_cols:
+        history_df[col] = history_df[col].astype(float).round(3)
+
+    history_df = history_df.dropna(subset=sentiment_cols, how="all")
+
+    clean_df = history_df.melt(
+        id_vars="Date",
+        value_vars=sentiment_cols,
+        var_name="Sentiment",
+        value_name="Score"
+    ).dropna(subset=["Score"])
+
+    max_score = clean_df["Score"].max()
+
+    fig = px.line(
+        clean_df,
+        x="Date", y="Score", color="Sentiment",
+        markers=markers,
+        template="simple_white",
+        color_discrete_map={
+            "Surprise": "#FFDAB9",
+            "Joy": "#AEC6CF",
+            "Anger": "#F4C2C2",
+            "Fear": "#D8BFD8",
+            "Sadness": "#FFE4E1",
+            "Disgust": "#BFD8B8"
+        }
+    )
+
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Sentiment Score",
+        yaxis=dict(tickformat=".2f", range=[0, max_score + 0.05]),
+        legend_title="",
+        height=420
+    )
+    return fig
+
+
+def build_pnn_figure(timeframe_df: pd.DataFrame, markers: bool = True):
+    pnn_df = timeframe_df[["Date", "company"] + PNN_COLUMNS].copy()
+    if pnn_df.empty:
+        return None
+
+    for col in ["Positive", "Negative", "Neutral"]:
+        pnn_df[col] = pnn_df[col].astype(float).round(3)
+    pnn_df = pnn_df.dropna(subset=["Positive", "Negative", "Neutral"], how="all")
+
+    clean_pnn_df = pnn_df.melt(
+        id_vars="Date",
+        value_vars=["Positive", "Negative", "Neutral"],
+        var_name="Sentiment",
+        value_name="Score"
+    ).dropna(subset=["Score"])
+
+    fig_pnn = px.line(
+        clean_pnn_df,
+        x="Date", y="Score", color="Sentiment",
+        markers=markers,
+        template="simple_white",
+        color_discrete_map={
+            "Positive": "#96C38D",
+            "Negative": "#e57373",
+            "Neutral": "#ffdd57"
+        }
+    )
+    fig_pnn.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Sentiment Score",
+        yaxis=dict(tickformat=".2f", range=[0, clean_pnn_df["Score"].max() + 0.05]),
+        legend_title="",
+        height=420
+    )
+    return fig_pnn
+
 
-    for table in tables:
-        query = f"""
-            SELECT "Date", "company", "Positive", "Negative", "Neutral"
-            FROM {table}
-            WHERE ("company" = '{company}' OR "company" = '${company}')
-            AND "Date" >= '{start_date}' AND "Date" <= '{end_date}'
-        """
-        try:
-            df = pd.read_sql(query, engine)
-            combined_df = pd.concat([combined_df, df], ignore_index=True)
-        except Exception as e:
-            st.warning(f"Failed to fetch from {table}: {e}")
+def live_sentiment(selected_company, sentiment_date_obj, page_sentiment_df):
+    """The page frame plus this session's live-tail points past T-1, and the last sequence seen."""
+    tail = live_tail()
+    tail.poll()
+    seen = st.session_state.setdefault("live_points", {})
+    seq, live_df = seen.get(selected_company, (0, None))
+    new_points, seq = tail.points(selected_company, after=seq)
+    if not new_points.empty:
+        live_df = new_points if live_df is None else pd.concat([live_df, new_points], ignore_index=True)
+        live_df = live_df.drop_duplicates(subset=["Date"], keep="last")
+        seen[selected_company] = (seq, live_df)
+    if live_df is None:
+        return page_sentiment_df, seq
+    return merge_live_points(page_sentiment_df, live_df, sentiment_date_obj), seq
 
-    if not combined_df.empty:
-        combined_df.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
-        combined_df["Date"] = pd.to_datetime(combined_df["Date"], errors='coerce')
-        combined_df = combined_df.dropna(subset=["Date"])
-        return combined_df.sort_values("Date")
-    return pd.DataFrame()
 
 # --- Timeframe Toggle & Dynamic Sentiment Trend Chart ---
-try:
-    if selected_company and position_type:
+# A fragment, so flipping the timeframe radio reruns only the charts. In live
+# tail mode it also reruns every few seconds; figures are rebuilt only when
+# the tail has new points for this company
+@st.fragment(run_every=TAIL_POLL_SECONDS if LIVE_TAIL else None)
+def sentiment_trend_charts(version, selected_company, sentiment_date_obj, page_sentiment_df):
+    try:
         st.markdown(
             f"<h4 style='margin-top: 40px; font-weight: 700; margin-bottom: 5px;'>Sentiment Trend Visualization</h4>",
             unsafe_allow_html=True
@@ -228,96 +354,55 @@ try:
         with st.container():
             timeframe = st.radio(
                 "",
-                ["1W", "1M"],
+                list(TIMEFRAME_DAYS) + list(RANGE_DAYS),
                 index=1,
                 horizontal=True,
                 label_visibility="collapsed"
             )
 
-        days_back = 5 if timeframe == "1W" else 30
-        start_date = (sentiment_date_obj - timedelta(days=days_back)).strftime('%Y/%m/%d')
-        end_date = sentiment_date_str
-
-        history_df = load_combined_sentiment_data(selected_company, start_date, end_date)
-
-        if not history_df.empty:
-            sentiment_cols = ["Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust"]
-            for col in sentiment_cols:
-                history_df[col] = pd.to_numeric(history_df[col], errors="coerce").round(3)
-
-            history_df = history_df.dropna(subset=sentiment_cols, how="all")
-
-            clean_df = history_df.melt(
-                id_vars="Date",
-                value_vars=sentiment_cols,
-                var_name="Sentiment",
-                value_name="Score"
-            ).dropna(subset=["Score"])
-
-            max_score = clean_df["Score"].max()
-
-            fig = px.line(
-                clean_df,
-                x="Date", y="Score", color="Sentiment",
-                markers=True,
-                template="simple_white",
-                color_discrete_map={
-                    "Surprise": "#FFDAB9",
-                    "Joy": "#AEC6CF",
-                    "Anger": "#F4C2C2",
-                    "Fear": "#D8BFD8",
-                    "Sadness": "#FFE4E1",
-                    "Disgust": "#BFD8B8"
-                }
-            )
-
-            fig.update_layout(
-                xaxis_title="Date",
-                yaxis_title="Sentiment Score",
-                yaxis=dict(tickformat=".2f", range=[0, max_score + 0.05]),
-                legend_title="",
-                height=420
+        live_seq = None
+        daily = timeframe in TIMEFRAME_DAYS
+        if daily:
+            end_date = sentiment_date_obj
+            if LIVE_TAIL:
+                page_sentiment_df, live_seq = live_sentiment(selected_company, sentiment_date_obj, page_sentiment_df)
+                if not page_sentiment_df.empty:
+                    end_date = max(end_date, page_sentiment_df["Date"].max().date())
+
+            start_date = sentiment_date_obj - timedelta(days=TIMEFRAME_DAYS[timeframe])
+            timeframe_df = slice_dates(page_sentiment_df, start_date, end_date)
+        else:
+            # Long ranges are bucketed in the data layer, so the number of
+            # points sent to the browser is bounded however long the range is
+            timeframe_df = session_cached(
+                "trend_history",
+                (version, selected_company, sentiment_date_obj, timeframe),
+                lambda: load_downsampled_sentiment(selected_company, sentiment_date_obj, RANGE_DAYS[timeframe]),
             )
 
-            st.plotly_chart(fig, use_container_width=True)
+        if not timeframe_df.empty:
+            # Figures are rebuilt only when the data, company, timeframe or live tail changes
+            chart_key = (version, selected_company, sentiment_date_obj, timeframe, live_seq)
+            fig = session_cached("emotion_fig", chart_key, lambda: build_emotion_figure(timeframe_df, markers=daily))
+            plotly_chart(fig, "sentiment trend", use_container_width=True)
 
             # --- Add PNN Chart Below ---
-            pnn_df = load_combined_pnn_data(selected_company, start_date, end_date)
-            if not pnn_df.empty:
-                for col in ["Positive", "Negative", "Neutral"]:
-                    pnn_df[col] = pd.to_numeric(pnn_df[col], errors="coerce").round(3)
-                pnn_df = pnn_df.dropna(subset=["Positive", "Negative", "Neutral"], how="all")
-
-                clean_pnn_df = pnn_df.melt(
-                    id_vars="Date",
-                    value_vars=["Positive", "Negative", "Neutral"],
-                    var_name="Sentiment",
-                    value_name="Score"
-                ).dropna(subset=["Score"])
-
-                fig_pnn = px.line(
-                    clean_pnn_df,
-                    x="Date", y="Score", color="Sentiment",
-                    markers=True,
-                    template="simple_white",
-                    color_discrete_map={
-                        "Positive": "#96C38D",
-                        "Negative": "#e57373",
-                        "Neutral": "#ffdd57"
-                    }
-                )
-                fig_pnn.update_layout(
-                    xaxis_title="Date",
-                    yaxis_title="Sentiment Score",
-                    yaxis=dict(tickformat=".2f", range=[0, clean_pnn_df["Score"].max() + 0.05]),
-                    legend_title="",
-                    height=420
-                )
-                st.plotly_chart(fig_pnn, use_container_width=True)
+            fig_pnn = session_cached("pnn_fig", chart_key, lambda: build_pnn_figure(timeframe_df, markers=daily))
+            if fig_pnn is not None:
+                plotly_chart(fig_pnn, "pnn trend", use_container_width=True)
             else:
                 st.info("No PNN sentiment data available for this timeframe.")
         else:
             st.info("No sentiment data available for this timeframe.")
 
-except Exception as e:
-    st.error(f"Error loading sentiment chart: {e}")
\ No newline at end of file
+    except Exception as e:
+        st.error(f"Error loading sentiment chart: {e}")
+
+
+if selected_company and position_type:
+    sentiment_trend_charts(version, selected_company, sentiment_date_obj, page_sentiment_df)
+
+end_page("Market Sentiment Trends", run_started)
+
+# --- Change watcher: reruns the page only when the probe sees new data ---
+watch_for_changes("data", data_version)
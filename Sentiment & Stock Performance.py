@@ -1,58 +1,55 @@
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-import pytz
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from streamlit_autorefresh import st_autorefresh
+from datetime import timedelta
+
+from dashboard.alignment import align_returns, previous_trading_date
+from dashboard.downsample import density_grid
+from dashboard.events import DEFAULT_POST, DEFAULT_PRE, DEFAULT_THRESHOLDS, cached_event_panels, run_event_study
+from dashboard.jobs import DONE, JobCancelled, analysis_jobs
+from dashboard.leadlag import DEFAULT_MAX_LAG, DEFAULT_WINDOW, align_daily, lead_lag
+from dashboard.loaders import (
+    CALENDAR_LOOKBACK_DAYS,
+    PREFETCH_UNIVERSE,
+    load_latest_trading_date,
+    load_tickers,
+    load_trading_calendar,
+    load_universe_prices_last_year,
+    load_universe_sentiment_last_year,
+    select_ticker,
+)
+from dashboard.refresh import data_version, session_cached
+from dashboard.resampling import DEFAULT_RESAMPLES, cached_test, slope_test
+from dashboard.ui import clock_header, end_page, plotly_chart, start_page, watch_for_changes
+from dashboard.universe import cached_universe, next_day_returns, universe_correlation_intervals
 
 # --- Page Config ---
 st.set_page_config(page_title="Sentiment & Stock Performance", layout="wide")
-st_autorefresh(interval=60000, key="refresh_time")
-
-# --- Time Zones ---
-sgt = pytz.timezone("Asia/Singapore")
-ny = pytz.timezone("America/New_York")
-now_sgt = datetime.now(sgt)
-now_ny = datetime.now(ny)
-date_today = now_sgt.strftime("%A, %d %B %Y")
-time_sgt = now_sgt.strftime("%H:%M")
-time_ny = now_ny.strftime("%H:%M")
 
 # --- Date & Time Display ---
-st.markdown(
-    f"""
-    <div style="text-align: center; padding: 10px 0; font-size: 18px; color: #444;">
-        <b>{date_today}</b><br>
-        Singapore: {time_sgt} &nbsp;&nbsp;|&nbsp;&nbsp; New York: {time_ny}
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+clock_header()
+run_started = start_page()
 
 st.title("Sentiment & Stock Performance")
 
 # Spacer
 st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
 
-# --- DB Connection ---
-host = "134.122.167.14"
-port = "5555"
-database = "QF5214"
-user = "postgres"
-password = "qf5214"
-
-db_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
-engine = create_engine(db_url)
-
 # --- Get latest available date and tickers (long + short) ---
+# Everything below is keyed on the change probe: a tick with no new data
+# reuses this session's frames and figure and only the clock is redrawn.
 try:
-    date_query = "SELECT MAX(\"Date\") AS latest_date FROM tradingstrategy.dailytrading"
-    latest_date_result = pd.read_sql(date_query, engine)
-    latest_trading_date = latest_date_result["latest_date"].iloc[0]
-    latest_trading_date = pd.to_datetime(latest_trading_date).date()
-    sentiment_date_obj = latest_trading_date - timedelta(days=1)
+    version = data_version()
+    latest_trading_date = session_cached("latest_trading_date", version, load_latest_trading_date)
+    # T-1 is the previous trading day, not the previous calendar day
+    trading_calendar = session_cached(
+        "trading_calendar", version,
+        lambda: load_trading_calendar(latest_trading_date - timedelta(days=CALENDAR_LOOKBACK_DAYS))
+    )
+    sentiment_date_obj = previous_trading_date(latest_trading_date, trading_calendar)
     sentiment_date_str = sentiment_date_obj.strftime('%Y/%m/%d')
 
     st.markdown(
@@ -64,13 +61,7 @@ try:
         unsafe_allow_html=True
     )
 
-    ticker_query = f"""
-        SELECT DISTINCT "Ticker", "Position_Type"
-        FROM tradingstrategy.dailytrading
-        WHERE "Date" = '{latest_trading_date}'
-        LIMIT 10
-    """
-    tickers_df = pd.read_sql(ticker_query, engine)
+    tickers_df = session_cached("tickers_df", (version, latest_trading_date), lambda: load_tickers(latest_trading_date))
     available_tickers = tickers_df["Ticker"].tolist()
     ticker_position_map = dict(zip(tickers_df["Ticker"], tickers_df["Position_Type"]))
 
@@ -87,96 +78,29 @@ except Exception as e:
     selected_company = None
     position_type = None
 
-# --- Combine sentiment data from multiple sources ---
-def load_combined_sentiment_data(company: str, start_date: str, end_date: str):
-    tables = ["nlp.sentiment_aggregated_data", "nlp.sentiment_aggregated_live", "nlp.sentiment_aggregated_newdate"]
-    combined_df = pd.DataFrame()
-
-    for table in tables:
-        query = f"""
-            SELECT "Date", "company", "Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust", "Positive", "Negative", "Neutral", "Intent Sentiment"
-            FROM {table}
-            WHERE ("company" = '{company}' OR "company" = '${company}')
-            AND "Date" >= '{start_date}' AND "Date" <= '{end_date}'
-        """
-        try:
-            df = pd.read_sql(query, engine)
-            combined_df = pd.concat([combined_df, df], ignore_index=True)
-        except Exception as e:
-            st.warning(f"Failed to fetch from {table}: {e}")
-
-    if not combined_df.empty:
-        combined_df.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
-        combined_df["Date"] = pd.to_datetime(combined_df["Date"], errors='coerce')
-        combined_df = combined_df.dropna(subset=["Date"])
-        return combined_df.sort_values("Date")
-    return pd.DataFrame()
-
-
 st.markdown(f"<h5 style='margin-top: 20px;'> Selected Company: {selected_company} ({position_type})</h5>", unsafe_allow_html=True)
 
 
-# --- Sentiment vs Return Scatter Plot (1 Year) ---
-try:
-    st.markdown(
-        f"<h4 style='margin-top: 40px;font-weight: 700;'>Sentiment Score vs. Daily Return</h4>",
-        unsafe_allow_html=True
-    )
+SCATTER_SENTIMENTS = ["Positive", "Negative", "Neutral"]
 
-    st.markdown(
-        "<p style='font-size: 18px; color: #666; margin-top: -12px;'>Data Range: 1 Year</p>",
-        unsafe_allow_html=True
-    )
 
+def merge_returns(sentiment_data: pd.DataFrame, stock_df: pd.DataFrame) -> pd.DataFrame:
+    # Returns come from the full price series; weekend sentiment is folded
+    # into the next trading day instead of being dropped by an inner merge
+    return align_returns(sentiment_data, stock_df, SCATTER_SENTIMENTS)
 
-    sentiment_sources = [
-        "nlp.sentiment_aggregated_data",
-        "nlp.sentiment_aggregated_live",
-        "nlp.sentiment_aggregated_newdate"
-    ]
-
-    sentiment_data = pd.DataFrame()
-    for source in sentiment_sources:
-        query = f"""
-            SELECT s."Date", s."company", s."Positive", s."Negative", s."Neutral"
-            FROM {source} s
-            WHERE (s."company" = '{selected_company}' OR s."company" = '${selected_company}')
-            AND s."Date"::date >= CURRENT_DATE - INTERVAL '1 year'
-        """
-        try:
-            df = pd.read_sql(query, engine)
-            sentiment_data = pd.concat([sentiment_data, df], ignore_index=True)
-        except:
-            pass
-
-    sentiment_data.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
-    sentiment_data["Date"] = pd.to_datetime(sentiment_data["Date"], errors="coerce")
-    sentiment_data = sentiment_data.dropna(subset=["Date"])
-
-    stock_query = f"""
-        SELECT "Date", "Ticker", "Close"
-        FROM datacollection.stock_data
-        WHERE "Ticker" = '{selected_company}'
-        AND "Date" >= CURRENT_DATE - INTERVAL '1 year'
-    """
-    stock_df = pd.read_sql(stock_query, engine)
-    stock_df["Date"] = pd.to_datetime(stock_df["Date"], errors="coerce")
-
-    # Merge on Date
-    merged_df = pd.merge(sentiment_data, stock_df, left_on="Date", right_on="Date")
-    merged_df.sort_values("Date", inplace=True)
-    merged_df["Close"] = pd.to_numeric(merged_df["Close"], errors="coerce")
-    merged_df["Return"] = merged_df["Close"].pct_change().round(3)
 
+# --- Scatter figure builder ---
+def build_scatter_figure(merged_df: pd.DataFrame):
     # Melt for plotting
     melted_df = merged_df.melt(
         id_vars=["Date", "Return"],
-        value_vars=["Positive", "Negative", "Neutral"],
+        value_vars=SCATTER_SENTIMENTS,
         var_name="Sentiment",
         value_name="Score"
     ).dropna()
 
-    melted_df["Score"] = pd.to_numeric(melted_df["Score"], errors="coerce").round(3)
+    melted_df["Score"] = melted_df["Score"].astype(float).round(3)
     melted_df = melted_df.dropna(subset=["Score", "Return"])
 
     fig = px.scatter(
@@ -185,6 +109,7 @@ try:
         y="Return",
         color="Sentiment",
         opacity=0.6,
+        render_mode="webgl",
         template="simple_white",
         color_discrete_map={
             "Positive": "#96C38D",
@@ -200,11 +125,397 @@ try:
         legend_title=""
     )
     fig.add_hline(y=0, line_dash="dot", line_color="gray")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+# Density mode: the cloud is binned server-side, so the figure is a fixed
+# bins x bins grid per sentiment however many points go into it
+SCATTER_MODES = ["Points (WebGL)", "Density"]
+
+
+def build_density_figure(pairs: dict, x_title: str = "Sentiment Score", y_title: str = "Daily Return"):
+    """One binned heatmap per `name -> (scores, returns)` pair, side by side."""
+    fig = make_subplots(rows=1, cols=len(pairs), shared_yaxes=True, subplot_titles=list(pairs), horizontal_spacing=0.03)
+    for i, (name, (x, y)) in enumerate(pairs.items(), start=1):
+        counts, x_centers, y_centers = density_grid(x, y)
+        fig.add_trace(
+            go.Heatmap(
+                z=counts.T,
+                x=x_centers,
+                y=y_centers,
+                colorscale="Blues",
+                showscale=i == len(pairs),
+                colorbar_title="Days",
+                hovertemplate="Score %{x:.2f}<br>Return %{y:.2%}<br>%{z:.0f} days<extra></extra>",
+            ),
+            row=1, col=i,
+        )
+        fig.update_xaxes(title_text=x_title, row=1, col=i)
+    fig.update_yaxes(title_text=y_title, tickformat=".1%", row=1, col=1)
+    fig.update_layout(template="simple_white", height=500)
+    return fig
+
+
+def build_returns_figure(merged_df: pd.DataFrame, mode: str):
+    if mode == "Density":
+        return build_density_figure({col: (merged_df[col].to_numpy(dtype=float), merged_df["Return"].to_numpy(dtype=float)) for col in SCATTER_SENTIMENTS})
+    return build_scatter_figure(merged_df)
+
+
+# --- Slope significance, resampled on the background analysis pool ---
+def slope_job(merged_df: pd.DataFrame, company: str, version):
+    def run(progress, cancelled):
+        rows = {}
+        for i, sentiment in enumerate(SCATTER_SENTIMENTS):
+            if cancelled():
+                raise JobCancelled()
+            progress(i / len(SCATTER_SENTIMENTS), f"Resampling {sentiment}")
+            x = merged_df[sentiment].to_numpy(dtype=float)
+            rows[sentiment] = cached_test(
+                "slope", sentiment, company, "1Y", version,
+                lambda **settings: slope_test(x, merged_df["Return"].to_numpy(), **settings),
+                n_resamples=DEFAULT_RESAMPLES, seed=0
+            )
+        return pd.DataFrame.from_dict(rows, orient="index")
+    return run
+
+
+def slope_significance(job_id: int, polling: bool):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return
+    if not job.finished:
+        st.progress(job.progress, text=f"Significance test: {job.message}")
+        return
+    if polling:
+        st.rerun()  # Stop polling once the result is in
+    if job.status == DONE:
+        st.markdown("**Slope of daily return on sentiment score (95% block-bootstrap interval, permutation p-value)**")
+        st.dataframe(
+            job.result[["estimate", "ci_low", "ci_high", "p_value", "n"]].rename(
+                columns={"estimate": "Slope", "ci_low": "CI Low", "ci_high": "CI High", "p_value": "p-value", "n": "Days"}
+            ).round(4),
+            use_container_width=True
+        )
+    else:
+        st.warning(f"Significance test did not complete: {job.message}")
+
+
+# --- Sentiment vs Return Scatter Plot (1 Year) ---
+try:
+    st.markdown(
+        f"<h4 style='margin-top: 40px;font-weight: 700;'>Sentiment Score vs. Daily Return</h4>",
+        unsafe_allow_html=True
+    )
+
+    st.markdown(
+        "<p style='font-size: 18px; color: #666; margin-top: -12px;'>Data Range: 1 Year</p>",
+        unsafe_allow_html=True
+    )
+
+
+    # One batched fetch per data version covers every held ticker; switching
+    # company only re-slices the frames kept in session state
+    fetch_tickers = tuple(dict.fromkeys(available_tickers)) if PREFETCH_UNIVERSE else (selected_company,)
+    universe_key = (version, fetch_tickers)
+    universe_sentiment = session_cached(
+        "universe_year_sentiment", universe_key, lambda: load_universe_sentiment_last_year(list(fetch_tickers))
+    )
+    universe_prices = session_cached(
+        "universe_year_prices", universe_key, lambda: load_universe_prices_last_year(list(fetch_tickers))
+    )
+
+    company_key = (version, fetch_tickers, selected_company)
+    merged_df = session_cached(
+        "merged_returns",
+        company_key,
+        lambda: merge_returns(
+            select_ticker(universe_sentiment, selected_company), select_ticker(universe_prices, selected_company)
+        ),
+    )
+    scatter_mode = st.radio("Rendering", SCATTER_MODES, horizontal=True, key="scatter_mode")
+    fig = session_cached("scatter_fig", company_key + (scatter_mode,), lambda: build_returns_figure(merged_df, scatter_mode))
+    plotly_chart(fig, "sentiment vs returns", use_container_width=True)
+
+    # Submitting is cheap: a finished result for this company and data
+    # version comes straight from the job cache, a running one is shared
+    slope = analysis_jobs.submit(("slope", selected_company, "1Y"), slope_job(merged_df, selected_company, version), watermark=version)
+    st.fragment(slope_significance, run_every=None if slope.finished else 1)(slope.id, not slope.finished)
 
 except Exception as e:
     st.error(f"Error loading sentiment-return relationship: {e}")
 
+# --- Lead-lag: does sentiment lead or follow returns? ---
+def build_lead_lag_figures(daily_df: pd.DataFrame, factor: str, max_lag: int, window: int):
+    rolling, overall = lead_lag(daily_df[factor], daily_df["Return"], range(-max_lag, max_lag + 1), window)
+
+    bar_df = overall.reset_index()
+    bar_df["Direction"] = np.where(bar_df["Lag"] > 0, "Sentiment leads", np.where(bar_df["Lag"] < 0, "Sentiment follows", "Same day"))
+    fig_bar = px.bar(
+        bar_df,
+        x="Lag",
+        y="Correlation",
+        color="Direction",
+        template="simple_white",
+        color_discrete_map={"Sentiment leads": "#1a73e8", "Sentiment follows": "#9e9e9e", "Same day": "#ffdd57"}
+    )
+    fig_bar.update_layout(xaxis_title="Lag (trading days, return after sentiment)", yaxis_title="Correlation", legend_title="", height=350)
+    fig_bar.add_hline(y=0, line_dash="dot", line_color="gray")
+
+    fig_heat = px.imshow(
+        rolling.T,
+        color_continuous_scale="RdBu",
+        zmin=-1,
+        zmax=1,
+        aspect="auto",
+        template="simple_white"
+    )
+    fig_heat.update_layout(xaxis_title="Date", yaxis_title="Lag", coloraxis_colorbar_title="Corr", height=400)
+    return fig_bar, fig_heat
+
+
+@st.fragment
+def lead_lag_section(version, company: str, sentiment_df: pd.DataFrame, stock_df: pd.DataFrame):
+    st.markdown(
+        "<h4 style='margin-top: 40px;font-weight: 700;'>Lead-Lag: Sentiment vs. Return</h4>",
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        "<p style='font-size: 18px; color: #666; margin-top: -12px;'>Positive lag: sentiment on day t against the return k trading days later</p>",
+        unsafe_allow_html=True
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        factor = st.selectbox("Sentiment", SCATTER_SENTIMENTS, key="leadlag_factor")
+    with col2:
+        max_lag = st.slider("Max lag (days)", 1, 10, DEFAULT_MAX_LAG, key="leadlag_max_lag")
+    with col3:
+        window = st.slider("Rolling window (days)", 20, 120, DEFAULT_WINDOW, step=5, key="leadlag_window")
+
+    daily_df = session_cached("leadlag_daily", (version, company), lambda: align_daily(sentiment_df, stock_df, SCATTER_SENTIMENTS))
+    fig_bar, fig_heat = session_cached(
+        "leadlag_figs", (version, company, factor, max_lag, window), lambda: build_lead_lag_figures(daily_df, factor, max_lag, window)
+    )
+    plotly_chart(fig_bar, "correlation bars", use_container_width=True)
+    plotly_chart(fig_heat, "correlation heatmap", use_container_width=True)
+
+
+if selected_company is not None:
+    try:
+        lead_lag_section(
+            version, selected_company,
+            select_ticker(universe_sentiment, selected_company), select_ticker(universe_prices, selected_company)
+        )
+    except Exception as e:
+        st.error(f"Error loading lead-lag analysis: {e}")
+
+
+# --- Universe mode: every ticker x sentiment factor in one pass ---
+HEATMAP_METRICS = ["Correlation", "Rank Correlation", "t-stat"]
+
+
+def build_heatmap_figure(stats_df: pd.DataFrame, metric: str, top_n: int):
+    pivot = stats_df.pivot(index="Ticker", columns="Factor", values=metric)
+    # Strongest relationships first; the full universe stays in the table below
+    strength = pivot.abs().max(axis=1).sort_values(ascending=False)
+    pivot = pivot.loc[strength.index[:top_n]]
+    fig = px.imshow(
+        pivot,
+        color_continuous_scale="RdBu",
+        color_continuous_midpoint=0,
+        aspect="auto",
+        template="simple_white"
+    )
+    fig.update_layout(
+        xaxis_title="",
+        yaxis_title="",
+        coloraxis_colorbar_title=metric,
+        height=max(400, 18 * len(pivot))
+    )
+    return fig
+
+
+def universe_intervals(job_id: int, polling: bool):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return
+    if not job.finished:
+        st.progress(job.progress, text=f"Bootstrap intervals: {job.message}")
+        return
+    if polling:
+        st.rerun()  # Stop polling and merge the intervals into the table
+    if job.status != DONE:
+        st.warning(f"Bootstrap intervals did not complete: {job.message}")
+
+
+@st.fragment
+def universe_panel(version, start_date):
+    st.markdown(
+        "<h4 style='margin-top: 40px;font-weight: 700;'>Universe: Sentiment vs. Next-Day Return</h4>",
+        unsafe_allow_html=True
+    )
+    if not st.toggle("Show every ticker", key="universe_mode"):
+        return
+
+    factors, prices, history, stats_df = cached_universe(start_date, version)
+    if stats_df["Correlation"].notna().sum() == 0:
+        st.info("Not enough overlapping sentiment and price history yet.")
+        return
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        metric = st.radio("Statistic", HEATMAP_METRICS, horizontal=True, key="universe_metric")
+    with col2:
+        n_tickers = prices.shape[1]
+        # A one-ticker universe leaves the slider without a range
+        top_n = st.slider("Tickers shown", 1, n_tickers, min(50, n_tickers), key="universe_top_n") if n_tickers > 1 else n_tickers
+    fig = session_cached("universe_heatmap", (version, metric, top_n), lambda: build_heatmap_figure(stats_df, metric, top_n))
+    plotly_chart(fig, "universe heatmap", use_container_width=True)
+
+    # Every (ticker, day) of the universe pooled into one binned cloud
+    st.markdown("**Pooled across tickers: sentiment vs. next-day return**")
+    pooled_returns = next_day_returns(prices).to_numpy(dtype=float)
+    pooled_fig = session_cached(
+        "universe_density",
+        version,
+        lambda: build_density_figure(
+            {
+                name: (factors[name].reindex(index=prices.index, columns=prices.columns).to_numpy(dtype=float), pooled_returns)
+                for name in SCATTER_SENTIMENTS if name in factors
+            },
+            y_title="Next-Day Return"
+        ),
+    )
+    plotly_chart(pooled_fig, "pooled density", use_container_width=True)
+
+    # Bootstrap intervals are the only heavy statistic: they run on the
+    # analysis pool and are cached per data version
+    job_id = st.session_state.get("universe_ci_job_id")
+    if st.button("Compute bootstrap intervals", key="universe_ci"):
+        job = analysis_jobs.submit(
+            ("universe_ci", str(start_date)),
+            lambda progress, cancelled: universe_correlation_intervals(factors, prices),
+            watermark=version
+        )
+        job_id = st.session_state["universe_ci_job_id"] = job.id
+    job = analysis_jobs.get(job_id)
+    table_df = stats_df
+    if job is not None:
+        st.fragment(universe_intervals, run_every=None if job.finished else 1)(job.id, not job.finished)
+        if job.status == DONE:
+            table_df = stats_df.merge(job.result, on=["Ticker", "Factor"], how="left")
+    st.dataframe(
+        table_df.dropna(subset=["Correlation"]).sort_values("p-value").round(4),
+        use_container_width=True,
+        hide_index=True,
+        height=300
+    )
+
+    # Drill-down into the single-ticker scatter, from the same bulk frames
+    ranked = stats_df.dropna(subset=["Correlation"]).sort_values("p-value")["Ticker"].drop_duplicates().tolist()
+    drill_ticker = st.selectbox("Drill down into a ticker", ranked, key="universe_drill")
+    if drill_ticker:
+        stock_df = prices[drill_ticker].rename("Close").rename_axis("Date").reset_index()
+        drill_df = merge_returns(history[history["Ticker"] == drill_ticker].drop(columns="Ticker"), stock_df)
+        plotly_chart(
+            session_cached("universe_drill_fig", (version, drill_ticker), lambda: build_scatter_figure(drill_df)),
+            "universe drill",
+            use_container_width=True
+        )
+
+
+if selected_company is not None:
+    try:
+        universe_panel(version, latest_trading_date - timedelta(days=365))
+    except Exception as e:
+        st.error(f"Error loading universe analysis: {e}")
+
+# --- Event study: abnormal returns around sentiment spikes ---
+EVENT_HISTORY_YEARS = 3
+
+
+def build_event_figure(curve: pd.DataFrame):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=list(curve.index) + list(curve.index[::-1]),
+        y=list(curve["CAR High"]) + list(curve["CAR Low"][::-1]),
+        fill="toself",
+        fillcolor="rgba(26, 115, 232, 0.15)",
+        line=dict(width=0),
+        hoverinfo="skip",
+        name="95% band"
+    ))
+    fig.add_trace(go.Scatter(x=curve.index, y=curve["CAR"], mode="lines+markers", line=dict(color="#1a73e8"), name="CAR"))
+    fig.add_trace(go.Bar(x=curve.index, y=curve["AAR"], marker_color="#9e9e9e", opacity=0.6, name="AAR"))
+    fig.update_layout(
+        template="simple_white",
+        xaxis_title="Trading days from event",
+        yaxis_title="Abnormal return",
+        yaxis=dict(tickformat=".2%"),
+        legend_title="",
+        height=450
+    )
+    fig.add_vline(x=0, line_dash="dot", line_color="gray")
+    fig.add_hline(y=0, line_dash="dot", line_color="gray")
+    return fig
+
+
+@st.fragment
+def event_study_section(version, start_date):
+    st.markdown(
+        "<h4 style='margin-top: 40px;font-weight: 700;'>Event Study: Sentiment Spikes</h4>",
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        f"<p style='font-size: 18px; color: #666; margin-top: -12px;'>All tickers, {EVENT_HISTORY_YEARS} years, market-adjusted returns</p>",
+        unsafe_allow_html=True
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        factor = st.selectbox("Event trigger", list(DEFAULT_THRESHOLDS), key="event_factor")
+    default_threshold, direction = DEFAULT_THRESHOLDS[factor]
+    low, high = (-1.0, 1.0) if factor == "Intent Sentiment" else (0.0, 1.0)
+    with col2:
+        threshold = st.slider(
+            f"Threshold ({'rises above' if direction == 'above' else 'falls below'})",
+            low, high, default_threshold, step=0.05, key=f"event_threshold_{factor}"
+        )
+    with col3:
+        pre, post = st.slider("Window (days)", -20, 30, (-DEFAULT_PRE, DEFAULT_POST), key="event_window")
+
+    factors, prices = cached_event_panels(start_date, version)
+    result = session_cached(
+        "event_study", (version, factor, threshold, pre, post),
+        lambda: run_event_study(factors[factor], prices, threshold, direction, pre=-min(pre, 0), post=max(post, 0))
+    )
+    if result.events.empty:
+        st.info("No threshold crossings in the selected history.")
+        return
+    st.markdown(f"**{len(result.events):,} events across {result.events['Ticker'].nunique():,} tickers**")
+    plotly_chart(
+        session_cached("event_fig", (version, factor, threshold, pre, post), lambda: build_event_figure(result.curve)),
+        "event study",
+        use_container_width=True
+    )
+    st.dataframe(
+        result.events.sort_values("Date", ascending=False).head(200).round({"Value": 4, "CAR": 4}),
+        use_container_width=True,
+        hide_index=True,
+        height=250
+    )
+
+
+if selected_company is not None:
+    try:
+        event_study_section(version, latest_trading_date - timedelta(days=365 * EVENT_HISTORY_YEARS))
+    except Exception as e:
+        st.error(f"Error loading event study: {e}")
+
+end_page("Sentiment & Stock Performance", run_started)
+
+# --- Change watcher: reruns the page only when the probe sees new data ---
+watch_for_changes("data", data_version)
+
 
 # import streamlit as st
 # import plotly.express as px
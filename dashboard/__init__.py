@@ -0,0 +1 @@
+"""Shared data-access and analytics helpers for the QF5214 Streamlit pages."""
@@ -0,0 +1,94 @@
+"""Trading-calendar alignment of sentiment to returns.
+
+Sentiment is dated by calendar day (weekends included); prices only exist on
+trading days. The one alignment path used by the pages and the research
+engines is:
+
+1. Compute returns on each ticker's full price series, so a return always
+   spans two consecutive trading days no matter where sentiment is missing.
+2. Attach sentiment with a sorted as-of join onto the trading calendar: a
+   sentiment day maps to the first trading day on or after it, and days that
+   land on the same trading day (a weekend and the Monday after it) are
+   averaged rather than dropped.
+
+The as-of step is a single `searchsorted` over the calendar for every row of
+the universe at once.
+"""
+import numpy as np
+import pandas as pd
+
+
+def trading_calendar(dates) -> pd.DatetimeIndex:
+    """Sorted, unique, normalized trading dates."""
+    return pd.DatetimeIndex(pd.to_datetime(pd.Index(dates))).normalize().unique().sort_values()
+
+
+def previous_trading_date(date, calendar: pd.DatetimeIndex):
+    """Last trading date strictly before `date`, or the previous calendar day without one."""
+    position = calendar.searchsorted(pd.Timestamp(date).normalize(), side="left")
+    if position == 0:
+        return (pd.Timestamp(date) - pd.Timedelta(days=1)).date()
+    return calendar[position - 1].date()
+
+
+def to_trading_dates(dates, calendar: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """As-of map each date to the first trading date on or after it (NaT past the calendar end)."""
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Index(dates))).normalize()
+    positions = calendar.searchsorted(dates, side="left")
+    mapped = calendar.take(np.minimum(positions, max(len(calendar) - 1, 0))) if len(calendar) else dates
+    return mapped.where((positions < len(calendar)) & ~dates.isna())
+
+
+def price_returns(stock_df: pd.DataFrame) -> pd.DataFrame:
+    """(Date, Ticker, Close, Return) rows with returns taken on each ticker's full series."""
+    prices = stock_df.assign(
+        Date=pd.to_datetime(stock_df["Date"], errors="coerce").dt.normalize(),
+        Close=pd.to_numeric(stock_df["Close"], errors="coerce"),
+    )
+    if "Ticker" not in prices:
+        prices["Ticker"] = ""
+    prices = prices.dropna(subset=["Date"]).drop_duplicates(subset=["Ticker", "Date"], keep="last")
+    prices = prices.sort_values(["Ticker", "Date"]).reset_index(drop=True)
+    prices["Return"] = prices.groupby("Ticker", sort=False)["Close"].pct_change(fill_method=None)
+    return prices
+
+
+def asof_sentiment(sentiment_df: pd.DataFrame, columns: list, calendar: pd.DatetimeIndex) -> pd.DataFrame:
+    """Sentiment rows re-dated to the trading calendar, one row per (Ticker, Date).
+
+    Numeric columns are averaged over the calendar days mapping to a trading
+    day; other columns (e.g. "Intent Sentiment") keep the latest value.
+    """
+    frame = sentiment_df.assign(Date=pd.to_datetime(sentiment_df["Date"], errors="coerce")).sort_values("Date", kind="stable")
+    frame["Date"] = to_trading_dates(frame["Date"], calendar)
+    if "Ticker" not in frame:
+        frame["Ticker"] = ""
+    frame = frame.dropna(subset=["Date"])
+    aggregations = {col: "mean" if pd.api.types.is_numeric_dtype(frame[col]) else "last" for col in columns}
+    return frame.groupby(["Ticker", "Date"], sort=False, as_index=False).agg(aggregations)
+
+
+def align_returns(sentiment_df: pd.DataFrame, stock_df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """Every price row with its Return and the as-of attached sentiment `columns`.
+
+    Works for one ticker or the whole universe; when either frame has no
+    Ticker column both are taken to be a single ticker and joined on Date.
+    """
+    by_ticker = "Ticker" in sentiment_df and "Ticker" in stock_df
+    returns = price_returns(stock_df)
+    calendar = trading_calendar(returns["Date"])
+    sentiment = asof_sentiment(sentiment_df if by_ticker else sentiment_df.drop(columns="Ticker", errors="ignore"), columns, calendar)
+    if not by_ticker:
+        sentiment = sentiment.drop(columns="Ticker")
+    aligned = returns.merge(sentiment, on=["Ticker", "Date"] if by_ticker else ["Date"], how="left")
+    return aligned if "Ticker" in stock_df else aligned.drop(columns="Ticker")
+
+
+def sentiment_panels(sentiment_df: pd.DataFrame, columns: list, calendar) -> dict:
+    """Dates x tickers panel per column on the trading calendar, as-of aligned."""
+    calendar = trading_calendar(calendar)
+    aligned = asof_sentiment(sentiment_df, columns, calendar)
+    return {
+        col: aligned.pivot(index="Date", columns="Ticker", values=col).reindex(calendar)
+        for col in columns
+    }
@@ -0,0 +1,88 @@
+"""Compact columnar backtest artifacts.
+
+Backtest and IC runs save their daily series as uncompressed Arrow IPC files
+instead of self-contained HTML charts. Pages open them memory-mapped, keep the
+decoded frame per (path, mtime, size) in a process-wide cache, and build native
+Plotly figures from a few kilobytes of data rather than pushing a multi-megabyte
+HTML file (each with its own copy of plotly.js) on every rerun.
+
+Small summary values (e.g. strategy statistics) travel in the schema metadata
+as JSON, so one file holds everything a panel needs.
+"""
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from dashboard.db import TTLCache
+
+BACKTEST_ARTIFACT = "backtest_results.arrow"
+IC_ARTIFACT = "ic_series.arrow"
+
+_METADATA_KEY = b"qf5214"
+
+# Decoded artifacts only change when the file is rewritten, so entries are
+# keyed on its version and effectively never expire
+_artifact_cache = TTLCache(ttl=float("inf"), maxsize=8)
+
+
+def artifact_version(path: str):
+    """(mtime_ns, size) of `path`, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def save_artifact(df: pd.DataFrame, path: str, metadata: dict = None):
+    """Atomically write `df` as an uncompressed Arrow IPC file (mmap-friendly)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _METADATA_KEY: json.dumps(metadata or {}, default=str).encode()}
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # Readers that still map the old file keep its inode until they finish
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path: str):
+    """Return `(frame, metadata)` for an artifact, or `(None, None)` if it is missing."""
+    version = artifact_version(path)
+    if version is None:
+        return None, None
+
+    def read():
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        raw = (table.schema.metadata or {}).get(_METADATA_KEY, b"{}")
+        return table.to_pandas(), json.loads(raw)
+
+    df, metadata = _artifact_cache.get_or_compute((os.path.abspath(path), version), read)
+    return df.copy(), metadata
+
+
+# --- Backtest results ---
+def save_backtest_artifact(results: dict, path: str):
+    """Save equity, drawdown and return series of each `BacktestResult` in long format."""
+    frames = []
+    for name, result in results.items():
+        daily = result.daily[["net", "turnover", "equity", "drawdown"]].astype("float32")
+        frames.append(daily.rename_axis("Date").reset_index().assign(Strategy=name))
+    df = pd.concat(frames, ignore_index=True)
+    df["Strategy"] = df["Strategy"].astype("category")
+    save_artifact(df, path, {"stats": {name: result.stats for name, result in results.items()}})
+
+
+# --- IC series ---
+def save_ic_artifact(ic_df: pd.DataFrame, path: str, metadata: dict = None):
+    """Save daily IC and Rank IC per factor; `ic_df` has Date, Factor, IC and Rank IC columns."""
+    df = ic_df[["Date", "Factor", "IC", "Rank IC"]].copy()
+    df[["IC", "Rank IC"]] = df[["IC", "Rank IC"]].astype("float32")
+    df["Factor"] = df["Factor"].astype("category")
+    save_artifact(df, path, metadata)
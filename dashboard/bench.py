@@ -0,0 +1,409 @@
+"""Reproducible benchmarks on a synthetic copy of the dashboard's tables.
+
+`generate` builds N tickers x M years of seeded rows shaped like the tables
+the dashboard reads: `tradingstrategy.dailytrading`, `datacollection.stock_data`
+and the three `nlp.sentiment_aggregated_*` sources, quirks included ('YYYY/MM/DD'
+text dates, some "$X" company keys, later sources overlapping older ones). The
+rows are served from one of two local stand-ins for the remote Postgres:
+
+* ``mirror``   - written into a Parquet mirror read with `QF5214_MIRROR=offline`;
+                 needs no server
+* ``postgres`` - loaded into the database at ``--db-url``, so the loaders run
+                 their real catalog SQL
+
+Benchmarks cover the page loaders (cold query cache), the merge/return
+pipeline and, through Streamlit's AppTest, full page runs with their figure
+construction and render spans from `dashboard.telemetry` (fresh session, warm
+server). Every run appends its p50/p95 per benchmark, the commit and the
+parameters to `results.jsonl` and is compared with the last run of the same
+parameters, so regressions show up between versions.
+
+    python -m dashboard.bench --tickers 200 --years 3 --repeat 5
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.environ.get("QF5214_BENCH_DIR", os.path.join(ROOT, "bench"))
+RESULTS_FILE = "results.jsonl"
+DATASET_FILE = "dataset.json"
+
+TARGETS = ["mirror", "postgres"]
+PAGES = ["Market Sentiment Trends.py", "Sentiment & Stock Performance.py"]
+PAGE_TIMEOUT = 300
+
+# Fraction of the universe on each side of the book, re-drawn every week
+BOOK_FRACTION = 0.1
+# Sentiment rows keyed "$X" instead of "X"
+DOLLAR_SHARE = 0.1
+# (ticker, day) pairs without any sentiment
+MISSING_SHARE = 0.1
+# The newdate source covers the last NEWDATE_DAYS and overlaps the data source
+# by half of that; the live source re-scores the last LIVE_DAYS
+NEWDATE_DAYS = 60
+LIVE_DAYS = 7
+
+# A benchmark regresses when its p50 grows by more than this fraction and by
+# more than REGRESSION_FLOOR_MS, so sub-millisecond jitter is not reported
+REGRESSION_THRESHOLD = 0.2
+REGRESSION_FLOOR_MS = 2.0
+
+
+# --- Setup ---
+def configure(target: str, directory: str, db_url: str = None):
+    """Point the dashboard modules at the synthetic data.
+
+    Settings are read when `dashboard.db`, `dashboard.loaders` and
+    `dashboard.mirror` are imported, so this must run first in the process.
+    """
+    loaded = [name for name in ("dashboard.db", "dashboard.loaders", "dashboard.mirror") if name in sys.modules]
+    if loaded:
+        raise RuntimeError(f"configure() must run before {', '.join(loaded)} is imported")
+    if target == "mirror":
+        os.environ["QF5214_MIRROR"] = "offline"
+        os.environ["QF5214_MIRROR_DIR"] = os.path.join(directory, "mirror")
+    elif target == "postgres":
+        if not db_url:
+            raise ValueError("The postgres target needs an explicit database URL")
+        os.environ["QF5214_MIRROR"] = "off"
+        os.environ["QF5214_DB_URL"] = db_url
+    else:
+        raise ValueError(f"Unknown target: {target}")
+    os.environ["QF5214_SENTIMENT_STORE"] = "0"
+
+
+# --- Synthetic data ---
+def generate(tickers: int = 100, years: int = 2, seed: int = 0, end=None) -> dict:
+    """Source tables as `{qualified table name: frame}`, ending at `end` (today by default)."""
+    from dashboard.loaders import SENTIMENT_COLUMNS
+
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end).normalize()
+    start = end - pd.DateOffset(years=years)
+    symbols = np.array([f"T{i:04d}" for i in range(tickers)])
+    trading = pd.bdate_range(start, end)
+    days = pd.date_range(start, end)
+
+    # Closes: a shared market factor plus idiosyncratic noise
+    market = rng.normal(0.0003, 0.01, (len(trading), 1))
+    log_returns = market * rng.uniform(0.5, 1.5, tickers) + rng.normal(0.0, 0.015, (len(trading), tickers))
+    closes = rng.uniform(20, 300, tickers) * np.exp(np.cumsum(log_returns, axis=0))
+    stock = pd.DataFrame({
+        "Date": np.repeat(trading.date, tickers),
+        "Ticker": np.tile(symbols, len(trading)),
+        "Close": closes.ravel().round(2),
+    })
+
+    # Holdings: a random long and short basket, rebalanced weekly
+    side = max(1, int(tickers * BOOK_FRACTION))
+    week = pd.factorize(trading.to_period("W-FRI"))[0]
+    order = rng.permuted(np.tile(np.arange(tickers), (week.max() + 1, 1)), axis=1)
+    held = np.hstack([order[:, :side], order[:, -side:]])[week]
+    holdings = pd.DataFrame({
+        "Date": np.repeat(trading.date, 2 * side),
+        "Ticker": symbols[held.ravel()],
+        "Position_Type": np.tile(np.repeat(["Long", "Short"], side), len(trading)),
+    })
+
+    # Sentiment on every calendar day; the emotions and Positive/Negative/Neutral each sum to one
+    n = len(days) * tickers
+    scores = np.hstack([rng.dirichlet(np.ones(6), n), rng.dirichlet([2.0, 2.0, 3.0], n)]).round(4)
+    keep = rng.random(n) >= MISSING_SHARE
+    day = np.repeat(days.to_numpy(), tickers)[keep]
+    sentiment = pd.DataFrame(scores[keep], columns=SENTIMENT_COLUMNS)
+    sentiment.insert(0, "Date", pd.DatetimeIndex(day).strftime("%Y/%m/%d"))
+    dollar = rng.random(len(sentiment)) < DOLLAR_SHARE
+    sentiment.insert(1, "company", np.char.add(np.where(dollar, "$", ""), np.tile(symbols, len(days))[keep]))
+    tilt = sentiment["Positive"] - sentiment["Negative"]
+    sentiment["Intent Sentiment"] = np.select([tilt > 0.15, tilt < -0.15], ["buy", "sell"], "neutral")
+
+    live = sentiment[day >= end - pd.Timedelta(days=LIVE_DAYS)].copy()
+    live[SENTIMENT_COLUMNS] = (live[SENTIMENT_COLUMNS] + rng.normal(0.0, 0.02, (len(live), len(SENTIMENT_COLUMNS)))).clip(0, 1).round(4)
+    return {
+        "tradingstrategy.dailytrading": holdings,
+        "datacollection.stock_data": stock,
+        "nlp.sentiment_aggregated_data": sentiment[day <= end - pd.Timedelta(days=NEWDATE_DAYS // 2)].reset_index(drop=True),
+        "nlp.sentiment_aggregated_live": live.reset_index(drop=True),
+        "nlp.sentiment_aggregated_newdate": sentiment[day >= end - pd.Timedelta(days=NEWDATE_DAYS)].reset_index(drop=True),
+    }
+
+
+def write_mirror(tables: dict):
+    """Replace the Parquet mirror under `MIRROR_DIR` with `tables`."""
+    from dashboard import mirror
+    from dashboard.store import SOURCE_PRIORITY
+
+    # Sources in priority order, so the mirror's dedup keeps the later one
+    sources = [tables[table].assign(Ticker=tables[table]["company"].str.lstrip("$")) for table in SOURCE_PRIORITY]
+    frames = {
+        "sentiment": pd.concat(sources, ignore_index=True),
+        "stock_data": tables["datacollection.stock_data"],
+        "dailytrading": tables["tradingstrategy.dailytrading"],
+    }
+    for dataset, df in frames.items():
+        mirror.replace_dataset(dataset, df)
+
+
+def load_postgres(tables: dict, engine=None):
+    """Replace the source tables in the (local) database behind `engine` with `tables`."""
+    from sqlalchemy import text
+
+    from dashboard import db
+
+    engine = engine or db.get_engine()
+    if engine.url.host == db.host:
+        raise RuntimeError("Refusing to overwrite the tables of the shared database")
+    with engine.begin() as conn:
+        for schema in sorted({name.split(".")[0] for name in tables}):
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    for name, df in tables.items():
+        schema, table = name.split(".")
+        df.to_sql(table, engine, schema=schema, if_exists="replace", index=False, chunksize=50_000)
+    with engine.begin() as conn:
+        for name in tables:
+            conn.execute(text(f"ANALYZE {name}"))
+
+
+def prepare(params: dict, directory: str):
+    """Generate and load the synthetic tables unless `directory` already holds them."""
+    dataset = {**params, "end": pd.Timestamp.today().strftime("%Y-%m-%d")}
+    path = os.path.join(directory, DATASET_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if json.load(f) == dataset:
+                return
+    tables = generate(params["tickers"], params["years"], params["seed"])
+    if params["target"] == "mirror":
+        write_mirror(tables)
+    else:
+        load_postgres(tables)
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dataset, f)
+
+
+# --- Benchmarks ---
+def timed(fn, repeat: int, setup=None) -> dict:
+    """p50/p95 wall time of `fn()` over `repeat` runs after one warm-up, plus the rows it returned."""
+    from dashboard.telemetry import QUANTILES
+
+    result = fn()
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    p50, p95 = np.quantile(seconds, QUANTILES) * 1000
+    return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "rows": len(result) if isinstance(result, pd.DataFrame) else None}
+
+
+def loader_benchmarks() -> list:
+    """`(name, fn)` for the loaders behind the pages, on one held ticker and the whole universe."""
+    from dashboard import loaders
+    from dashboard.alignment import previous_trading_date
+
+    latest = loaders.load_latest_trading_date()
+    calendar = loaders.load_trading_calendar()
+    sentiment_date = previous_trading_date(latest, calendar)
+    held = loaders.load_tickers(latest)["Ticker"].tolist()
+    ticker = held[0]
+    year_ago = pd.Timestamp(latest) - pd.DateOffset(years=1)
+    return [
+        ("latest_trading_date", loaders.load_latest_trading_date),
+        ("positions", lambda: loaders.load_positions(latest)),
+        ("trading_calendar", loaders.load_trading_calendar),
+        ("page_sentiment", lambda: loaders.load_page_sentiment(ticker, sentiment_date)),
+        ("sentiment_last_year", lambda: loaders.load_sentiment_last_year(ticker)),
+        ("stock_prices_last_year", lambda: loaders.load_stock_prices_last_year(ticker)),
+        ("universe_sentiment_last_year", lambda: loaders.load_universe_sentiment_last_year(held)),
+        ("universe_prices_last_year", lambda: loaders.load_universe_prices_last_year(held)),
+        ("holdings_history", lambda: loaders.load_holdings_history(year_ago)),
+        ("sentiment_history", lambda: loaders.load_sentiment_history(start_date=year_ago)),
+        ("price_history", lambda: loaders.load_price_history(start_date=year_ago)),
+    ]
+
+
+def pipeline_benchmarks() -> list:
+    """`(name, fn)` for the merge/return and aggregation steps, on inputs loaded once up front."""
+    from dashboard.alignment import align_returns, sentiment_panels
+    from dashboard.book import book_sentiment
+    from dashboard.downsample import density_grid, downsample
+    from dashboard.events import DEFAULT_THRESHOLDS, run_event_study
+    from dashboard.leadlag import align_daily, lead_lag
+    from dashboard.loaders import (
+        SENTIMENT_COLUMNS,
+        load_holdings_history,
+        load_latest_trading_date,
+        load_price_history,
+        load_sentiment_history,
+        to_panel,
+    )
+    from dashboard.universe import next_day_returns, universe_return_stats
+
+    year_ago = pd.Timestamp(load_latest_trading_date()) - pd.DateOffset(years=1)
+    history = load_sentiment_history(start_date=year_ago)
+    stock = load_price_history(start_date=year_ago)
+    holdings = load_holdings_history(year_ago)
+    prices = to_panel(stock, "Close")
+    factors = sentiment_panels(history, SENTIMENT_COLUMNS, prices.index)
+    ticker = holdings["Ticker"].iloc[-1]
+    ticker_history = history[history["Ticker"] == ticker]
+    ticker_stock = stock[stock["Ticker"] == ticker]
+    daily = align_daily(ticker_history.drop(columns="Ticker"), ticker_stock.drop(columns="Ticker"), SENTIMENT_COLUMNS)
+    all_history = load_sentiment_history([ticker])
+    threshold, direction = DEFAULT_THRESHOLDS["Fear"]
+    return [
+        ("align_returns", lambda: align_returns(ticker_history.drop(columns="Ticker"), ticker_stock.drop(columns="Ticker"), SENTIMENT_COLUMNS)),
+        ("universe_align_returns", lambda: align_returns(history, stock, SENTIMENT_COLUMNS)),
+        ("sentiment_panels", lambda: sentiment_panels(history, SENTIMENT_COLUMNS, prices.index)),
+        ("universe_return_stats", lambda: universe_return_stats(factors, prices)),
+        ("lead_lag", lambda: lead_lag(daily["Positive"], daily["Return"])),
+        ("book_sentiment", lambda: book_sentiment(holdings, history, SENTIMENT_COLUMNS, prices.index)),
+        ("event_study", lambda: run_event_study(factors["Fear"], prices, threshold, direction)),
+        ("downsample", lambda: downsample(all_history, SENTIMENT_COLUMNS)),
+        ("density_grid", lambda: density_grid(factors["Positive"].to_numpy(), next_day_returns(prices).to_numpy())),
+    ]
+
+
+def page_benchmarks(repeat: int) -> dict:
+    """Page runs and the figure/render spans inside them, per page.
+
+    Each run is a fresh AppTest session on a warm server, i.e. what a newly
+    opened browser tab costs once the process-wide caches are filled.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard import telemetry
+
+    results = {}
+    for page in PAGES:
+        path = os.path.join(ROOT, page)
+        AppTest.from_file(path, default_timeout=PAGE_TIMEOUT).run()
+        telemetry.reset()
+        for _ in range(repeat):
+            app = AppTest.from_file(path, default_timeout=PAGE_TIMEOUT).run()
+            if app.exception:
+                raise RuntimeError(f"{page} raised: {app.exception[0].value}")
+        name = os.path.splitext(page)[0]
+        for row in telemetry.summary().to_dict("records"):
+            if row["Kind"] == "page":
+                group, label = "pages", name
+            elif row["Kind"] == "render" or (row["Kind"] == "transform" and row["Span"].endswith(("_fig", "_figs"))):
+                group, label = "charts", f"{name} / {row['Span']}"
+            else:
+                continue
+            results[label] = {"group": group, "p50_ms": row["p50 ms"], "p95_ms": row["p95 ms"], "rows": None}
+    return results
+
+
+def run(repeat: int = 5, pages: bool = True) -> dict:
+    """Every benchmark as `{name: {"group", "p50_ms", "p95_ms", "rows"}}`."""
+    from dashboard.db import query_cache
+
+    results = {}
+    for name, fn in loader_benchmarks():
+        results[name] = {"group": "loaders", **timed(fn, repeat, setup=query_cache.clear)}
+    for name, fn in pipeline_benchmarks():
+        results[name] = {"group": "pipeline", **timed(fn, repeat)}
+    if pages:
+        results.update(page_benchmarks(repeat))
+    return results
+
+
+# --- Results ---
+def _commit():
+    try:
+        described = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return described.stdout.strip()
+
+
+def load_results(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_result(record: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def compare(record: dict, history: list) -> pd.DataFrame:
+    """Each benchmark's p50 against the last earlier run with the same parameters."""
+    previous = next((past for past in reversed(history) if past["params"] == record["params"]), None)
+    rows = []
+    for name, result in record["results"].items():
+        before = None if previous is None else previous["results"].get(name, {}).get("p50_ms")
+        change = None if not before else result["p50_ms"] / before - 1
+        rows.append({
+            "Group": result["group"],
+            "Benchmark": name,
+            "p50 ms": result["p50_ms"],
+            "p95 ms": result["p95_ms"],
+            "Previous p50 ms": before,
+            "Change": change,
+            "Regression": change is not None
+            and change > REGRESSION_THRESHOLD
+            and result["p50_ms"] - before > REGRESSION_FLOOR_MS,
+        })
+    return pd.DataFrame(rows, columns=["Group", "Benchmark", "p50 ms", "p95 ms", "Previous p50 ms", "Change", "Regression"])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard on synthetic data")
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target", choices=TARGETS, default="mirror")
+    parser.add_argument("--db-url", default=None, help="local Postgres for --target postgres; its source tables are replaced")
+    parser.add_argument("--dir", default=BENCH_DIR, help="where the synthetic mirror and results.jsonl live")
+    parser.add_argument("--skip-pages", action="store_true", help="skip the AppTest page runs")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a benchmark regressed")
+    args = parser.parse_args(argv)
+    if args.tickers < 2:
+        parser.error("--tickers must be at least 2")
+
+    configure(args.target, args.dir, args.db_url)
+    params = {"target": args.target, "tickers": args.tickers, "years": args.years, "seed": args.seed, "repeat": args.repeat}
+    prepare({key: params[key] for key in ("target", "tickers", "years", "seed")}, args.dir)
+
+    record = {
+        "run": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "params": params,
+        "results": run(args.repeat, pages=not args.skip_pages),
+    }
+    path = os.path.join(args.dir, RESULTS_FILE)
+    report = compare(record, load_results(path))
+    save_result(record, path)
+
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(report.round({"p50 ms": 1, "p95 ms": 1, "Previous p50 ms": 1, "Change": 3}).to_string(index=False))
+    regressed = report[report["Regression"]]
+    if len(regressed):
+        print(f"{len(regressed)} benchmark(s) regressed by more than {REGRESSION_THRESHOLD:.0%}: {', '.join(regressed['Benchmark'])}")
+    return 1 if args.check and len(regressed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Position-weighted sentiment of the long, short and net books.
+
+The holdings history (`tradingstrategy.dailytrading`) and the sentiment of
+every ticker it ever held are fetched in one batch each. Positions are
+weighted as in the backtest (`holdings_weights`: equal within a side, half of
+gross per side) and each position is paired with the as-of sentiment of the
+previous trading day, the same T-1 the trends page shows. The book series are
+then weighted sums from a single group-by over (Date, Book):
+
+- Long / Short: weighted mean sentiment of the positions on that side
+- Net: signed weighted sum over gross weight, i.e. how tilted the whole book
+  is towards the score; with equal-gross sides it is (Long - Short) / 2
+
+Positions without sentiment that day drop out of the weights.
+
+    holdings = load_holdings_history(start_date)
+    history = load_sentiment_history(holdings["Ticker"].unique().tolist(), start_date)
+    book = book_sentiment(holdings, history, SENTIMENT_COLUMNS, calendar)
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.db import TTLCache
+
+BOOKS = ["Long", "Short", "Net"]
+BOOK_HISTORY_DAYS = 365
+# Trading days between the sentiment date and the holdings date
+SIGNAL_LAG = 1
+
+_book_cache = TTLCache(ttl=24 * 60 * 60, maxsize=2)
+
+
+def position_weights(holdings: pd.DataFrame) -> pd.DataFrame:
+    """(Date, Ticker, Weight) rows of the non-zero holdings weights."""
+    from dashboard.backtest import holdings_weights
+
+    if holdings.empty:
+        return pd.DataFrame(columns=["Date", "Ticker", "Weight"])
+    weights = holdings_weights(holdings).stack().rename("Weight").reset_index()
+    return weights[weights["Weight"] != 0].reset_index(drop=True)
+
+
+def book_sentiment(
+    holdings: pd.DataFrame, sentiment_df: pd.DataFrame, columns: list, calendar, lag: int = SIGNAL_LAG
+) -> pd.DataFrame:
+    """Long, short and net position-weighted sentiment per holdings date.
+
+    Returns (Date, Book, columns..., Positions) rows, where Positions counts
+    the positions of the book held that day.
+    """
+    from dashboard.alignment import asof_sentiment, trading_calendar
+
+    calendar = trading_calendar(calendar)
+    weights = position_weights(holdings)
+    if weights.empty:
+        return pd.DataFrame(columns=["Date", "Book"] + columns + ["Positions"])
+
+    # Sentiment date of each holdings date: `lag` trading days earlier
+    position = calendar.searchsorted(pd.DatetimeIndex(weights["Date"]).normalize())
+    source = position - lag
+    known = (source >= 0) & (position < len(calendar))
+    weights["Sentiment Date"] = calendar.take(np.clip(source, 0, max(len(calendar) - 1, 0))).where(known)
+
+    aligned = asof_sentiment(sentiment_df, columns, calendar).rename(columns={"Date": "Sentiment Date"})
+    joined = weights.merge(aligned, on=["Ticker", "Sentiment Date"], how="left")
+
+    w = joined["Weight"].to_numpy(dtype=float)[:, None]
+    values = joined[columns].to_numpy(dtype=float)
+    valid = np.isfinite(values)
+    sums = pd.DataFrame(
+        np.hstack([np.where(valid, w * values, 0.0), np.where(valid, np.abs(w), 0.0), np.ones((len(w), 1))]),
+        columns=[f"s:{col}" for col in columns] + [f"w:{col}" for col in columns] + ["Positions"],
+    )
+    sums["Date"] = joined["Date"].to_numpy()
+    sums["Book"] = np.where(w[:, 0] > 0, "Long", "Short")
+    # Net accumulates the signed products; per-side books use their absolute value
+    per_side = sums.groupby(["Date", "Book"], sort=True).sum()
+    net = per_side.groupby(level="Date").sum()
+
+    signed = per_side[[f"s:{col}" for col in columns]].to_numpy()
+    side = np.where(per_side.index.get_level_values("Book") == "Long", 1.0, -1.0)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        side_values = side * signed / per_side[[f"w:{col}" for col in columns]].to_numpy()
+        net_values = net[[f"s:{col}" for col in columns]].to_numpy() / net[[f"w:{col}" for col in columns]].to_numpy()
+
+    books = pd.concat(
+        [
+            pd.DataFrame(side_values, columns=columns, index=per_side.index).assign(Positions=per_side["Positions"].to_numpy()),
+            pd.DataFrame(net_values, columns=columns, index=pd.MultiIndex.from_arrays([net.index, np.repeat("Net", len(net))], names=["Date", "Book"]))
+            .assign(Positions=net["Positions"].to_numpy()),
+        ]
+    ).reset_index()
+    books["Positions"] = books["Positions"].astype(int)
+    books["Book"] = pd.Categorical(books["Book"], categories=BOOKS)
+    return books.sort_values(["Date", "Book"]).reset_index(drop=True)
+
+
+def load_book_sentiment(start_date=None, columns: list = None) -> pd.DataFrame:
+    """Book sentiment from one holdings fetch and one sentiment fetch of the tickers it held."""
+    from dashboard.loaders import SENTIMENT_COLUMNS, load_holdings_history, load_sentiment_history, load_trading_calendar
+
+    columns = SENTIMENT_COLUMNS if columns is None else columns
+    holdings = load_holdings_history(start_date)
+    if holdings.empty:
+        return book_sentiment(holdings, pd.DataFrame(columns=["Date", "Ticker"] + columns), columns, [])
+    # Lagged sentiment reaches back a few days before the first holdings date
+    sentiment_start = holdings["Date"].min() - pd.Timedelta(days=7)
+    history = load_sentiment_history(holdings["Ticker"].unique().tolist(), sentiment_start, columns)
+    calendar = load_trading_calendar(sentiment_start)
+    return book_sentiment(holdings, history, columns, calendar)
+
+
+def cached_book_sentiment(start_date, version) -> pd.DataFrame:
+    """`load_book_sentiment` shared by every session, once per data version."""
+    return _book_cache.get_or_compute((str(start_date), version), lambda: load_book_sentiment(start_date))
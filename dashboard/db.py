@@ -0,0 +1,191 @@
+"""Process-wide database engine and TTL-cached query execution.
+
+Every Streamlit session runs in the same server process, so the engine and the
+query cache below are shared between all open browser tabs. A page refresh
+only reaches Postgres when the cached result for that exact query and
+parameter set has expired.
+"""
+import contextvars
+import importlib.util
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from sqlalchemy import create_engine, make_url, text
+
+from dashboard.telemetry import span
+
+# --- DB Connection ---
+host = "134.122.167.14"
+port = "5555"
+database = "QF5214"
+user = "postgres"
+password = "qf5214"
+
+# psycopg 3 binds parameters server-side and prepares a statement once a
+# pooled connection has run it PREPARE_THRESHOLD times, so repeated catalog
+# queries (see dashboard/queries.py) run from a cached plan; psycopg2 only
+# interpolates client-side and is the fallback
+DRIVER = "postgresql+psycopg" if importlib.util.find_spec("psycopg") else "postgresql+psycopg2"
+DB_URL = os.environ.get("QF5214_DB_URL", f"{DRIVER}://{user}:{password}@{host}:{port}/{database}")
+PREPARE_THRESHOLD = 2
+
+# One refresh window of the pages' st_autorefresh tick
+QUERY_TTL_SECONDS = 60
+QUERY_CACHE_SIZE = 256
+# Kept below pool_size + max_overflow so parallel fetches never wait on the pool
+FETCH_WORKERS = 8
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                connect_args = {}
+                if make_url(DB_URL).get_driver_name() == "psycopg":
+                    connect_args["prepare_threshold"] = PREPARE_THRESHOLD
+                _engine = create_engine(
+                    DB_URL,
+                    connect_args=connect_args,
+                    pool_size=5,
+                    max_overflow=10,
+                    pool_pre_ping=True,
+                    pool_recycle=1800,
+                )
+    return _engine
+
+
+# --- TTL + LRU cache ---
+class TTLCache:
+    """Thread-safe mapping whose entries expire after `ttl` seconds.
+
+    At most `maxsize` entries are kept; the least recently used one is evicted
+    first. `get_or_compute` lets only one caller compute a missing key while
+    concurrent callers for the same key wait for that result.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute, ttl: float = None):
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another session may have filled the entry while we waited
+            hit, value = self.get(key)
+            if hit:
+                return value
+            value = compute()
+            self.set(key, value, ttl)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+query_cache = TTLCache(ttl=QUERY_TTL_SECONDS, maxsize=QUERY_CACHE_SIZE)
+
+_FROM = re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE)
+
+
+def _cache_key(query: str, params: dict = None):
+    # List-valued params (e.g. ANY(:tickers) filters) are made hashable
+    items = tuple(
+        sorted((name, tuple(value) if isinstance(value, (list, tuple)) else value) for name, value in (params or {}).items())
+    )
+    return (" ".join(query.split()), items)
+
+
+def _statement_name(query: str) -> str:
+    match = _FROM.search(query)
+    return match.group(1) if match else " ".join(query.split())[:40]
+
+
+def read_sql(query: str, params: dict = None, ttl: float = None, cache: TTLCache = None, name: str = None) -> pd.DataFrame:
+    """Run `query` through the shared engine, memoized on query text and params.
+
+    Callers get their own copy of the cached frame so in-place edits on a page
+    never leak into another session's result. `cache` defaults to the shared
+    `query_cache`. Each call is a "db" telemetry span named `name`, or the
+    first table the query reads.
+    """
+    key = _cache_key(query, params)
+    with span(name or _statement_name(query), kind="db") as timing:
+        fetched = []
+
+        def fetch():
+            fetched.append(True)
+            return pd.read_sql(text(query), get_engine(), params=params)
+
+        df = (query_cache if cache is None else cache).get_or_compute(key, fetch, ttl)
+        timing.record(df, cache="miss" if fetched else "hit")
+    return df.copy()
+
+
+# --- Concurrent fetch ---
+_fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="qf5214-fetch")
+
+
+def read_sql_many(queries: list, concurrent: bool = True) -> list:
+    """Run several `(query, params)` pairs and return results in input order.
+
+    With `concurrent=True` the queries are issued at the same time on the
+    shared pool, so the wall time is that of the slowest one. A failed query
+    yields its exception in place of a frame, leaving the caller to decide
+    whether a partial result is acceptable.
+    """
+    def run(query, params):
+        try:
+            return read_sql(query, params)
+        except Exception as e:
+            return e
+
+    if not concurrent or len(queries) < 2:
+        return [run(query, params) for query, params in queries]
+    # Each worker runs in a copy of the caller's context, so its spans land in
+    # the caller's page run
+    futures = [_fetch_pool.submit(contextvars.copy_context().run, run, query, params) for query, params in queries]
+    return [future.result() for future in futures]
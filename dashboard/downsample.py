@@ -0,0 +1,85 @@
+"""Bounded-size chart data for long date ranges and large scatters.
+
+Charts used to ship every raw daily point to the browser, which caps the
+usable range at a month or so. Here the data layer reduces a range before it
+is plotted:
+
+- `downsample` averages each series into daily, weekly, monthly or quarterly
+  buckets, choosing the finest calendar rule that keeps every series under
+  `MAX_POINTS`, so a line chart stays the same size whether it shows six
+  months or all history.
+- `density_grid` bins a scatter into a fixed 2-D histogram, so a universe-wide
+  sentiment vs. return cloud of hundreds of thousands of points is drawn as a
+  `bins x bins` heatmap.
+
+    weekly = downsample(history, SENTIMENT_COLUMNS)
+    counts, x_centers, y_centers = density_grid(scores, returns)
+"""
+import numpy as np
+import pandas as pd
+
+# Points per series sent to a line chart
+MAX_POINTS = 300
+DENSITY_BINS = 60
+# Returns beyond these percentiles are clipped into the edge bins, so a few
+# outliers do not squash the rest of the grid
+DENSITY_CLIP = (0.5, 99.5)
+
+# Long-range trend timeframes; None means all history
+RANGE_DAYS = {"6M": 182, "1Y": 365, "All": None}
+
+# Calendar rules from finest to coarsest, with their approximate length in days
+RESAMPLE_RULES = [("D", 1.0), ("W-FRI", 7.0), ("ME", 30.4), ("QE", 91.3)]
+
+
+def resample_rule(start, end, max_points: int = MAX_POINTS) -> str:
+    """Finest rule in `RESAMPLE_RULES` giving at most `max_points` buckets over [start, end]."""
+    span_days = max((pd.Timestamp(end) - pd.Timestamp(start)).days + 1, 1)
+    for rule, days in RESAMPLE_RULES:
+        if span_days / days <= max_points:
+            return rule
+    return RESAMPLE_RULES[-1][0]
+
+
+def downsample(df: pd.DataFrame, columns: list, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """(Date, columns...) bucket means, at most about `max_points` rows.
+
+    Buckets are labelled by their last calendar day; empty buckets are dropped.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["Date"] + columns)
+    rule = resample_rule(df["Date"].min(), df["Date"].max(), max_points)
+    series = df.set_index("Date")[columns].astype(float)
+    if rule != "D":
+        series = series.resample(rule).mean()
+    return series.dropna(how="all").reset_index()
+
+
+def density_grid(x: np.ndarray, y: np.ndarray, bins: int = DENSITY_BINS, clip=DENSITY_CLIP):
+    """2-D histogram of the finite (x, y) pairs: (counts[x_bin, y_bin], x centers, y centers)."""
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    if not len(x):
+        return np.zeros((bins, bins)), np.zeros(bins), np.zeros(bins)
+    low, high = np.percentile(y, clip)
+    y = np.clip(y, low, high)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return counts, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+
+def load_downsampled_sentiment(company: str, end_date, days: int = None, columns: list = None, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """`company`'s sentiment over the `days` up to `end_date` (all history when None), downsampled.
+
+    Returns (Date, company, columns...) rows shaped like the page loaders.
+    """
+    from dashboard.loaders import SENTIMENT_COLUMNS, load_sentiment_history
+
+    columns = SENTIMENT_COLUMNS if columns is None else columns
+    start_date = None if days is None else pd.Timestamp(end_date) - pd.Timedelta(days=days)
+    history = load_sentiment_history([company], start_date, columns)
+    history = history[history["Date"] <= pd.Timestamp(end_date)]
+    sampled = downsample(history, columns, max_points)
+    sampled.insert(1, "company", company)
+    return sampled
@@ -0,0 +1,164 @@
+"""Vectorized event study around sentiment spikes.
+
+An event is a (ticker, day) where a sentiment series crosses a threshold:
+`Negative` or `Fear` rising above it, or `Intent Sentiment` (mapped to
+buy=1, neutral=0, sell=-1) falling below it. Events are found across the whole
+universe with one comparison on the dates x tickers panel, and the returns
+around all of them are gathered into an (events, day offsets) matrix with a
+single fancy-indexing lookup into a NaN-padded return array, so tens of
+thousands of events over several years take well under a second.
+
+    factors, prices = load_event_panels(start_date="2022-01-01")
+    result = run_event_study(factors["Negative"], prices, threshold=0.8)
+    result.curve[["CAR", "CAR Low", "CAR High"]]
+"""
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from dashboard.db import TTLCache
+
+EVENT_FACTORS = ["Negative", "Fear", "Intent Sentiment"]
+INTENT_SCORES = {"buy": 1.0, "neutral": 0.0, "sell": -1.0}
+# (threshold, direction) per factor; "above" events fire when the series
+# rises through the threshold, "below" when it falls through it
+DEFAULT_THRESHOLDS = {"Negative": (0.8, "above"), "Fear": (0.5, "above"), "Intent Sentiment": (-0.5, "below")}
+DEFAULT_PRE = 5
+DEFAULT_POST = 10
+Z_95 = 1.959964
+
+_event_cache = TTLCache(ttl=24 * 60 * 60, maxsize=2)
+
+
+@dataclass
+class EventStudyResult:
+    """Detected events and the average (cumulative) abnormal return around them.
+
+    `curve` is indexed by day offset with AAR, CAR, their 95% bands and the
+    number of events contributing; `matrix` is the (events, offsets) array
+    of abnormal returns.
+    """
+
+    events: pd.DataFrame
+    curve: pd.DataFrame
+    matrix: np.ndarray = field(repr=False)
+
+
+# --- Data ---
+def load_event_panels(start_date=None, columns: list = None):
+    """One bulk fetch of the event factors as numeric panels, plus the close panel."""
+    from dashboard.alignment import sentiment_panels
+    from dashboard.loaders import load_price_history, load_sentiment_history, to_panel
+
+    columns = EVENT_FACTORS if columns is None else columns
+    prices = to_panel(load_price_history(start_date=start_date), "Close")
+    history = load_sentiment_history(start_date=start_date, columns=columns)
+    if "Intent Sentiment" in columns:
+        history["Intent Sentiment"] = intent_scores(history["Intent Sentiment"])
+    return sentiment_panels(history, columns, prices.index), prices
+
+
+def intent_scores(intent: pd.Series) -> np.ndarray:
+    """Numeric `INTENT_SCORES` of intent labels, mapped once per distinct label."""
+    intent = intent.astype("category")
+    labels = intent.cat.categories.astype(str).str.strip().str.lower()
+    scores = np.append(np.asarray(labels.map(INTENT_SCORES), dtype=float), np.nan)
+    # Missing labels have code -1, which picks the trailing NaN
+    return scores[intent.cat.codes.to_numpy()]
+
+
+def cached_event_panels(start_date, version):
+    """`load_event_panels` shared by every session, once per data version."""
+    return _event_cache.get_or_compute((str(start_date), version), lambda: load_event_panels(start_date))
+
+
+# --- Engine ---
+def abnormal_returns(prices: pd.DataFrame, adjust: str = "market") -> pd.DataFrame:
+    """Daily returns, minus the equal-weighted universe return when `adjust` is "market"."""
+    returns = prices / prices.shift(1) - 1
+    if adjust == "market":
+        returns = returns.sub(returns.mean(axis=1), axis=0)
+    return returns
+
+
+def detect_events(panel: pd.DataFrame, threshold: float, direction: str = "above") -> tuple:
+    """(date positions, ticker positions) where `panel` crosses `threshold`.
+
+    A crossing needs a valid previous observation on the other side, so a
+    series that stays above the threshold yields one event, not one per day.
+    """
+    values = panel.to_numpy(dtype=float)
+    previous = np.full_like(values, np.nan)
+    previous[1:] = values[:-1]
+    with np.errstate(invalid="ignore"):
+        if direction == "above":
+            crossed = (values > threshold) & (previous <= threshold)
+        else:
+            crossed = (values < threshold) & (previous >= threshold)
+    return np.nonzero(crossed)
+
+
+def event_matrix(returns: np.ndarray, date_pos: np.ndarray, ticker_pos: np.ndarray, pre: int, post: int) -> np.ndarray:
+    """(events, pre + post + 1) returns at offsets -pre..post around each event."""
+    padded = np.pad(returns, ((pre, post), (0, 0)), constant_values=np.nan)
+    rows = date_pos[:, None] + pre + np.arange(-pre, post + 1)
+    return padded[rows, ticker_pos[:, None]]
+
+
+def event_curve(matrix: np.ndarray, pre: int, post: int) -> pd.DataFrame:
+    """AAR and CAR by offset with 95% cross-event confidence bands.
+
+    CAR accumulates from the first offset; an event's missing returns count
+    as zero in its path but it is left out of the per-offset AAR count.
+    """
+    counts = np.isfinite(matrix).sum(axis=0)
+    paths = np.nancumsum(matrix, axis=1)
+    # No or single events leave NaN means and bands rather than warnings
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        aar = np.nanmean(matrix, axis=0)
+        aar_se = np.nanstd(matrix, axis=0, ddof=1) / np.sqrt(counts)
+        car = paths.mean(axis=0)
+        car_se = paths.std(axis=0, ddof=1) / np.sqrt(len(matrix))
+    return pd.DataFrame(
+        {
+            "AAR": aar,
+            "AAR Low": aar - Z_95 * aar_se,
+            "AAR High": aar + Z_95 * aar_se,
+            "CAR": car,
+            "CAR Low": car - Z_95 * car_se,
+            "CAR High": car + Z_95 * car_se,
+            "Events": counts,
+        },
+        index=pd.Index(np.arange(-pre, post + 1), name="Offset"),
+    )
+
+
+def run_event_study(
+    factor_panel: pd.DataFrame,
+    prices: pd.DataFrame,
+    threshold: float,
+    direction: str = "above",
+    pre: int = DEFAULT_PRE,
+    post: int = DEFAULT_POST,
+    adjust: str = "market",
+) -> EventStudyResult:
+    """Event study of threshold crossings of `factor_panel` on the price calendar.
+
+    Offset 0 is the sentiment date's own trading-day return.
+    """
+    factor_panel = factor_panel.reindex(index=prices.index, columns=prices.columns)
+    returns = abnormal_returns(prices, adjust).to_numpy(dtype=float)
+    date_pos, ticker_pos = detect_events(factor_panel, threshold, direction)
+    matrix = event_matrix(returns, date_pos, ticker_pos, pre, post)
+    events = pd.DataFrame(
+        {
+            "Date": prices.index[date_pos],
+            "Ticker": prices.columns[ticker_pos],
+            "Value": factor_panel.to_numpy(dtype=float)[date_pos, ticker_pos],
+            "CAR": np.nansum(matrix[:, pre:], axis=1),
+        }
+    )
+    return EventStudyResult(events=events, curve=event_curve(matrix, pre, post), matrix=matrix)
@@ -0,0 +1,243 @@
+"""Incrementally maintained rolling sentiment features.
+
+Per ticker and sentiment column the store keeps running state instead of raw
+history:
+
+- EWMA of the score (`span` observations)
+- rolling mean, standard deviation and z-score over the last `window`
+  observations, from a ring buffer with running sums
+- momentum: short EWMA minus long EWMA
+- Welford running mean and variance over the full history
+
+State lives in (tickers, columns) NumPy arrays. New rows are applied one
+observation date at a time, vectorized over every ticker that has a row that
+day, so a refresh only touches the delta since the watermark. Later revisions
+of a ticker's latest day, which `nlp.sentiment_aggregated_live` produces
+while the day is still open, roll that ticker back one step and re-apply it.
+
+Reading the features of a ticker is a dictionary lookup and a row slice.
+
+    store = current_feature_store(data_version())
+    store.features("AAPL")      # columns x features frame
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dashboard.loaders import SENTIMENT_COLUMNS
+
+FEATURE_COLUMNS = SENTIMENT_COLUMNS
+FEATURE_NAMES = ["Value", "EWMA", "Rolling Mean", "Rolling Std", "Z-Score", "Momentum", "Running Mean", "Running Std", "Count"]
+WINDOW = 20
+EWMA_SPAN = 10
+MOMENTUM_SPANS = (5, 20)
+# History replayed into a fresh store; later rows arrive as deltas
+BOOTSTRAP_DAYS = 365
+
+_STATE_FIELDS = ["last", "ewma", "fast", "slow", "count", "mean", "m2", "win_sum", "win_sumsq", "win_count", "win_pos"]
+
+
+class SentimentFeatureStore:
+    def __init__(self, columns: list = None, window: int = WINDOW, span: int = EWMA_SPAN, momentum_spans=MOMENTUM_SPANS):
+        self.columns = list(FEATURE_COLUMNS if columns is None else columns)
+        self.window = window
+        self.alpha = 2 / (span + 1)
+        self.fast_alpha, self.slow_alpha = (2 / (s + 1) for s in momentum_spans)
+        self.watermark = None
+        self._lock = threading.Lock()
+        self._index = {}
+        self._tickers = []
+        self._last_date = np.array([], dtype="datetime64[ns]")
+        self._state = {name: np.zeros((0, len(self.columns))) for name in _STATE_FIELDS}
+        self._buffer = np.zeros((0, window, len(self.columns)))
+        # One step of undo per ticker, for revisions of the latest day
+        self._previous = None
+
+    # --- State ---
+    def _rows_for(self, tickers) -> np.ndarray:
+        new = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._index]
+        if new:
+            for ticker in new:
+                self._index[ticker] = len(self._tickers)
+                self._tickers.append(ticker)
+            grow = len(new)
+            shape = (grow, len(self.columns))
+            for name in _STATE_FIELDS:
+                self._state[name] = np.concatenate([self._state[name], np.full(shape, np.nan if name in ("last", "ewma", "fast", "slow") else 0.0)])
+            self._buffer = np.concatenate([self._buffer, np.zeros((grow, self.window, len(self.columns)))])
+            self._last_date = np.concatenate([self._last_date, np.full(grow, np.datetime64("NaT"), dtype="datetime64[ns]")])
+            if self._previous is not None:
+                state, buffer, last_date = self._previous
+                self._previous = (
+                    {name: np.concatenate([state[name], self._state[name][-grow:]]) for name in _STATE_FIELDS},
+                    np.concatenate([buffer, self._buffer[-grow:]]),
+                    np.concatenate([last_date, self._last_date[-grow:]]),
+                )
+        return np.array([self._index[ticker] for ticker in tickers], dtype=int)
+
+    def _apply(self, rows: np.ndarray, values: np.ndarray):
+        """One observation per row of `rows` (an array of ticker positions)."""
+        s = self._state
+        observed = np.isfinite(values)
+        x = np.where(observed, values, 0.0)
+
+        def blend(name, alpha):
+            current = s[name][rows]
+            s[name][rows] = np.where(observed, np.where(np.isnan(current), x, current + alpha * (x - current)), current)
+
+        s["last"][rows] = np.where(observed, x, s["last"][rows])
+        blend("ewma", self.alpha)
+        blend("fast", self.fast_alpha)
+        blend("slow", self.slow_alpha)
+
+        # Welford
+        count = s["count"][rows] + observed
+        delta = x - s["mean"][rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(observed, s["mean"][rows] + delta / np.maximum(count, 1), s["mean"][rows])
+        s["m2"][rows] = np.where(observed, s["m2"][rows] + delta * (x - mean), s["m2"][rows])
+        s["mean"][rows], s["count"][rows] = mean, count
+
+        # Ring buffer: swap the oldest value in the window for the new one
+        pos = s["win_pos"][rows].astype(int)
+        slot = (rows[:, None], pos, np.arange(len(self.columns)))
+        old = np.where(s["win_count"][rows] >= self.window, self._buffer[slot], 0.0)
+        s["win_sum"][rows] += np.where(observed, x - old, 0.0)
+        s["win_sumsq"][rows] += np.where(observed, x * x - old * old, 0.0)
+        s["win_count"][rows] = np.where(observed, np.minimum(s["win_count"][rows] + 1, self.window), s["win_count"][rows])
+        self._buffer[slot] = np.where(observed, x, self._buffer[slot])
+        s["win_pos"][rows] = np.where(observed, (pos + 1) % self.window, pos)
+
+    def update(self, rows_df: pd.DataFrame) -> int:
+        """Apply (Date, Ticker, columns...) rows newer than each ticker's state.
+
+        Rows for a ticker's latest applied date replace that day's observation.
+        Returns the number of rows applied.
+        """
+        if rows_df.empty:
+            return 0
+        frame = rows_df.assign(Date=pd.to_datetime(rows_df["Date"], errors="coerce").dt.normalize())
+        frame = frame.dropna(subset=["Date"]).drop_duplicates(subset=["Ticker", "Date"], keep="last")
+        frame = frame.sort_values("Date", kind="stable")
+        dates = frame["Date"].to_numpy(dtype="datetime64[ns]")
+        all_values = frame[self.columns].to_numpy(dtype=float)
+        bounds = np.flatnonzero(np.diff(dates.astype("int64"))) + 1
+        applied = 0
+        with self._lock:
+            all_rows = self._rows_for(frame["Ticker"].tolist())
+            for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(dates)]):
+                rows, date = all_rows[start:stop], dates[start]
+                last = self._last_date[rows]
+                revision = last == date
+                fresh = np.isnat(last) | (last < date)
+                if revision.any():
+                    self._restore(rows[revision])
+                keep = revision | fresh
+                if not keep.any():
+                    continue
+                rows = rows[keep]
+                values = all_values[start:stop][keep]
+                self._checkpoint(rows)
+                self._apply(rows, values)
+                self._last_date[rows] = date
+                applied += len(rows)
+                self.watermark = pd.Timestamp(date) if self.watermark is None else max(self.watermark, pd.Timestamp(date))
+        return applied
+
+    def _checkpoint(self, rows: np.ndarray):
+        if self._previous is None:
+            self._previous = ({name: values.copy() for name, values in self._state.items()}, self._buffer.copy(), self._last_date.copy())
+            return
+        state, buffer, last_date = self._previous
+        for name in _STATE_FIELDS:
+            state[name][rows] = self._state[name][rows]
+        buffer[rows] = self._buffer[rows]
+        last_date[rows] = self._last_date[rows]
+
+    def _restore(self, rows: np.ndarray):
+        state, buffer, last_date = self._previous
+        for name in _STATE_FIELDS:
+            self._state[name][rows] = state[name][rows]
+        self._buffer[rows] = buffer[rows]
+        self._last_date[rows] = last_date[rows]
+
+    # --- Reads ---
+    def _features(self, rows) -> np.ndarray:
+        s = self._state
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = s["win_count"][rows]
+            rolling_mean = s["win_sum"][rows] / n
+            rolling_var = np.maximum(s["win_sumsq"][rows] / n - rolling_mean ** 2, 0.0) * n / (n - 1)
+            rolling_std = np.sqrt(np.where(n > 1, rolling_var, np.nan))
+            z_score = (s["last"][rows] - rolling_mean) / np.where(rolling_std > 0, rolling_std, np.nan)
+            count = s["count"][rows]
+            running_std = np.sqrt(np.where(count > 1, s["m2"][rows] / (count - 1), np.nan))
+        return np.stack(
+            [
+                s["last"][rows],
+                s["ewma"][rows],
+                np.where(n > 0, rolling_mean, np.nan),
+                rolling_std,
+                z_score,
+                s["fast"][rows] - s["slow"][rows],
+                np.where(count > 0, s["mean"][rows], np.nan),
+                running_std,
+                count,
+            ],
+            axis=-1,
+        )
+
+    def features(self, ticker: str) -> pd.DataFrame:
+        """Columns x features frame for one ticker (empty if it has no data)."""
+        with self._lock:
+            row = self._index.get(ticker)
+            if row is None:
+                return pd.DataFrame(columns=FEATURE_NAMES)
+            values = self._features(row)
+        return pd.DataFrame(values, index=pd.Index(self.columns, name="Sentiment"), columns=FEATURE_NAMES)
+
+    def as_of(self, ticker: str):
+        """Date of the latest observation applied for `ticker`."""
+        with self._lock:
+            row = self._index.get(ticker)
+            return None if row is None else pd.Timestamp(self._last_date[row]).date()
+
+    def snapshot(self, feature: str = "Z-Score") -> pd.DataFrame:
+        """Tickers x columns frame of one feature, e.g. as a backtest signal."""
+        with self._lock:
+            values = self._features(np.arange(len(self._tickers)))[..., FEATURE_NAMES.index(feature)]
+        return pd.DataFrame(values, index=pd.Index(self._tickers, name="Ticker"), columns=self.columns)
+
+
+# --- Process-wide store ---
+_store = None
+_store_version = None
+_store_lock = threading.Lock()
+
+
+def refresh_features(store: SentimentFeatureStore, start_date=None) -> int:
+    """Pull rows on or after the watermark (or `start_date` for a new store) and apply them."""
+    from dashboard.loaders import load_sentiment_history
+
+    since = store.watermark if store.watermark is not None else start_date
+    rows = load_sentiment_history(start_date=since, columns=store.columns)
+    return store.update(rows)
+
+
+def current_feature_store(version=None) -> SentimentFeatureStore:
+    """The shared store, brought up to date once per data version.
+
+    The first call replays `BOOTSTRAP_DAYS` of history; later versions only
+    fetch and apply the rows from the watermark day onwards.
+    """
+    global _store, _store_version
+    with _store_lock:
+        if _store is None:
+            _store = SentimentFeatureStore()
+            refresh_features(_store, (pd.Timestamp.today().normalize() - pd.Timedelta(days=BOOTSTRAP_DAYS)).date())
+            _store_version = version
+        elif version != _store_version:
+            refresh_features(_store)
+            _store_version = version
+        return _store
@@ -0,0 +1,134 @@
+"""Background job runner shared by every session of the server process.
+
+Long computations (backtests) run on a small worker pool instead of the
+Streamlit script thread. Submitting a job whose key matches one already
+queued or running returns that job rather than starting a duplicate, and
+finished results are cached by (data watermark, key) so re-running on
+unchanged data returns immediately.
+
+A job function receives two callables: `progress(fraction, message)` to
+report how far it got, and `cancelled()` which it should check between steps
+and answer by raising `JobCancelled`.
+"""
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard.db import TTLCache
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+RESULT_TTL_SECONDS = 24 * 60 * 60
+# Finished jobs stay visible to polling pages for this long
+JOB_RETENTION_SECONDS = 60 * 60
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id: int, key):
+        self.id = job_id
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == QUEUED:
+            self.message = "Cancelling"
+
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, fraction: float, message: str = ""):
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message:
+            self.message = message
+
+
+class JobRunner:
+    def __init__(self, max_workers: int = 2, result_ttl: float = RESULT_TTL_SECONDS, max_results: int = 32):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qf5214-job")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._in_flight = {}
+        self.results = TTLCache(ttl=result_ttl, maxsize=max_results)
+
+    def submit(self, key, func, watermark=None) -> Job:
+        """Queue `func(progress, cancelled)` under `key`, reusing in-flight or cached work."""
+        cache_key = (watermark, key)
+        with self._lock:
+            hit, result = self.results.get(cache_key)
+            if hit:
+                job = self._new_job(key)
+                job.status, job.progress, job.message, job.result = DONE, 1.0, "Cached result", result
+                job.finished_at = time.time()
+                return job
+
+            job = self._in_flight.get(cache_key)
+            if job is not None and not job.cancelled():
+                return job
+
+            job = self._new_job(key)
+            self._in_flight[cache_key] = job
+        self._pool.submit(self._run, job, func, cache_key)
+        return job
+
+    def get(self, job_id: int):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _new_job(self, key) -> Job:
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+        job = Job(next(self._ids), key)
+        self._jobs[job.id] = job
+        return job
+
+    def _run(self, job: Job, func, cache_key):
+        try:
+            if job.cancelled():
+                raise JobCancelled()
+            job.status = RUNNING
+            job.message = "Running"
+            job.result = func(job.report, job.cancelled)
+            job.report(1.0, "Completed")
+            job.status = DONE
+            self.results.set(cache_key, job.result)
+        except JobCancelled:
+            job.status = CANCELLED
+            job.message = "Cancelled"
+        except Exception as e:
+            job.status = FAILED
+            job.error = e
+            job.message = "".join(traceback.format_exception_only(type(e), e)).strip()
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._in_flight.get(cache_key) is job:
+                    del self._in_flight[cache_key]
+
+
+backtest_jobs = JobRunner()
+# Significance tests and other on-demand analyses, kept off the backtest queue
+analysis_jobs = JobRunner()
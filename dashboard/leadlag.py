@@ -0,0 +1,87 @@
+"""Rolling lead-lag correlation between sentiment and returns.
+
+For a lag k the pair is (sentiment on day t, return on day t + k): positive
+lags ask whether sentiment leads price, negative lags whether it follows it.
+Every lag is laid out as one row of a (lags, dates) array and the rolling
+correlation of all rows comes from cumulative sums of x, y, x^2, y^2 and xy:
+each window is a difference of two prefix sums, so the cost does not grow
+with the window length and no window is recomputed from scratch.
+
+    rolling, overall = lead_lag(sentiment_series, return_series, lags=range(-5, 6), window=60)
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.alignment import align_returns
+
+DEFAULT_MAX_LAG = 5
+DEFAULT_WINDOW = 60
+
+
+def lagged_returns(returns: np.ndarray, lags) -> np.ndarray:
+    """(lags, ..., dates) array whose row k at t holds the return at t + k."""
+    returns = np.asarray(returns, dtype=float)
+    out = np.full((len(lags),) + returns.shape, np.nan)
+    length = returns.shape[-1]
+    for i, lag in enumerate(lags):
+        if lag >= 0:
+            out[i, ..., : length - lag] = returns[..., lag:]
+        else:
+            out[i, ..., -lag:] = returns[..., : length + lag]
+    return out
+
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int, min_periods: int = None) -> np.ndarray:
+    """Trailing-window Pearson correlation along the last axis from prefix sums.
+
+    Pairs with a missing value are skipped. Both series are centred first, so
+    the prefix sums stay small and the differences do not lose precision.
+    """
+    min_periods = window // 2 if min_periods is None else min_periods
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    valid = np.isfinite(x) & np.isfinite(y)
+    with np.errstate(invalid="ignore"):
+        x = np.where(valid, x - np.nanmean(np.where(valid, x, np.nan), axis=-1, keepdims=True), 0.0)
+        y = np.where(valid, y - np.nanmean(np.where(valid, y, np.nan), axis=-1, keepdims=True), 0.0)
+
+    def window_sums(values):
+        prefix = np.cumsum(values, axis=-1)
+        sums = prefix.copy()
+        sums[..., window:] = prefix[..., window:] - prefix[..., :-window]
+        return sums
+
+    n = window_sums(valid.astype(float))
+    sx, sy = window_sums(x), window_sums(y)
+    sxx, syy, sxy = window_sums(x * x), window_sums(y * y), window_sums(x * y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr = np.where((n >= max(min_periods, 3)) & (var_x > 1e-12) & (var_y > 1e-12), corr, np.nan)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def full_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Whole-sample correlation along the last axis over pairs where both are finite."""
+    from dashboard.ic import masked_correlation
+
+    return masked_correlation(*np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float)), min_obs=3)
+
+
+def lead_lag(sentiment: pd.Series, returns: pd.Series, lags=None, window: int = DEFAULT_WINDOW):
+    """Rolling (dates x lags) and whole-sample (per lag) sentiment/return correlations.
+
+    Both series must share the same index of trading dates.
+    """
+    lags = list(range(-DEFAULT_MAX_LAG, DEFAULT_MAX_LAG + 1) if lags is None else lags)
+    x = sentiment.to_numpy(dtype=float)
+    y = lagged_returns(returns.to_numpy(dtype=float), lags)
+    rolling = pd.DataFrame(rolling_correlation(x, y, window).T, index=sentiment.index, columns=lags)
+    overall = pd.Series(full_correlation(x, y), index=lags, name="Correlation")
+    return rolling.rename_axis(columns="Lag"), overall.rename_axis("Lag")
+
+
+def align_daily(sentiment_df: pd.DataFrame, stock_df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """Sentiment `columns` and close-to-close Return on the trading dates of `stock_df`."""
+    return align_returns(sentiment_df, stock_df, columns).set_index("Date")[columns + ["Return"]]
@@ -0,0 +1,161 @@
+"""Live tail of `nlp.sentiment_aggregated_live`.
+
+The live table is rewritten in place while the trading day is open, one
+aggregated row per company and day. Instead of re-running the page loaders,
+one process-wide `LiveTail` polls for rows on or after the last date it has
+seen (in practice only the open day) and appends the rows that are new or
+changed to per-ticker, append-only buffers. Every point gets a sequence
+number, so a chart asks for "points after the last one I drew" and gets only
+those.
+
+However many sessions are open, the database sees at most one small query per
+`TAIL_POLL_SECONDS`, which lets the trend charts refresh every few seconds
+instead of once per refresh window.
+
+The tail is off whenever the Parquet mirror serves reads (`QF5214_MIRROR`):
+the mirror only syncs once per refresh window, so polling it every few
+seconds would re-scan local files without ever seeing a newer row.
+
+    tail = live_tail()
+    tail.poll()
+    new_points, seq = tail.points("AAPL", after=last_seq)
+"""
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard.db import read_sql
+from dashboard.loaders import SENTIMENT_COLUMNS, USE_MIRROR, compact_sentiment
+from dashboard.queries import select
+
+logger = logging.getLogger(__name__)
+
+LIVE_TABLE = "nlp.sentiment_aggregated_live"
+TAIL_COLUMNS = SENTIMENT_COLUMNS + ["Intent Sentiment"]
+
+# Poll the live table every few seconds and push new points to the trend
+# charts; off by default until the live writer runs during market hours, and
+# always off on the mirror, which cannot see rows newer than its last sync
+LIVE_TAIL = os.environ.get("QF5214_LIVE_TAIL", "0") == "1" and not USE_MIRROR
+TAIL_POLL_SECONDS = 5
+# Days fetched by the first poll of a fresh tail
+TAIL_START_DAYS = 7
+# Points older than this (relative to the last seen date) are dropped
+TAIL_RETENTION_DAYS = 7
+
+
+def _fetch_since(since, columns: list) -> pd.DataFrame:
+    """Live rows dated on or after `since`, as (Date, Ticker, columns...)."""
+    query, params = select(LIVE_TABLE, ["Date", "company"] + columns, source_start_date=pd.Timestamp(since).date())
+    df = read_sql(query, params, ttl=TAIL_POLL_SECONDS)
+    df["Ticker"] = df.pop("company").astype(str).str.lstrip("$")
+    return df
+
+
+class LiveTail:
+    def __init__(self, columns: list = None, poll_seconds: float = TAIL_POLL_SECONDS):
+        self.columns = list(TAIL_COLUMNS if columns is None else columns)
+        self.poll_seconds = poll_seconds
+        self.seq = 0
+        self.last_key = None
+        self._lock = threading.Lock()
+        self._last_poll = None
+        # ticker -> list of (seq, date, values); values are tuples with None for missing
+        self._buffers = {}
+        self._latest = {}
+
+    def poll(self, force: bool = False) -> int:
+        """Fetch rows past the last seen date and append the new or changed ones.
+
+        Calls within `poll_seconds` of the previous poll return immediately,
+        and a failed fetch is logged and leaves the buffers as they were.
+        Returns the number of points appended.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_poll is not None and now - self._last_poll < self.poll_seconds:
+                return 0
+            self._last_poll = now
+            since = self.last_key
+            if since is None:
+                since = pd.Timestamp.today().normalize() - pd.Timedelta(days=TAIL_START_DAYS)
+            try:
+                rows = _fetch_since(since, self.columns)
+            except Exception as e:
+                logger.warning("Live tail poll of %s failed: %s", LIVE_TABLE, e)
+                return 0
+            return self._append(rows)
+
+    def _append(self, rows_df: pd.DataFrame) -> int:
+        if rows_df.empty:
+            return 0
+        frame = rows_df.assign(Date=pd.to_datetime(rows_df["Date"], errors="coerce").dt.normalize())
+        frame = frame.dropna(subset=["Date"]).drop_duplicates(subset=["Ticker", "Date"], keep="last")
+        frame = frame.sort_values("Date", kind="stable")
+        values = frame[self.columns].astype(object)
+        values = values.where(values.notna(), None)
+
+        appended = 0
+        for ticker, date, row in zip(frame["Ticker"], frame["Date"], values.itertuples(index=False, name=None)):
+            if self._latest.get((ticker, date)) == row:
+                continue
+            self.seq += 1
+            self._latest[(ticker, date)] = row
+            self._buffers.setdefault(ticker, []).append((self.seq, date, row))
+            appended += 1
+        self.last_key = frame["Date"].max() if self.last_key is None else max(self.last_key, frame["Date"].max())
+        self._trim()
+        return appended
+
+    def _trim(self):
+        cutoff = self.last_key - pd.Timedelta(days=TAIL_RETENTION_DAYS)
+        for ticker, points in self._buffers.items():
+            if points and points[0][1] < cutoff:
+                self._buffers[ticker] = [point for point in points if point[1] >= cutoff]
+        self._latest = {key: row for key, row in self._latest.items() if key[1] >= cutoff}
+
+    def points(self, ticker: str, after: int = 0):
+        """(Date, company, columns...) points for `ticker` appended after sequence `after`, and the latest sequence.
+
+        A revised day shows up again with its new values; callers keep the
+        last point per date.
+        """
+        with self._lock:
+            points = self._buffers.get(ticker, [])
+            # Sequence numbers only grow, so new points are a suffix
+            seqs = np.fromiter((point[0] for point in points), dtype=np.int64, count=len(points))
+            new = points[int(np.searchsorted(seqs, after, side="right")):]
+            seq = points[-1][0] if points else after
+        if not new:
+            return pd.DataFrame(columns=["Date", "company"] + self.columns), seq
+        frame = pd.DataFrame([row for _, _, row in new], columns=self.columns)
+        frame.insert(0, "company", ticker)
+        frame.insert(0, "Date", [date for _, date, _ in new])
+        return compact_sentiment(frame), max(seq, after)
+
+
+# --- Process-wide tail ---
+_tail = None
+_tail_lock = threading.Lock()
+
+
+def live_tail() -> LiveTail:
+    """The shared tail; created on first use."""
+    global _tail
+    with _tail_lock:
+        if _tail is None:
+            _tail = LiveTail()
+        return _tail
+
+
+def merge_live_points(page_df: pd.DataFrame, live_df: pd.DataFrame, after_date) -> pd.DataFrame:
+    """`page_df` with the live points dated after `after_date` appended, latest value per date."""
+    live_df = live_df[live_df["Date"] > pd.Timestamp(after_date)]
+    if live_df.empty:
+        return page_df
+    merged = pd.concat([page_df, live_df], ignore_index=True)
+    return merged.drop_duplicates(subset=["Date"], keep="last").sort_values("Date").reset_index(drop=True)
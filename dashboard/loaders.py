@@ -0,0 +1,374 @@
+"""Query helpers shared by the dashboard pages.
+
+All reads go through `dashboard.db.read_sql`, so repeated calls inside one
+refresh window are served from the process-wide cache.
+"""
+import os
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+from dashboard.db import read_sql, read_sql_many
+from dashboard.queries import LATEST_TRADING_DATE, select
+from dashboard.store import STORE_TABLE
+
+SENTIMENT_TABLES = [
+    "nlp.sentiment_aggregated_data",
+    "nlp.sentiment_aggregated_live",
+    "nlp.sentiment_aggregated_newdate",
+]
+
+SENTIMENT_COLUMNS = ["Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust", "Positive", "Negative", "Neutral"]
+PNN_COLUMNS = ["Positive", "Negative", "Neutral"]
+
+# Days of history behind each trend-chart timeframe
+TIMEFRAME_DAYS = {"1W": 5, "1M": 30}
+
+# Calendar days of trading dates the pages load to find T-1; a few weeks
+# covers any market holiday, so the full price history is never scanned
+CALENDAR_LOOKBACK_DAYS = 30
+
+# Query the three sentiment tables in parallel rather than one after another
+CONCURRENT_FETCH = True
+
+# Read sentiment from the consolidated store (see dashboard/store.py) instead
+# of unioning the three source tables; enable once the refresh job is running
+USE_SENTIMENT_STORE = os.environ.get("QF5214_SENTIMENT_STORE", "0") == "1"
+
+# Serve reads from the local Parquet mirror (see dashboard/mirror.py):
+# "on" syncs new rows each refresh window, "offline" never touches Postgres
+USE_MIRROR = os.environ.get("QF5214_MIRROR", "off") != "off"
+
+# Load every ticker held on the latest trading date in one query per table,
+# so switching companies on a page is an in-memory lookup
+PREFETCH_UNIVERSE = True
+
+# Sentiment frames leave the loaders in one compact, typed layout: float32
+# scores, categorical ticker/company/intent labels and datetime64 dates, so
+# pages and engines never re-coerce them and the per-process caches stay small
+SCORE_DTYPE = "float32"
+LABEL_COLUMNS = ["company", "Ticker", "Intent Sentiment"]
+
+
+def _mirror(dataset: str):
+    # Imported lazily so pyarrow is only needed when the mirror is enabled
+    from dashboard import mirror
+
+    mirror.ensure_synced(dataset, USE_SENTIMENT_STORE)
+    return mirror
+
+
+# --- Trading strategy ---
+def load_latest_trading_date():
+    if USE_MIRROR:
+        holdings = _mirror("dailytrading").read("dailytrading", columns=["Date"])
+        return pd.to_datetime(holdings["Date"].max()).date()
+
+    latest_date_result = read_sql(LATEST_TRADING_DATE)
+    latest_trading_date = latest_date_result["latest_date"].iloc[0]
+    return pd.to_datetime(latest_trading_date).date()
+
+
+def load_tickers(latest_trading_date) -> pd.DataFrame:
+    if USE_MIRROR:
+        holdings = _mirror("dailytrading").read("dailytrading", dates=[latest_trading_date])
+        return holdings[["Ticker", "Position_Type"]].drop_duplicates().sort_values("Ticker").reset_index(drop=True)
+
+    return read_sql(*select(
+        "tradingstrategy.dailytrading", ["Ticker", "Position_Type"], order_by=["Ticker"], distinct=True,
+        date=pd.Timestamp(latest_trading_date).date(),
+    ))
+
+
+def load_positions(latest_trading_date) -> pd.DataFrame:
+    if USE_MIRROR:
+        holdings = _mirror("dailytrading").read("dailytrading", dates=[latest_trading_date])
+        return holdings[["Ticker", "Position_Type"]].sort_values(["Position_Type", "Ticker"]).reset_index(drop=True)
+
+    return read_sql(*select(
+        "tradingstrategy.dailytrading", ["Ticker", "Position_Type"], order_by=["Position_Type", "Ticker"],
+        date=pd.Timestamp(latest_trading_date).date(),
+    ))
+
+
+def load_holdings_history(start_date=None) -> pd.DataFrame:
+    """Every (Date, Ticker, Position_Type) row of `tradingstrategy.dailytrading` on or after `start_date`."""
+    if USE_MIRROR:
+        holdings = _mirror("dailytrading").read("dailytrading", columns=["Date", "Ticker", "Position_Type"], start_date=start_date)
+    else:
+        holdings = read_sql(*select(
+            "tradingstrategy.dailytrading", ["Date", "Ticker", "Position_Type"], start_date=_as_date(start_date)
+        ))
+    holdings["Date"] = pd.to_datetime(holdings["Date"], errors="coerce")
+    return holdings.dropna(subset=["Date"]).sort_values(["Date", "Ticker"]).reset_index(drop=True)
+
+
+# --- Sentiment ---
+def compact_sentiment(df: pd.DataFrame) -> pd.DataFrame:
+    """Sentiment rows in the compact layout; rows with an unparseable Date are dropped.
+
+    Columns already in the target dtype are left alone, so this is cheap to
+    apply to a frame that is already compact.
+    """
+    if "Date" in df and not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+        df = df.dropna(subset=["Date"])
+    for col in SENTIMENT_COLUMNS:
+        if col in df and df[col].dtype != SCORE_DTYPE:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(SCORE_DTYPE)
+    for col in LABEL_COLUMNS:
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _fetch_sentiment_sources(queries: list, concurrent: bool = None, warn: bool = True) -> pd.DataFrame:
+    # Results come back in SENTIMENT_TABLES order, so keep="last" dedup still
+    # lets the later table win
+    if concurrent is None:
+        concurrent = CONCURRENT_FETCH
+    frames = []
+    for table, result in zip(SENTIMENT_TABLES, read_sql_many(queries, concurrent=concurrent)):
+        if isinstance(result, Exception):
+            if warn:
+                st.warning(f"Failed to fetch from {table}: {result}")
+            continue
+        frames.append(result)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _one_year_ago():
+    return (pd.Timestamp.today().normalize() - pd.DateOffset(years=1)).date()
+
+
+def _as_date(value):
+    return None if value is None else pd.Timestamp(value).date()
+
+
+def _source_queries(columns: list, tickers: list = None, start_date=None, end_date=None) -> list:
+    """One `(statement, params)` per sentiment source table, in `SENTIMENT_TABLES` order."""
+    companies = None if tickers is None else _company_keys(tickers)
+    return [
+        select(table, ["Date", "company"] + columns, companies=companies,
+               source_start_date=_as_date(start_date), source_end_date=_as_date(end_date))
+        for table in SENTIMENT_TABLES
+    ]
+
+
+def _load_store(columns: list, tickers: list, start_date=None, end_date=None) -> pd.DataFrame:
+    # Already typed, normalized and deduplicated, so this is a plain
+    # ("Ticker", "Date") index range scan
+    df = read_sql(*select(
+        STORE_TABLE, ["Date", "Ticker"] + columns, order_by=["Ticker", "Date"],
+        tickers=tickers, start_date=_as_date(start_date), end_date=_as_date(end_date),
+    ))
+    return compact_sentiment(df.rename(columns={"Ticker": "company"}))
+
+
+def _load_normalized(columns: list, tickers: list, start_date=None, end_date=None) -> pd.DataFrame:
+    # Mirror and store hold the same deduplicated, one-row-per-ticker-and-day
+    # layout, so both come back shaped like the table-union loaders
+    if not USE_MIRROR:
+        return _load_store(columns, tickers, start_date, end_date)
+
+    df = _mirror("sentiment").read(
+        "sentiment", columns=["Ticker", "Date"] + columns, tickers=tickers, start_date=start_date, end_date=end_date
+    )
+    df = df.rename(columns={"Ticker": "company"})[["Date", "company"] + columns]
+    return compact_sentiment(df.sort_values(["company", "Date"]).reset_index(drop=True))
+
+
+def _load_combined(columns: list, company: str, start_date: str, end_date: str, concurrent: bool = None) -> pd.DataFrame:
+    if USE_SENTIMENT_STORE or USE_MIRROR:
+        normalized_df = _load_normalized(columns, [company], start_date, end_date)
+        return normalized_df if not normalized_df.empty else pd.DataFrame()
+
+    combined_df = _fetch_sentiment_sources(_source_queries(columns, [company], start_date, end_date), concurrent)
+
+    if not combined_df.empty:
+        combined_df.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
+        return compact_sentiment(combined_df).sort_values("Date")
+    return pd.DataFrame()
+
+
+def load_combined_sentiment_data(company: str, start_date: str, end_date: str, concurrent: bool = None) -> pd.DataFrame:
+    return _load_combined(SENTIMENT_COLUMNS + ["Intent Sentiment"], company, start_date, end_date, concurrent)
+
+
+def load_combined_pnn_data(company: str, start_date: str, end_date: str, concurrent: bool = None) -> pd.DataFrame:
+    return _load_combined(PNN_COLUMNS, company, start_date, end_date, concurrent)
+
+
+def load_page_sentiment(company: str, sentiment_date, concurrent: bool = None) -> pd.DataFrame:
+    """All sentiment columns over the widest trends-page window, ending at `sentiment_date`.
+
+    The T-1 score table and every timeframe of the trend charts are sliced
+    from this one frame with `slice_dates`.
+    """
+    start_date = sentiment_date - timedelta(days=max(TIMEFRAME_DAYS.values()))
+    return load_combined_sentiment_data(
+        company, start_date.strftime('%Y/%m/%d'), sentiment_date.strftime('%Y/%m/%d'), concurrent
+    )
+
+
+def slice_dates(df: pd.DataFrame, start_date, end_date) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame()
+    mask = (df["Date"] >= pd.Timestamp(start_date)) & (df["Date"] <= pd.Timestamp(end_date))
+    return df.loc[mask].copy()
+
+
+def load_sentiment_last_year(company: str, concurrent: bool = None) -> pd.DataFrame:
+    if USE_SENTIMENT_STORE or USE_MIRROR:
+        return _load_normalized(PNN_COLUMNS, [company], _one_year_ago())
+
+    sentiment_data = _fetch_sentiment_sources(_source_queries(PNN_COLUMNS, [company], _one_year_ago()), concurrent, warn=False)
+
+    if sentiment_data.empty:
+        return pd.DataFrame(columns=["Date", "company"] + PNN_COLUMNS)
+    sentiment_data.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
+    return compact_sentiment(sentiment_data)
+
+
+# --- Universe prefetch ---
+def _company_keys(tickers: list) -> list:
+    # Sentiment rows are stored under both "X" and "$X"
+    return [key for ticker in tickers for key in (ticker, f"${ticker}")]
+
+
+def _index_by_ticker(df: pd.DataFrame) -> pd.DataFrame:
+    df["Ticker"] = df["company"].astype(str).str.lstrip("$")
+    return compact_sentiment(df).sort_values(["Ticker", "Date"]).set_index("Ticker")
+
+
+def load_universe_sentiment(tickers: list, start_date: str, end_date: str, columns: list = None, concurrent: bool = None) -> pd.DataFrame:
+    """Sentiment for every ticker in `tickers`, indexed by ticker.
+
+    Each sentiment table is hit once with an `ANY(array)` filter instead of
+    once per company; dedup follows the per-ticker loaders.
+    """
+    columns = SENTIMENT_COLUMNS + ["Intent Sentiment"] if columns is None else columns
+    if USE_SENTIMENT_STORE or USE_MIRROR:
+        return _index_by_ticker(_load_normalized(columns, tickers, start_date, end_date))
+
+    combined_df = _fetch_sentiment_sources(_source_queries(columns, tickers, start_date, end_date), concurrent)
+    if combined_df.empty:
+        return pd.DataFrame(columns=["Date", "company"] + columns).rename_axis("Ticker")
+
+    combined_df.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
+    return _index_by_ticker(combined_df)
+
+
+def load_universe_page_sentiment(tickers: list, sentiment_date, concurrent: bool = None) -> pd.DataFrame:
+    start_date = sentiment_date - timedelta(days=max(TIMEFRAME_DAYS.values()))
+    return load_universe_sentiment(
+        tickers, start_date.strftime('%Y/%m/%d'), sentiment_date.strftime('%Y/%m/%d'), concurrent=concurrent
+    )
+
+
+def load_universe_sentiment_last_year(tickers: list, concurrent: bool = None) -> pd.DataFrame:
+    if USE_SENTIMENT_STORE or USE_MIRROR:
+        return _index_by_ticker(_load_normalized(PNN_COLUMNS, tickers, _one_year_ago()))
+
+    sentiment_data = _fetch_sentiment_sources(_source_queries(PNN_COLUMNS, tickers, _one_year_ago()), concurrent, warn=False)
+    if sentiment_data.empty:
+        return pd.DataFrame(columns=["Date", "company"] + PNN_COLUMNS).rename_axis("Ticker")
+
+    sentiment_data.drop_duplicates(subset=["Date", "company"], keep="last", inplace=True)
+    return _index_by_ticker(sentiment_data)
+
+
+def load_universe_prices_last_year(tickers: list) -> pd.DataFrame:
+    if USE_MIRROR:
+        stock_df = _mirror("stock_data").read(
+            "stock_data", columns=["Date", "Ticker", "Close"], tickers=tickers, start_date=_one_year_ago()
+        )
+        return stock_df.sort_values(["Ticker", "Date"]).set_index("Ticker", drop=False).rename_axis(None)
+
+    stock_df = read_sql(*select(
+        "datacollection.stock_data", ["Date", "Ticker", "Close"], tickers=list(tickers), start_date=_one_year_ago()
+    ))
+    stock_df["Date"] = pd.to_datetime(stock_df["Date"], errors="coerce")
+    return stock_df.sort_values(["Ticker", "Date"]).set_index("Ticker", drop=False).rename_axis(None)
+
+
+def select_ticker(universe_df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """Rows of a ticker-indexed universe frame for one ticker, with a fresh index."""
+    if ticker not in universe_df.index:
+        return pd.DataFrame(columns=universe_df.columns)
+    return universe_df.loc[[ticker]].reset_index(drop=True)
+
+
+# --- Prices ---
+def load_stock_prices_last_year(company: str) -> pd.DataFrame:
+    if USE_MIRROR:
+        stock_df = _mirror("stock_data").read(
+            "stock_data", columns=["Date", "Ticker", "Close"], tickers=[company], start_date=_one_year_ago()
+        )
+        return stock_df.sort_values("Date").reset_index(drop=True)
+
+    stock_df = read_sql(*select(
+        "datacollection.stock_data", ["Date", "Ticker", "Close"], tickers=[company], start_date=_one_year_ago()
+    ))
+    stock_df["Date"] = pd.to_datetime(stock_df["Date"], errors="coerce")
+    return stock_df
+
+
+def load_trading_calendar(start_date=None) -> pd.DatetimeIndex:
+    """Every date with a close in `datacollection.stock_data` on or after `start_date`, sorted.
+
+    Without `start_date` this scans the whole table; pages pass their window start.
+    """
+    from dashboard.alignment import trading_calendar
+
+    if USE_MIRROR:
+        dates = _mirror("stock_data").read("stock_data", columns=["Date"], start_date=start_date)["Date"]
+    else:
+        dates = read_sql(*select("datacollection.stock_data", ["Date"], distinct=True, start_date=_as_date(start_date)))["Date"]
+    return trading_calendar(dates)
+
+
+# --- Research panels ---
+def load_price_history(tickers: list = None, start_date=None) -> pd.DataFrame:
+    """Daily closes as (Date, Ticker, Close) rows; every ticker when `tickers` is None."""
+    if USE_MIRROR:
+        stock_df = _mirror("stock_data").read(
+            "stock_data", columns=["Date", "Ticker", "Close"], tickers=tickers, start_date=start_date
+        )
+    else:
+        stock_df = read_sql(*select(
+            "datacollection.stock_data", ["Date", "Ticker", "Close"], tickers=tickers, start_date=_as_date(start_date)
+        ))
+
+    stock_df["Date"] = pd.to_datetime(stock_df["Date"], errors="coerce")
+    stock_df["Close"] = pd.to_numeric(stock_df["Close"], errors="coerce")
+    stock_df = stock_df.dropna(subset=["Date"]).drop_duplicates(subset=["Ticker", "Date"], keep="last")
+    return stock_df.sort_values(["Ticker", "Date"]).reset_index(drop=True)
+
+
+def load_sentiment_history(tickers: list = None, start_date=None, columns: list = None, concurrent: bool = None) -> pd.DataFrame:
+    """Sentiment as one (Date, Ticker, ...) row per ticker and day, later sources winning.
+
+    Unlike the page loaders, "$X" rows are folded into "X" on every path so
+    the result can be pivoted straight into a dates x tickers panel.
+    """
+    columns = SENTIMENT_COLUMNS if columns is None else columns
+    if USE_SENTIMENT_STORE or USE_MIRROR:
+        sentiment_df = _load_normalized(columns, tickers, start_date).rename(columns={"company": "Ticker"})
+    else:
+        sentiment_df = _fetch_sentiment_sources(_source_queries(columns, tickers, start_date), concurrent, warn=False)
+        if sentiment_df.empty:
+            return pd.DataFrame(columns=["Date", "Ticker"] + columns)
+        sentiment_df["Ticker"] = sentiment_df.pop("company").astype(str).str.lstrip("$")
+        sentiment_df = compact_sentiment(sentiment_df).drop_duplicates(subset=["Ticker", "Date"], keep="last")
+
+    return compact_sentiment(sentiment_df[["Date", "Ticker"] + columns]).sort_values(["Ticker", "Date"]).reset_index(drop=True)
+
+
+def to_panel(df: pd.DataFrame, value: str) -> pd.DataFrame:
+    """Pivot (Date, Ticker, value) rows into a dates x tickers frame."""
+    return df.pivot(index="Date", columns="Ticker", values=value).sort_index()
@@ -0,0 +1,238 @@
+"""Local Parquet mirror of sentiment, prices and daily holdings.
+
+Each dataset lives under `MIRROR_DIR/<dataset>/month=YYYY-MM/part.parquet`,
+sorted by ticker then date so both partition pruning and row-group statistics
+can skip data a loader does not ask for. `sync` pulls only rows on or after
+the dataset's watermark (minus a small overlap for late-arriving rows) and
+rewrites the affected month partitions.
+
+Run `python -m dashboard.mirror` to sync by hand. Loaders use the mirror when
+`QF5214_MIRROR` is set:
+
+* ``on``      - read locally and sync at most once per refresh window on a
+                background job, so a slow or unreachable database never
+                holds up a page; only a dataset with nothing on disk yet is
+                synced inline.
+* ``offline`` - never touch the database; read only what is on disk.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from dashboard.db import QUERY_TTL_SECONDS, read_sql, read_sql_many
+from dashboard.jobs import JobRunner
+from dashboard.queries import select
+from dashboard.store import SCORE_COLUMNS, SOURCE_PRIORITY, STORE_TABLE
+
+logger = logging.getLogger(__name__)
+
+MIRROR_DIR = os.environ.get(
+    "QF5214_MIRROR_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mirror")
+)
+MIRROR_MODE = os.environ.get("QF5214_MIRROR", "off")
+
+# Days re-fetched before the watermark on every sync
+SYNC_OVERLAP_DAYS = 2
+
+DATASETS = {
+    "sentiment": {"key": ["Ticker", "Date"], "columns": ["Ticker", "Date"] + SCORE_COLUMNS + ["Intent Sentiment"]},
+    "stock_data": {"key": ["Ticker", "Date"], "columns": ["Ticker", "Date", "Close"]},
+    # One position per ticker and day: a re-published side replaces the old one
+    "dailytrading": {"key": ["Ticker", "Date"], "columns": ["Ticker", "Date", "Position_Type"]},
+}
+
+# One worker, so two syncs of a dataset never rewrite its partitions at once;
+# results are kept for one refresh window, which is what limits the syncs
+_sync_jobs = JobRunner(max_workers=1, result_ttl=QUERY_TTL_SECONDS, max_results=2 * len(DATASETS))
+
+
+def _dataset_dir(dataset: str) -> str:
+    return os.path.join(MIRROR_DIR, dataset)
+
+
+def _watermark_path(dataset: str) -> str:
+    return os.path.join(_dataset_dir(dataset), "_watermark.json")
+
+
+def get_watermark(dataset: str):
+    path = _watermark_path(dataset)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return pd.Timestamp(json.load(f)["watermark"])
+
+
+def _set_watermark(dataset: str, watermark):
+    path = _watermark_path(dataset)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"watermark": pd.Timestamp(watermark).strftime("%Y-%m-%d")}, f)
+    os.replace(tmp_path, path)
+
+
+# --- Fetch from Postgres ---
+def _fetch_sentiment(since, use_store: bool) -> pd.DataFrame:
+    if use_store:
+        return read_sql(*select(
+            STORE_TABLE, ["Ticker", "Date"] + SCORE_COLUMNS + ["Intent Sentiment"],
+            start_date=since.date() if since is not None else None,
+        ))
+
+    queries = [
+        select(
+            table, ["Date", "company"] + SCORE_COLUMNS + ["Intent Sentiment"],
+            source_start_date=since.date() if since is not None else None,
+        )
+        for table in SOURCE_PRIORITY
+    ]
+    frames = []
+    for result in read_sql_many(queries):
+        if isinstance(result, Exception):
+            raise result
+        frames.append(result)
+
+    df = pd.concat(frames, ignore_index=True)
+    df["Ticker"] = df.pop("company").astype(str).str.lstrip("$")
+    return df
+
+
+def _fetch(dataset: str, since, use_store: bool) -> pd.DataFrame:
+    if dataset == "sentiment":
+        return _fetch_sentiment(since, use_store)
+
+    table = "datacollection.stock_data" if dataset == "stock_data" else "tradingstrategy.dailytrading"
+    return read_sql(*select(table, DATASETS[dataset]["columns"], start_date=since.date() if since is not None else None))
+
+
+def _normalize(dataset: str, df: pd.DataFrame) -> pd.DataFrame:
+    spec = DATASETS[dataset]
+    df = df[spec["columns"]].copy()
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df = df.dropna(subset=["Date"])
+    for col in spec["columns"]:
+        if col in SCORE_COLUMNS or col == "Close":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    # Rows arrive in source-priority order, so the later table wins
+    return df.drop_duplicates(subset=spec["key"], keep="last")
+
+
+# --- Write ---
+def _write_partitions(dataset: str, df: pd.DataFrame):
+    spec = DATASETS[dataset]
+    months = df["Date"].dt.strftime("%Y-%m")
+    for month, part in df.groupby(months):
+        part_dir = os.path.join(_dataset_dir(dataset), f"month={month}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, "part.parquet")
+        if os.path.exists(path):
+            part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+        part = part.drop_duplicates(subset=spec["key"], keep="last").sort_values(spec["key"])
+        tmp_path = f"{path}.tmp"
+        pq.write_table(pa.Table.from_pandas(part, preserve_index=False), tmp_path)
+        os.replace(tmp_path, path)
+
+
+def sync(dataset: str, use_store: bool = False) -> int:
+    """Fetch rows newer than the watermark into the mirror; returns rows fetched."""
+    watermark = get_watermark(dataset)
+    since = None if watermark is None else watermark - timedelta(days=SYNC_OVERLAP_DAYS)
+    df = _normalize(dataset, _fetch(dataset, since, use_store))
+    if df.empty:
+        return 0
+
+    os.makedirs(_dataset_dir(dataset), exist_ok=True)
+    _write_partitions(dataset, df)
+    new_watermark = df["Date"].max()
+    if watermark is None or new_watermark > watermark:
+        _set_watermark(dataset, new_watermark)
+    return len(df)
+
+
+def replace_dataset(dataset: str, df: pd.DataFrame) -> int:
+    """Overwrite `dataset` with the rows of `df` (source-shaped, later rows winning); returns rows written.
+
+    Used to seed a mirror without a database, e.g. with synthetic data.
+    """
+    df = _normalize(dataset, df)
+    shutil.rmtree(_dataset_dir(dataset), ignore_errors=True)
+    if df.empty:
+        return 0
+    _write_partitions(dataset, df)
+    _set_watermark(dataset, df["Date"].max())
+    return len(df)
+
+
+def sync_all(use_store: bool = False) -> dict:
+    return {dataset: sync(dataset, use_store) for dataset in DATASETS}
+
+
+def _has_partitions(dataset: str) -> bool:
+    root = _dataset_dir(dataset)
+    return os.path.isdir(root) and any(name.startswith("month=") for name in os.listdir(root))
+
+
+def ensure_synced(dataset: str, use_store: bool = False):
+    """Start a background sync of `dataset` at most once per refresh window; a no-op when offline.
+
+    The caller reads the partitions already on disk straight away. Only an
+    empty mirror is synced inline, as there is nothing to serve yet. Failures
+    (typically an unreachable database) are logged and the existing mirror is
+    served as-is.
+    """
+    if MIRROR_MODE == "offline":
+        return
+
+    def run(progress=None, cancelled=None):
+        try:
+            return sync(dataset, use_store)
+        except Exception as e:
+            logger.warning("Mirror sync of %s failed, serving local copy: %s", dataset, e)
+            return 0
+
+    if not _has_partitions(dataset):
+        run()
+        return
+    window = int(time.time() // QUERY_TTL_SECONDS)
+    _sync_jobs.submit(("mirror sync", dataset, use_store), run, watermark=window)
+
+
+# --- Read ---
+def read(dataset: str, columns: list = None, tickers: list = None, start_date=None, end_date=None, dates: list = None) -> pd.DataFrame:
+    """Read a mirrored dataset with filters pushed down into the Parquet scan."""
+    columns = DATASETS[dataset]["columns"] if columns is None else columns
+    if not _has_partitions(dataset):
+        return pd.DataFrame(columns=columns)
+
+    dataset_obj = ds.dataset(_dataset_dir(dataset), format="parquet", partitioning="hive")
+    predicates = []
+    if tickers is not None:
+        predicates.append(ds.field("Ticker").isin(list(tickers)))
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        predicates.append(ds.field("month") >= start.strftime("%Y-%m"))
+        predicates.append(ds.field("Date") >= start.to_pydatetime())
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        predicates.append(ds.field("month") <= end.strftime("%Y-%m"))
+        predicates.append(ds.field("Date") <= end.to_pydatetime())
+    if dates is not None:
+        predicates.append(ds.field("Date").isin([pd.Timestamp(d).to_pydatetime() for d in dates]))
+
+    row_filter = None
+    for predicate in predicates:
+        row_filter = predicate if row_filter is None else row_filter & predicate
+    table = dataset_obj.to_table(columns=columns, filter=row_filter)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    for name, rows in sync_all(use_store=os.environ.get("QF5214_SENTIMENT_STORE", "0") == "1").items():
+        print(f"Synced {rows} rows into {os.path.join(MIRROR_DIR, name)}")
@@ -0,0 +1,65 @@
+"""Catalog of the SQL statements behind every dashboard read.
+
+Values never go into the statement text: tickers, companies and dates are
+bound parameters, so Postgres sees one statement text per shape rather than a
+new one per ticker or day, and ticker strings cannot inject SQL. A shape is a
+table, a column list and the set of filters in use; `select` renders each
+shape once and memoizes it, so repeated calls hand the driver the identical
+string. With psycopg 3 (see `dashboard.db`) those are prepared server-side on
+each pooled connection after `PREPARE_THRESHOLD` executions and run from the
+cached plan.
+
+    query, params = select("datacollection.stock_data", ["Date", "Ticker", "Close"], tickers=["AAPL"], start_date=day)
+    read_sql(query, params)
+"""
+from functools import lru_cache
+
+# Filter name -> predicate; the value is bound under the same name
+FILTERS = {
+    "companies": '"company" = ANY(:companies)',
+    "tickers": '"Ticker" = ANY(:tickers)',
+    "date": '"Date" = :date',
+    "start_date": '"Date" >= :start_date',
+    "end_date": '"Date" <= :end_date',
+    # Source sentiment tables keep "Date" as text; the cast compares real
+    # dates whatever text format a table uses, as the original queries did
+    "source_start_date": '"Date"::date >= :source_start_date',
+    "source_end_date": '"Date"::date <= :source_end_date',
+}
+
+LATEST_TRADING_DATE = """
+    SELECT MAX("Date") AS latest_date
+    FROM tradingstrategy.dailytrading
+"""
+
+
+def _quoted(columns) -> str:
+    return ", ".join(f'"{col}"' for col in columns)
+
+
+@lru_cache(maxsize=None)
+def _render(table: str, columns: tuple, filters: tuple, order_by: tuple, distinct: bool) -> str:
+    where = " AND ".join(FILTERS[name] for name in filters) or "TRUE"
+    order = f"ORDER BY {_quoted(order_by)}" if order_by else ""
+    return f"""
+        SELECT {"DISTINCT " if distinct else ""}{_quoted(columns)}
+        FROM {table}
+        WHERE {where}
+        {order}
+    """
+
+
+def select(table: str, columns: list, order_by: list = (), distinct: bool = False, **filters):
+    """`(statement, params)` reading `columns` of `table` under the given `FILTERS`.
+
+    Filters passed as None are left out, so each combination in use maps to
+    one fixed statement text. `table` and `columns` come from code, never from
+    user input.
+    """
+    params = {name: value for name, value in filters.items() if value is not None}
+    for name, value in params.items():
+        if name not in FILTERS:
+            raise KeyError(f"Unknown filter: {name}")
+        if isinstance(value, tuple):
+            params[name] = list(value)
+    return _render(table, tuple(columns), tuple(sorted(params)), tuple(order_by), distinct), params
@@ -0,0 +1,92 @@
+"""Change probe that decides whether a page tick needs fresh data.
+
+`data_version` is one cheap round-trip: the latest trading date plus the
+insert/update/delete counters Postgres already keeps per table in
+`pg_stat_user_tables`. It is cached per server process for one refresh
+interval, so however many sessions are open the database sees a single probe
+per interval. Pages key everything heavy (query results, figures) on the
+returned version through `session_cached`, so a tick with unchanged data only
+redraws the clock.
+"""
+import glob
+import os
+import time
+
+import streamlit as st
+
+from dashboard.db import TTLCache, query_cache, read_sql
+from dashboard.loaders import SENTIMENT_TABLES, USE_MIRROR
+from dashboard.store import STORE_TABLE
+from dashboard.telemetry import span
+
+REFRESH_INTERVAL_MS = 60000
+PROBE_TTL_SECONDS = REFRESH_INTERVAL_MS / 1000
+
+WATCHED_TABLES = ["tradingstrategy.dailytrading", "datacollection.stock_data"] + SENTIMENT_TABLES + [STORE_TABLE]
+
+PROBE_QUERY = """
+    SELECT
+        (SELECT MAX("Date") FROM tradingstrategy.dailytrading) AS latest_date,
+        (
+            SELECT string_agg(schemaname || '.' || relname || '=' || (n_tup_ins + n_tup_upd + n_tup_del), ',' ORDER BY relname)
+            FROM pg_stat_user_tables
+            WHERE schemaname || '.' || relname = ANY(:tables)
+        ) AS table_changes
+"""
+
+_probe_cache = TTLCache(ttl=PROBE_TTL_SECONDS, maxsize=1)
+_last_version = None
+
+
+def _mirror_version():
+    # Offline mirror: the partition files are the only thing that can change
+    from dashboard.mirror import MIRROR_DIR
+
+    parts = glob.glob(os.path.join(MIRROR_DIR, "*", "month=*", "*.parquet"))
+    return tuple(sorted((path, os.path.getmtime(path)) for path in parts))
+
+
+def _probe():
+    if USE_MIRROR:
+        from dashboard.mirror import MIRROR_MODE
+
+        if MIRROR_MODE == "offline":
+            return _mirror_version()
+    try:
+        probe_df = read_sql(PROBE_QUERY, {"tables": WATCHED_TABLES}, cache=_probe_cache, name="data_version probe")
+        return tuple(probe_df.iloc[0].astype(str))
+    except Exception:
+        # Unreachable database: fall back to time buckets so pages retry once
+        # per interval, as they did under the blind autorefresh
+        return ("unavailable", int(time.time() // PROBE_TTL_SECONDS))
+
+
+def data_version():
+    """Fingerprint of the watched tables; changes only when their data does.
+
+    A new version also drops the shared query cache so the following loads
+    cannot be served rows fetched before the change.
+    """
+    global _last_version
+    version = _probe()
+    if version != _last_version:
+        if _last_version is not None:
+            query_cache.clear()
+        _last_version = version
+    return version
+
+
+def session_cached(key: str, version, compute):
+    """`st.session_state[key]`, recomputed only when `version` differs from last time.
+
+    Each call is a "transform" telemetry span named `key`, a hit when the
+    session's value is reused.
+    """
+    version_key = f"{key}__version"
+    with span(key, kind="transform") as timing:
+        hit = key in st.session_state and st.session_state.get(version_key) == version
+        if not hit:
+            st.session_state[key] = compute()
+            st.session_state[version_key] = version
+        timing.record(st.session_state[key], cache="hit" if hit else "miss")
+    return st.session_state[key]
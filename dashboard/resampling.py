@@ -0,0 +1,323 @@
+"""Parallel bootstrap and permutation tests for factor IC and sentiment slopes.
+
+Resamples run in batches on a process pool. The data being resampled is copied
+once into shared memory; workers attach to it by name and read it in place, so
+no worker receives its own pickled copy of the panel. Every batch gets a child
+of one `np.random.SeedSequence`, so a given seed reproduces the same result
+however many workers run it.
+
+    test = slope_test(scores, returns, seed=7)
+    test["ci_low"], test["ci_high"], test["p_value"]
+
+Results are cached per (test, factor, ticker, window, data version, settings)
+in `resample_cache`; `cached_test` looks them up before computing.
+"""
+import os
+import sys
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, resource_tracker, shared_memory
+
+import numpy as np
+
+from dashboard.db import TTLCache
+
+RESAMPLE_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_RESAMPLES = 2000
+DEFAULT_BLOCK = 5
+CONFIDENCE = 0.95
+# Resamples per task: large enough to amortise scheduling, small enough to
+# spread a few thousand resamples over every worker
+CHUNK_SIZE = 250
+# Cells of the (permutations, dates, tickers) block one vectorized IC
+# permutation step works on, about 32 MB per float64 array
+PERMUTATION_CELLS = 4_000_000
+
+resample_cache = TTLCache(ttl=24 * 60 * 60, maxsize=512)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process-wide worker pool, started on first use.
+
+    Workers are spawned rather than forked, as forking the multi-threaded
+    Streamlit server is unsafe.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=RESAMPLE_WORKERS, mp_context=get_context("spawn"))
+    return _pool
+
+
+# --- Shared buffers ---
+_attached = {}
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    # Workers only borrow the parent's segment. Before Python 3.13 attaching
+    # registers it with the resource tracker as if the worker owned it, which
+    # can unlink it (or warn about a leak) when the worker exits. Spawned
+    # workers share the parent's tracker, so unregistering afterwards would
+    # drop the parent's own entry; registration is skipped instead. Workers
+    # run one task at a time, so the swap cannot race another attach.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _attach(spec):
+    """Read-only view of a shared array described by (name, shape, dtype).
+
+    Inline runs pass the array itself, which is returned as-is.
+    """
+    if isinstance(spec, np.ndarray):
+        return spec
+    name, shape, dtype = spec
+    if name not in _attached:
+        # Drop views of buffers from earlier runs before mapping a new one
+        for old in list(_attached):
+            _release(old)
+        segment = _open_untracked(name)
+        view = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        view.flags.writeable = False
+        _attached[name] = (segment, view)
+    return _attached[name][1]
+
+
+def _release(name: str):
+    if name in _attached:
+        segment, view = _attached.pop(name)
+        del view
+        segment.close()
+
+
+def _run_parallel(task, data: np.ndarray, n_resamples: int, seed: int, **params) -> np.ndarray:
+    """Spread `n_resamples` over the pool as `task(spec, n, seed_sequence, **params)` calls."""
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    sizes = [CHUNK_SIZE] * (n_resamples // CHUNK_SIZE) + ([n_resamples % CHUNK_SIZE] if n_resamples % CHUNK_SIZE else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if RESAMPLE_WORKERS <= 1:
+        # Inline on the calling thread: hand the array over directly, as the
+        # module-wide `_attached` views may belong to a run on another thread
+        view = data.view()
+        view.flags.writeable = False
+        return np.concatenate([task(view, size, child, **params) for size, child in zip(sizes, seeds)])
+
+    segment = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    try:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=segment.buf)[...] = data
+        spec = (segment.name, data.shape, data.dtype.str)
+        futures = [get_pool().submit(task, spec, size, child, **params) for size, child in zip(sizes, seeds)]
+        return np.concatenate([future.result() for future in futures])
+    finally:
+        _release(segment.name)
+        segment.close()
+        segment.unlink()
+
+
+# --- Vectorized statistics ---
+def _slopes(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """OLS slope of y on x along the last axis."""
+    dx = x - x.mean(axis=-1, keepdims=True)
+    dy = y - y.mean(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (dx * dy).sum(axis=-1) / (dx * dx).sum(axis=-1)
+
+
+def block_bootstrap_indices(rng: np.random.Generator, length: int, n: int, block: int) -> np.ndarray:
+    """(n, length) moving-block bootstrap row indices."""
+    block = max(1, min(block, length))
+    n_blocks = -(-length // block)
+    starts = rng.integers(0, length - block + 1, size=(n, n_blocks))
+    return (starts[..., None] + np.arange(block)).reshape(n, -1)[:, :length]
+
+
+# --- Worker tasks (module level so spawned workers can import them) ---
+def _slope_bootstrap_task(spec, n, seed, block):
+    xy = _attach(spec)
+    idx = block_bootstrap_indices(np.random.default_rng(seed), xy.shape[1], n, block)
+    return _slopes(xy[0][idx], xy[1][idx])
+
+
+def _slope_permutation_task(spec, n, seed):
+    xy = _attach(spec)
+    rng = np.random.default_rng(seed)
+    idx = rng.permuted(np.broadcast_to(np.arange(xy.shape[1]), (n, xy.shape[1])), axis=1)
+    return _slopes(xy[0][idx], np.broadcast_to(xy[1], idx.shape))
+
+
+def _mean_bootstrap_task(spec, n, seed, block):
+    series = _attach(spec)
+    idx = block_bootstrap_indices(np.random.default_rng(seed), series.shape[0], n, block)
+    return series[idx].mean(axis=1)
+
+
+def _ic_permutation_task(spec, n, seed):
+    """Mean daily correlation with each date's values shuffled across its valid tickers.
+
+    The panel is pre-compacted so each date's valid tickers come first: random
+    keys with +inf on invalid cells then sort into a permutation of the valid
+    cells only. Shuffling leaves each date's means and variances unchanged, so
+    only the cross products are recomputed, for a whole batch of permutations
+    at a time.
+    """
+    x, y, valid = _attach(spec)
+    mask = valid > 0
+    count = mask.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(mask, x - np.where(mask, x, 0.0).sum(axis=1, keepdims=True) / count, 0.0)
+        dy = np.where(mask, y - np.where(mask, y, 0.0).sum(axis=1, keepdims=True) / count, 0.0)
+        scale = np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    rows = count[:, 0] >= 3
+
+    rng = np.random.default_rng(seed)
+    out = np.empty(n)
+    batch = max(1, PERMUTATION_CELLS // max(valid.size, 1))
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        keys = np.where(mask, rng.random((size,) + mask.shape, dtype=np.float32), np.inf)
+        shuffled = np.take_along_axis(np.broadcast_to(dy, keys.shape), np.argsort(keys, axis=-1), axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            corr = (dx * shuffled).sum(axis=-1) / scale
+            out[start:start + size] = np.nanmean(corr[:, rows], axis=-1)
+    return out
+
+
+def _correlation_bootstrap_task(spec, n, seed, block, min_obs):
+    """Per-series correlations of resampled dates; the last row of the data is the target."""
+    from dashboard.ic import masked_correlation
+
+    data = _attach(spec)
+    idx = block_bootstrap_indices(np.random.default_rng(seed), data.shape[-1], n, block)
+    return np.stack([masked_correlation(data[:-1][..., rows], data[-1][..., rows], min_obs) for rows in idx])
+
+
+# --- Public tests ---
+def _summary(estimate: float, draws: np.ndarray, confidence: float) -> dict:
+    draws = draws[np.isfinite(draws)]
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(draws, [alpha, 1 - alpha]) if len(draws) else (np.nan, np.nan)
+    return {"estimate": float(estimate), "ci_low": float(low), "ci_high": float(high), "resamples": int(len(draws))}
+
+
+def _p_value(estimate: float, null: np.ndarray) -> float:
+    """Two-sided permutation p-value with the +1 correction."""
+    null = null[np.isfinite(null)]
+    return float((1 + np.sum(np.abs(null) >= abs(estimate))) / (len(null) + 1))
+
+
+def slope_test(
+    x,
+    y,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    block: int = DEFAULT_BLOCK,
+    seed: int = 0,
+    confidence: float = CONFIDENCE,
+) -> dict:
+    """Slope of `y` on `x` with a block-bootstrap CI and a permutation p-value.
+
+    Pairs with a missing value are dropped. Blocks of `block` consecutive days
+    keep the serial correlation of the series in each bootstrap sample.
+    """
+    xy = np.vstack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)])
+    xy = xy[:, np.isfinite(xy).all(axis=0)]
+    if xy.shape[1] < 3:
+        return {"estimate": np.nan, "ci_low": np.nan, "ci_high": np.nan, "resamples": 0, "p_value": np.nan, "n": xy.shape[1]}
+    estimate = _slopes(xy[0], xy[1])
+    result = _summary(estimate, _run_parallel(_slope_bootstrap_task, xy, n_resamples, seed, block=block), confidence)
+    result["p_value"] = _p_value(estimate, _run_parallel(_slope_permutation_task, xy, n_resamples, seed + 1))
+    result["n"] = xy.shape[1]
+    return result
+
+
+def mean_ic_test(
+    ic_series,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    block: int = DEFAULT_BLOCK,
+    seed: int = 0,
+    confidence: float = CONFIDENCE,
+) -> dict:
+    """Block-bootstrap CI for the mean of a daily IC series.
+
+    The p-value is the bootstrap probability of the mean IC having the other
+    sign, doubled.
+    """
+    series = np.asarray(ic_series, dtype=float)
+    series = series[np.isfinite(series)]
+    if len(series) < 3:
+        return {"estimate": np.nan, "ci_low": np.nan, "ci_high": np.nan, "resamples": 0, "p_value": np.nan, "n": len(series)}
+    estimate = series.mean()
+    draws = _run_parallel(_mean_bootstrap_task, series, n_resamples, seed, block=block)
+    result = _summary(estimate, draws, confidence)
+    result["p_value"] = float(min(1.0, 2 * np.mean(np.sign(draws) != np.sign(estimate))))
+    result["n"] = len(series)
+    return result
+
+
+def ic_permutation_test(factor, returns, n_resamples: int = 500, seed: int = 0) -> dict:
+    """Permutation p-value of the mean daily IC of a factor panel against returns.
+
+    `factor` and `returns` are aligned dates x tickers arrays (or frames).
+    Under the null, each date's returns are shuffled across that date's
+    tickers, which keeps the cross-sectional distributions intact.
+    """
+    from dashboard.ic import masked_correlation
+
+    x = np.asarray(factor, dtype=float)
+    y = np.asarray(returns, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    with np.errstate(invalid="ignore"):
+        estimate = np.nanmean(masked_correlation(np.where(valid, x, np.nan), y, min_obs=3))
+
+    # Compact valid cells to the front of each row (stable, so order is kept)
+    order = np.argsort(~valid, axis=1, kind="stable")
+    compact = np.stack(
+        [
+            np.take_along_axis(np.where(valid, x, np.nan), order, axis=1),
+            np.take_along_axis(np.where(valid, y, np.nan), order, axis=1),
+            np.take_along_axis(valid, order, axis=1).astype(float),
+        ]
+    )
+    null = _run_parallel(_ic_permutation_task, compact, n_resamples, seed)
+    return {"estimate": float(estimate), "p_value": _p_value(estimate, null), "resamples": int(np.isfinite(null).sum())}
+
+
+def correlation_bootstrap(
+    factor_stack,
+    target,
+    n_resamples: int = 500,
+    block: int = DEFAULT_BLOCK,
+    seed: int = 0,
+    confidence: float = CONFIDENCE,
+    min_obs: int = 20,
+):
+    """Block-bootstrap interval of the time-series correlation of every series at once.
+
+    `factor_stack` is (K, N, T) and `target` (N, T); the same resampled dates
+    are used for every ticker and factor. Returns (low, high) arrays of shape
+    (K, N).
+    """
+    data = np.concatenate([np.asarray(factor_stack, dtype=float), np.asarray(target, dtype=float)[None]])
+    draws = _run_parallel(_correlation_bootstrap_task, data, n_resamples, seed, block=block, min_obs=min_obs)
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanquantile(draws, [alpha, 1 - alpha], axis=0)
+    return low, high
+
+
+def cached_test(kind: str, factor: str, ticker, window, version, compute, **settings) -> dict:
+    """Cache a test result per (kind, factor, ticker, window, data version, settings)."""
+    key = (kind, factor, ticker, window, version, tuple(sorted(settings.items())))
+    return resample_cache.get_or_compute(key, lambda: compute(**settings))
@@ -0,0 +1,133 @@
+"""Consolidated sentiment store and its incremental refresh job.
+
+`nlp.sentiment_consolidated` holds one typed row per (ticker, date): the
+three `nlp.sentiment_aggregated_*` tables are unioned, `"$X"` is folded into
+`"X"`, `"Date"` becomes a real DATE and the later source wins on overlap,
+exactly as the page loaders used to do client-side. The primary key doubles
+as the `(ticker, date)` index the dashboard reads through.
+
+Run `python -m dashboard.store` from cron (or after each NLP batch) to merge
+rows newer than the current watermark; pass `--full` to rebuild from scratch.
+"""
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from dashboard.db import get_engine
+
+STORE_TABLE = "nlp.sentiment_consolidated"
+
+# Later entries win when the same (ticker, date) appears in several tables
+SOURCE_PRIORITY = {
+    "nlp.sentiment_aggregated_data": 1,
+    "nlp.sentiment_aggregated_live": 2,
+    "nlp.sentiment_aggregated_newdate": 3,
+}
+
+SCORE_COLUMNS = ["Surprise", "Joy", "Anger", "Fear", "Sadness", "Disgust", "Positive", "Negative", "Neutral"]
+
+# The live table keeps changing through the day, so each run re-merges the
+# last few days before the watermark as well
+REFRESH_OVERLAP_DAYS = 2
+
+_score_ddl = ",\n    ".join(f'"{col}" REAL' for col in SCORE_COLUMNS)
+
+STORE_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {STORE_TABLE} (
+        "Ticker" TEXT NOT NULL,
+        "Date" DATE NOT NULL,
+        {_score_ddl},
+        "Intent Sentiment" TEXT,
+        source_priority SMALLINT NOT NULL,
+        source_plain BOOLEAN NOT NULL DEFAULT TRUE,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY ("Ticker", "Date")
+    )
+    """,
+    f'CREATE INDEX IF NOT EXISTS sentiment_consolidated_date_idx ON {STORE_TABLE} ("Date")',
+    # Stores created before the "X" / "$X" tie-breaker existed
+    f"ALTER TABLE {STORE_TABLE} ADD COLUMN IF NOT EXISTS source_plain BOOLEAN NOT NULL DEFAULT TRUE",
+]
+
+
+def _numeric(col: str) -> str:
+    # Source score columns are not reliably numeric; junk becomes NULL instead
+    # of failing the whole merge
+    return (
+        f"""CASE WHEN "{col}"::text ~ '^\\s*[-+]?[0-9]*\\.?[0-9]+([eE][-+]?[0-9]+)?\\s*$' """
+        f"""THEN "{col}"::text::real END AS "{col}\""""
+    )
+
+
+def _source_select(table: str, priority: int) -> str:
+    scores = ", ".join(_numeric(col) for col in SCORE_COLUMNS)
+    return f"""
+        SELECT ltrim("company", '$') AS "Ticker", "Date"::date AS "Date", {scores},
+               "Intent Sentiment", {priority} AS source_priority, "company" NOT LIKE '$%' AS source_plain
+        FROM {table}
+        WHERE "Date"::date >= :since
+    """
+
+
+def _merge_sql() -> str:
+    union = "\nUNION ALL\n".join(_source_select(table, priority) for table, priority in SOURCE_PRIORITY.items())
+    values = [f'"{col}"' for col in SCORE_COLUMNS] + ['"Intent Sentiment"']
+    columns = ['"Ticker"', '"Date"'] + values + ["source_priority", "source_plain"]
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in columns[2:])
+    # Ties within one source ("X" and "$X" rows for the same day) go to the
+    # un-prefixed row, then to the values themselves, so every rebuild and
+    # every incremental run picks the same row
+    tie_break = ", ".join(f"{col} NULLS LAST" for col in values)
+    return f"""
+        INSERT INTO {STORE_TABLE} ({column_list})
+        SELECT DISTINCT ON ("Ticker", "Date") {column_list}
+        FROM ({union}) s
+        WHERE "Date" IS NOT NULL
+        ORDER BY "Ticker", "Date", source_priority DESC, source_plain DESC, {tie_break}
+        ON CONFLICT ("Ticker", "Date") DO UPDATE
+        SET {updates}, updated_at = now()
+        WHERE (EXCLUDED.source_priority, EXCLUDED.source_plain)
+            >= ({STORE_TABLE}.source_priority, {STORE_TABLE}.source_plain)
+    """
+
+
+def ensure_store(engine=None):
+    engine = engine or get_engine()
+    with engine.begin() as conn:
+        for ddl in STORE_DDL:
+            conn.execute(text(ddl))
+
+
+def get_watermark(engine=None):
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        return conn.execute(text(f'SELECT MAX("Date") FROM {STORE_TABLE}')).scalar()
+
+
+def refresh_store(full: bool = False, engine=None) -> int:
+    """Merge source rows on or after the watermark into the store.
+
+    Returns the number of rows inserted or updated.
+    """
+    engine = engine or get_engine()
+    ensure_store(engine)
+    watermark = None if full else get_watermark(engine)
+    since = date.min if watermark is None else watermark - timedelta(days=REFRESH_OVERLAP_DAYS)
+
+    with engine.begin() as conn:
+        if full:
+            conn.execute(text(f"TRUNCATE {STORE_TABLE}"))
+        result = conn.execute(text(_merge_sql()), {"since": since})
+        conn.execute(text(f"ANALYZE {STORE_TABLE}"))
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the consolidated sentiment store")
+    parser.add_argument("--full", action="store_true", help="rebuild the store from all source rows")
+    args = parser.parse_args()
+    merged = refresh_store(full=args.full)
+    print(f"Merged {merged} rows into {STORE_TABLE}")
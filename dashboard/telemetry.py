@@ -0,0 +1,240 @@
+"""Timed spans around DB calls, transforms and chart renders.
+
+Every `read_sql` call, every `session_cached` frame or figure, every Plotly
+render and every full page run is wrapped in a span that records its wall
+time, the rows and in-memory bytes of a frame it produced, and whether it was
+served from a cache. Spans feed three outputs:
+
+- the optional debug sidebar (`dashboard.ui.debug_sidebar`), which lists the
+  spans of the current page run and the process-wide p50/p95 per span
+- one JSON log line per span on the `dashboard.telemetry` logger when
+  `QF5214_TELEMETRY_LOG=1`
+- Prometheus text format from `prometheus_text()`, served on
+  `QF5214_METRICS_PORT` when that is set
+
+Percentiles are taken over the last `WINDOW` spans of each name, so they
+track recent behaviour rather than the whole process lifetime.
+
+    with span("positions", kind="transform") as s:
+        df = build()
+        s.record(df)
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_LOG = os.environ.get("QF5214_TELEMETRY_LOG", "0") == "1"
+METRICS_PORT = os.environ.get("QF5214_METRICS_PORT")
+# Recent spans per name kept for percentiles
+WINDOW = 500
+QUANTILES = (0.5, 0.95)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    started: float
+    seconds: float = 0.0
+    rows: int = None
+    bytes: int = None
+    cache: str = None
+    error: bool = False
+
+    def record(self, result=None, cache: str = None):
+        """Attach the size of a frame `result` and the cache outcome ("hit" or "miss")."""
+        if isinstance(result, pd.DataFrame):
+            self.rows = len(result)
+            self.bytes = int(result.memory_usage(index=True).sum())
+        if cache is not None:
+            self.cache = cache
+
+
+class _Stats:
+    def __init__(self):
+        self.seconds = deque(maxlen=WINDOW)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def add(self, span: Span):
+        self.seconds.append(span.seconds)
+        self.count += 1
+        self.total_seconds += span.seconds
+        self.rows += span.rows or 0
+        self.bytes += span.bytes or 0
+        self.hits += span.cache == "hit"
+        self.misses += span.cache == "miss"
+        self.errors += span.error
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+# Spans of the page run in progress; None outside a page run
+_run_spans = contextvars.ContextVar("run_spans", default=None)
+
+
+def _finish(span: Span):
+    with _stats_lock:
+        _stats.setdefault((span.kind, span.name), _Stats()).add(span)
+    spans = _run_spans.get()
+    if spans is not None:
+        spans.append(span)
+    if TELEMETRY_LOG:
+        logger.info(json.dumps({"event": "span", **asdict(span)}))
+
+
+@contextmanager
+def span(name: str, kind: str = "transform"):
+    """Time the enclosed block as one span of `kind` ("db", "transform", "render" or "page")."""
+    current = Span(name=name, kind=kind, started=time.time())
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        _finish(current)
+
+
+# --- Page runs ---
+def start_run():
+    """Begin collecting the spans of a page run; returns the start time for `end_run`."""
+    _run_spans.set([])
+    return time.perf_counter()
+
+
+def end_run(page: str, started: float) -> list:
+    """Record the page span and return the spans collected since `start_run`."""
+    spans = _run_spans.get() or []
+    _run_spans.set(None)
+    _finish(Span(name=page, kind="page", started=time.time() - (time.perf_counter() - started), seconds=time.perf_counter() - started))
+    return spans
+
+
+# --- Reports ---
+def spans_frame(spans: list) -> pd.DataFrame:
+    """One row per span, in the order they finished."""
+    return pd.DataFrame(
+        [
+            {
+                "Kind": s.kind,
+                "Span": s.name,
+                "ms": round(s.seconds * 1000, 1),
+                "Rows": s.rows,
+                "KB": None if s.bytes is None else round(s.bytes / 1024, 1),
+                "Cache": s.cache,
+            }
+            for s in spans
+        ],
+        columns=["Kind", "Span", "ms", "Rows", "KB", "Cache"],
+    )
+
+
+def summary() -> pd.DataFrame:
+    """Process-wide count, p50/p95 latency and cache hit rate per span."""
+    with _stats_lock:
+        items = [(kind, name, stats.count, np.array(stats.seconds), stats.hits, stats.misses, stats.errors) for (kind, name), stats in _stats.items()]
+    rows = []
+    for kind, name, count, seconds, hits, misses, errors in items:
+        p50, p95 = np.quantile(seconds, QUANTILES) * 1000
+        rows.append({
+            "Kind": kind,
+            "Span": name,
+            "Count": count,
+            "p50 ms": round(p50, 1),
+            "p95 ms": round(p95, 1),
+            "Hit Rate": hits / (hits + misses) if hits + misses else None,
+            "Errors": errors,
+        })
+    frame = pd.DataFrame(rows, columns=["Kind", "Span", "Count", "p50 ms", "p95 ms", "Hit Rate", "Errors"])
+    return frame.sort_values("p95 ms", ascending=False).reset_index(drop=True)
+
+
+def reset():
+    """Forget every recorded span, e.g. between benchmark rounds."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text() -> str:
+    """Span metrics in the Prometheus text exposition format."""
+    with _stats_lock:
+        items = [(kind, name, stats.count, stats.total_seconds, np.array(stats.seconds), stats.rows, stats.bytes, stats.hits, stats.misses) for (kind, name), stats in _stats.items()]
+    lines = [
+        "# HELP qf5214_span_seconds Wall time of dashboard spans over the recent window.",
+        "# TYPE qf5214_span_seconds summary",
+    ]
+    for kind, name, count, total, seconds, _, _, _, _ in items:
+        labels = f'kind="{_label(kind)}",name="{_label(name)}"'
+        for q, value in zip(QUANTILES, np.quantile(seconds, QUANTILES)):
+            lines.append(f'qf5214_span_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+        lines.append(f"qf5214_span_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"qf5214_span_seconds_count{{{labels}}} {count}")
+    for metric, help_text, position in [
+        ("qf5214_span_rows_total", "Rows returned by dashboard spans.", 5),
+        ("qf5214_span_bytes_total", "In-memory bytes of frames returned by dashboard spans.", 6),
+        ("qf5214_span_cache_hits_total", "Spans served from a cache.", 7),
+        ("qf5214_span_cache_misses_total", "Spans that missed their cache.", 8),
+    ]:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for item in items:
+            lines.append(f'{metric}{{kind="{_label(item[0])}",name="{_label(item[1])}"}} {item[position]}')
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics endpoint ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port: int = None):
+    """Serve `prometheus_text()` on `port` (default `QF5214_METRICS_PORT`) from a daemon thread, once per process."""
+    global _server
+    port = METRICS_PORT if port is None else port
+    if port is None:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("", int(port)), _MetricsHandler)
+            except OSError as e:
+                logger.warning("Metrics endpoint on port %s not started: %s", port, e)
+                return None
+            threading.Thread(target=_server.serve_forever, name="qf5214-metrics", daemon=True).start()
+    return _server
@@ -0,0 +1,94 @@
+"""Page building blocks that refresh on their own schedule.
+
+Each block is a Streamlit fragment, so its periodic rerun re-executes and
+re-sends only that block instead of the whole page script.
+"""
+import os
+from datetime import datetime
+
+import pytz
+import streamlit as st
+
+from dashboard.refresh import REFRESH_INTERVAL_MS
+from dashboard.telemetry import end_run, serve_metrics, span, spans_frame, start_run, summary
+
+CLOCK_INTERVAL_SECONDS = 60
+CHANGE_WATCH_SECONDS = REFRESH_INTERVAL_MS / 1000
+
+# Show the timing sidebar on every page; `?debug=1` turns it on for one session
+DEBUG_SIDEBAR = os.environ.get("QF5214_DEBUG", "0") == "1"
+
+# --- Time Zones ---
+sgt = pytz.timezone("Asia/Singapore")
+ny = pytz.timezone("America/New_York")
+
+
+@st.fragment(run_every=CLOCK_INTERVAL_SECONDS)
+def clock_header(padding: str = "10px", font_size: str = "18px"):
+    now_sgt = datetime.now(sgt)
+    now_ny = datetime.now(ny)
+    date_today = now_sgt.strftime("%A, %d %B %Y")
+    time_sgt = now_sgt.strftime("%H:%M")
+    time_ny = now_ny.strftime("%H:%M")
+
+    # --- Date & Time Display ---
+    st.markdown(
+        f"""
+        <div style="text-align: center; padding: {padding} 0; font-size: {font_size}; color: #444;">
+            <b>{date_today}</b><br>
+            Singapore: {time_sgt} &nbsp;&nbsp;|&nbsp;&nbsp; New York: {time_ny}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+def _watch(key: str, probe):
+    seen_key = f"watch_{key}"
+    try:
+        current = probe()
+    except Exception:
+        return
+    changed = seen_key in st.session_state and st.session_state[seen_key] != current
+    st.session_state[seen_key] = current
+    if changed:
+        st.rerun()
+
+
+def watch_for_changes(key: str, probe, run_every: float = CHANGE_WATCH_SECONDS):
+    """Poll `probe` every `run_every` seconds and rerun the page only when its value changes.
+
+    The watcher renders nothing, so a quiet tick costs one probe call and no
+    frontend update.
+    """
+    st.fragment(_watch, run_every=run_every)(key, probe)
+
+
+# --- Instrumentation ---
+def plotly_chart(fig, name: str, **kwargs):
+    """`st.plotly_chart` timed as a "render" span named `name`."""
+    with span(name, kind="render"):
+        st.plotly_chart(fig, **kwargs)
+
+
+def start_page():
+    """Begin timing a page run; pass the result to `end_page` at the bottom of the script."""
+    serve_metrics()
+    return start_run()
+
+
+def end_page(page: str, started):
+    """Record the page run and, in debug mode, show its spans in the sidebar."""
+    spans = end_run(page, started)
+    if DEBUG_SIDEBAR or st.query_params.get("debug") == "1":
+        debug_sidebar(page, spans)
+
+
+def debug_sidebar(page: str, spans: list):
+    with st.sidebar:
+        st.markdown("### Timings")
+        total = sum(s.seconds for s in spans if s.kind == "db")
+        st.caption(f"{page}: {len(spans)} spans, {total * 1000:.0f} ms in the database this run")
+        st.dataframe(spans_frame(spans), use_container_width=True, hide_index=True)
+        st.markdown("**This server, recent runs (p50 / p95)**")
+        st.dataframe(summary(), use_container_width=True, hide_index=True)
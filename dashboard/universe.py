@@ -0,0 +1,133 @@
+"""Universe-wide sentiment vs next-day return statistics.
+
+Instead of fetching, merging and regressing one ticker at a time, the whole
+universe is loaded in one bulk fetch, pivoted into dates x tickers panels, and
+every (ticker, factor) pair is reduced at once along the date axis: Pearson
+and rank correlation, OLS slope, t-statistic and p-value. Bootstrap intervals,
+the only heavy part, fan out over the `dashboard.resampling` process pool.
+
+    stats = universe_return_stats(*load_universe_panels(start_date))
+    stats.pivot(index="Ticker", columns="Factor", values="Correlation")
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from dashboard.db import TTLCache
+from dashboard.ic import rank_last_axis
+
+MIN_DAYS = 20
+
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+# Panels and stats are shared by every session: keyed on the data version,
+# so entries only need to outlive the current version
+_universe_cache = TTLCache(ttl=24 * 60 * 60, maxsize=2)
+
+
+def load_universe_panels(start_date=None, columns: list = None):
+    """One bulk fetch of every ticker: (factor panels, close panel, sentiment rows)."""
+    from dashboard.alignment import sentiment_panels
+    from dashboard.loaders import SENTIMENT_COLUMNS, load_price_history, load_sentiment_history, to_panel
+
+    columns = SENTIMENT_COLUMNS if columns is None else columns
+    prices = to_panel(load_price_history(start_date=start_date), "Close")
+    history = load_sentiment_history(start_date=start_date, columns=columns)
+    factors = sentiment_panels(history, columns, prices.index)
+    return factors, prices, history
+
+
+def next_day_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """Return from each date's close to the next trading day's close."""
+    return prices.shift(-1) / prices - 1
+
+
+def stack_factors(factors: dict, prices: pd.DataFrame):
+    """(factors, tickers, dates) factor array and (tickers, dates) next-day returns."""
+    dates, tickers = prices.index, prices.columns
+    factor_stack = np.stack(
+        [factors[name].reindex(index=dates, columns=tickers).to_numpy(dtype=float).T for name in factors]
+    )
+    return factor_stack, next_day_returns(prices).to_numpy(dtype=float).T
+
+
+def _moments(x: np.ndarray, y: np.ndarray):
+    """Joint count, covariance sum and variance sums along the last axis."""
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=-1)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = np.where(valid, x - x.sum(axis=-1, keepdims=True) / n[..., None], 0.0)
+        dy = np.where(valid, y - y.sum(axis=-1, keepdims=True) / n[..., None], 0.0)
+    return n, (dx * dy).sum(axis=-1), (dx * dx).sum(axis=-1), (dy * dy).sum(axis=-1)
+
+
+def universe_return_stats(factors: dict, prices: pd.DataFrame, min_days: int = MIN_DAYS) -> pd.DataFrame:
+    """Correlation and regression of next-day return on each factor, per ticker.
+
+    One row per (Ticker, Factor); pairs with fewer than `min_days` joint
+    observations are NaN. The p-value uses the normal approximation to the
+    slope's t-statistic, which is close for a year of daily data.
+    """
+    names = list(factors)
+    factor_stack, returns = stack_factors(factors, prices)
+    returns = np.broadcast_to(returns, factor_stack.shape)
+    valid = np.isfinite(factor_stack) & np.isfinite(returns)
+    x = np.where(valid, factor_stack, np.nan)
+    y = np.where(valid, returns, np.nan)
+
+    n, sxy, sxx, syy = _moments(x, y)
+    _, rxy, rxx, ryy = _moments(rank_last_axis(x), rank_last_axis(y))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = sxy / np.sqrt(sxx * syy)
+        rank_corr = rxy / np.sqrt(rxx * ryy)
+        slope = sxy / sxx
+        t_stat = corr * np.sqrt((n - 2) / (1 - corr ** 2))
+    enough = n >= min_days
+
+    def column(values):
+        return np.where(enough, values, np.nan).ravel()
+
+    return pd.DataFrame(
+        {
+            "Ticker": np.tile(prices.columns.to_numpy(), len(names)),
+            "Factor": np.repeat(names, len(prices.columns)),
+            "Correlation": column(corr),
+            "Rank Correlation": column(rank_corr),
+            "Slope": column(slope),
+            "t-stat": column(t_stat),
+            "p-value": column(_erfc(np.abs(np.nan_to_num(t_stat)) / math.sqrt(2))),
+            "Days": n.ravel(),
+        }
+    )
+
+
+def cached_universe(start_date, version):
+    """`(factors, prices, history, stats)` for the whole universe, once per data version."""
+
+    def compute():
+        factors, prices, history = load_universe_panels(start_date)
+        return factors, prices, history, universe_return_stats(factors, prices)
+
+    return _universe_cache.get_or_compute((str(start_date), version), compute)
+
+
+def universe_correlation_intervals(
+    factors: dict, prices: pd.DataFrame, n_resamples: int = 500, seed: int = 0
+) -> pd.DataFrame:
+    """Block-bootstrap confidence intervals of every (Ticker, Factor) correlation."""
+    from dashboard.resampling import correlation_bootstrap
+
+    factor_stack, returns = stack_factors(factors, prices)
+    low, high = correlation_bootstrap(factor_stack, returns, n_resamples=n_resamples, seed=seed)
+    names = list(factors)
+    return pd.DataFrame(
+        {
+            "Ticker": np.tile(prices.columns.to_numpy(), len(names)),
+            "Factor": np.repeat(names, len(prices.columns)),
+            "CI Low": low.ravel(),
+            "CI High": high.ravel(),
+        }
+    )
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.alignment import (
+    align_returns,
+    asof_sentiment,
+    previous_trading_date,
+    price_returns,
+    sentiment_panels,
+    to_trading_dates,
+    trading_calendar,
+)
+
+# Thursday 2025-01-02 to Tuesday 2025-01-07
+CALENDAR = trading_calendar(["2025-01-07", "2025-01-02", "2025-01-03", "2025-01-06", "2025-01-06"])
+
+
+def test_trading_calendar_is_sorted_and_unique():
+    assert CALENDAR.strftime("%m-%d").tolist() == ["01-02", "01-03", "01-06", "01-07"]
+
+
+def test_weekend_dates_map_forward_and_dates_past_the_end_are_dropped():
+    dates = pd.to_datetime(["2025-01-03 00:00", "2025-01-04 15:30", "2025-01-05 00:00", "2025-01-08 00:00"])
+    mapped = to_trading_dates(dates, CALENDAR)
+    assert mapped[:3].strftime("%m-%d").tolist() == ["01-03", "01-06", "01-06"]
+    assert mapped[3] is pd.NaT
+
+
+def test_previous_trading_date_skips_the_weekend():
+    assert str(previous_trading_date("2025-01-06", CALENDAR)) == "2025-01-03"
+    assert str(previous_trading_date("2025-01-02", CALENDAR)) == "2025-01-01"
+
+
+def test_weekend_sentiment_is_averaged_into_monday():
+    sentiment = pd.DataFrame({
+        "Ticker": ["A"] * 4,
+        "Date": ["2025-01-03", "2025-01-04", "2025-01-05", "2025-01-06"],
+        "Positive": [0.1, 0.2, 0.4, 0.6],
+        "Intent Sentiment": ["x", "y", "z", "w"],
+    })
+    aligned = asof_sentiment(sentiment, ["Positive", "Intent Sentiment"], CALENDAR).set_index("Date")
+    assert aligned["Positive"].tolist() == pytest.approx([0.1, 0.4])
+    assert aligned.loc["2025-01-06", "Intent Sentiment"] == "w"
+
+
+def test_returns_span_consecutive_trading_days_per_ticker():
+    stock = pd.DataFrame({
+        "Ticker": ["A", "A", "A", "B", "B"],
+        "Date": ["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-02", "2025-01-06"],
+        "Close": [100, 110, 99, 50, 55],
+    })
+    returns = price_returns(stock).set_index(["Ticker", "Date"])["Return"]
+    assert np.isnan(returns[("A", pd.Timestamp("2025-01-02"))])
+    assert returns[("A", pd.Timestamp("2025-01-06"))] == pytest.approx(-0.1)
+    assert returns[("B", pd.Timestamp("2025-01-06"))] == pytest.approx(0.1)
+
+
+def test_align_returns_keeps_every_price_row():
+    stock = pd.DataFrame({"Date": CALENDAR, "Close": [100.0, 101.0, 102.0, 103.0]})
+    sentiment = pd.DataFrame({"Ticker": "A", "Date": ["2025-01-04", "2025-01-05"], "Positive": [0.2, 0.4]})
+    aligned = align_returns(sentiment, stock, ["Positive"])
+    assert "Ticker" not in aligned
+    assert len(aligned) == 4
+    # Weekend rows land on Monday and nowhere else
+    assert aligned["Positive"].isna().tolist() == [True, True, False, True]
+    assert aligned["Positive"].iloc[2] == pytest.approx(0.3)
+
+
+def test_sentiment_panels_are_on_the_calendar():
+    sentiment = pd.DataFrame({"Ticker": ["A", "B"], "Date": ["2025-01-04", "2025-01-07"], "Positive": [0.5, 0.7]})
+    panel = sentiment_panels(sentiment, ["Positive"], CALENDAR)["Positive"]
+    assert panel.index.equals(CALENDAR)
+    assert panel.loc["2025-01-06", "A"] == 0.5
+    assert panel.loc["2025-01-07", "B"] == 0.7
+    assert panel.notna().sum().sum() == 2
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.backtest import TRADING_DAYS, compare_sentiment_strategies, holdings_weights, long_short_weights, run_backtest
+
+DATES = pd.date_range("2025-01-01", periods=4, freq="B")
+
+
+def test_weights_earn_the_next_day_return_net_of_costs():
+    prices = pd.DataFrame({"A": [100.0, 110.0, 121.0, 121.0]}, index=DATES)
+    weights = pd.DataFrame({"A": [1.0, 1.0, 0.0, 0.0]}, index=DATES)
+    result = run_backtest(weights, prices, cost_bps=10.0)
+
+    assert result.daily["gross"].tolist() == pytest.approx([0.0, 0.1, 0.1, 0.0])
+    # Buying on day 0 and selling on day 2 each trade one unit
+    assert result.daily["turnover"].tolist() == [1.0, 0.0, 1.0, 0.0]
+    assert result.daily["net"].tolist() == pytest.approx([-0.001, 0.1, 0.099, 0.0])
+    assert result.stats["total_return"] == pytest.approx(0.999 * 1.1 * 1.099 - 1)
+    assert result.stats["total_cost"] == pytest.approx(0.002)
+
+
+def test_drawdown_and_stats_follow_the_equity_curve():
+    prices = pd.DataFrame({"A": [100.0, 50.0, 100.0, 100.0]}, index=DATES)
+    weights = pd.DataFrame({"A": [1.0, 1.0, 1.0, 1.0]}, index=DATES)
+    result = run_backtest(weights, prices, cost_bps=0.0)
+
+    assert result.daily["equity"].tolist() == pytest.approx([1.0, 0.5, 1.0, 1.0])
+    assert result.stats["max_drawdown"] == pytest.approx(-0.5)
+    net = result.daily["net"].to_numpy()
+    volatility = net.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    assert result.stats["annual_volatility"] == pytest.approx(volatility)
+    assert result.stats["sharpe"] == pytest.approx(net.mean() * TRADING_DAYS / volatility)
+
+
+def test_missing_prices_earn_nothing():
+    prices = pd.DataFrame({"A": [100.0, np.nan, 100.0, 100.0]}, index=DATES)
+    weights = pd.DataFrame({"A": [1.0] * 4}, index=DATES)
+    assert run_backtest(weights, prices, cost_bps=0.0).daily["gross"].tolist() == [0.0] * 4
+
+
+def test_long_short_weights_are_dollar_neutral():
+    signal = pd.DataFrame([[1.0, 2.0, 3.0, 4.0, 5.0]], columns=list("ABCDE"))
+    weights = long_short_weights(signal, quantile=0.2, gross=1.0)
+    assert weights.iloc[0].tolist() == [-0.5, 0.0, 0.0, 0.0, 0.5]
+
+
+def test_holdings_weights_split_gross_within_each_side():
+    holdings = pd.DataFrame({
+        "Date": ["2025-01-02"] * 3,
+        "Ticker": ["A", "B", "C"],
+        "Position_Type": ["Long", "Long", "Short"],
+    })
+    weights = holdings_weights(holdings)
+    assert weights.iloc[0].to_dict() == {"A": 0.25, "B": 0.25, "C": -0.5}
+
+
+def test_sentiment_book_differs_only_through_sentiment():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=80, freq="B")
+    prices = pd.DataFrame(100 * np.exp(rng.normal(0, 0.01, (80, 10)).cumsum(axis=0)), index=dates, columns=list("ABCDEFGHIJ"))
+
+    no_sentiment = compare_sentiment_strategies(prices, pd.DataFrame(index=dates, columns=prices.columns, dtype=float))
+    assert no_sentiment["with_sentiment"].daily["net"].tolist() == pytest.approx(no_sentiment["without_sentiment"].daily["net"].tolist())
+
+    sentiment = pd.DataFrame(rng.normal(size=(80, 10)), index=dates, columns=prices.columns)
+    results = compare_sentiment_strategies(prices, sentiment)
+    assert not np.allclose(results["with_sentiment"].daily["net"], results["without_sentiment"].daily["net"])
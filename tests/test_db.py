@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pandas as pd
+
+from dashboard import db
+from dashboard.db import TTLCache
+
+
+# --- TTLCache ---
+def test_get_misses_then_hits():
+    cache = TTLCache(ttl=60, maxsize=4)
+    assert cache.get("a") == (False, None)
+    cache.set("a", 1)
+    assert cache.get("a") == (True, 1)
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(ttl=60, maxsize=4)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+def test_get_or_compute_runs_compute_once_for_concurrent_callers():
+    cache = TTLCache(ttl=60, maxsize=4)
+    calls = []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(True)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_compute("key", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+# --- read_sql ---
+def test_cache_key_ignores_whitespace_and_param_order():
+    first = db._cache_key("SELECT 1\n  FROM t", {"b": [1, 2], "a": 1})
+    second = db._cache_key("SELECT 1 FROM t", {"a": 1, "b": (1, 2)})
+    assert first == second
+
+
+def test_read_sql_serves_a_copy_of_the_cached_frame():
+    cache = TTLCache(ttl=60, maxsize=4)
+    query, params = "SELECT \"Close\" FROM datacollection.stock_data", {"tickers": ["AAPL"]}
+    cache.set(db._cache_key(query, params), pd.DataFrame({"Close": [1.0, 2.0]}))
+
+    df = db.read_sql(query, params, cache=cache)
+    df.loc[0, "Close"] = 99.0
+    assert db.read_sql(query, params, cache=cache)["Close"].tolist() == [1.0, 2.0]
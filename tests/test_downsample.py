@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.downsample import density_grid, downsample, resample_rule
+
+
+@pytest.mark.parametrize(
+    "days, rule",
+    [(30, "D"), (300, "D"), (301, "W-FRI"), (365 * 5, "W-FRI"), (365 * 10, "ME"), (365 * 30, "QE"), (365 * 200, "QE")],
+)
+def test_resample_rule_is_the_finest_within_the_budget(days, rule):
+    start = pd.Timestamp("2000-01-01")
+    assert resample_rule(start, start + pd.Timedelta(days=days - 1)) == rule
+
+
+def test_short_ranges_are_left_daily():
+    df = pd.DataFrame({"Date": pd.date_range("2025-01-01", periods=10), "Positive": np.arange(10.0)})
+    pd.testing.assert_frame_equal(downsample(df, ["Positive"]), df)
+
+
+def test_long_ranges_become_weekly_means_labelled_by_friday():
+    dates = pd.date_range("2024-01-01", periods=400)
+    df = pd.DataFrame({"Date": dates, "Positive": np.arange(400.0), "Negative": np.nan})
+    weekly = downsample(df, ["Positive", "Negative"])
+    assert len(weekly) <= 300
+    assert (weekly["Date"].dt.day_name() == "Friday").all()
+    # Monday 2024-01-01 to Friday 2024-01-05
+    assert weekly["Positive"].iloc[0] == pytest.approx(2.0)
+    assert weekly["Negative"].isna().all()
+
+
+def test_empty_buckets_are_dropped():
+    dates = pd.to_datetime(["2020-01-01", "2025-01-01"])
+    monthly = downsample(pd.DataFrame({"Date": dates, "Positive": [1.0, 3.0]}), ["Positive"])
+    assert monthly["Positive"].tolist() == [1.0, 3.0]
+
+
+def test_empty_frame_keeps_its_columns():
+    assert list(downsample(pd.DataFrame(columns=["Date", "Positive"]), ["Positive"]).columns) == ["Date", "Positive"]
+
+
+def test_density_grid_counts_every_finite_pair():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=10_000)
+    y = rng.normal(size=10_000)
+    y[:5] = np.nan
+    y[5] = 1e6
+    counts, x_centers, y_centers = density_grid(x, y, bins=20)
+    assert counts.shape == (20, 20) and len(x_centers) == len(y_centers) == 20
+    assert counts.sum() == 9_995
+    # The outlier is clipped into the top edge instead of stretching the grid
+    assert y_centers[-1] < 5
+
+
+def test_density_grid_without_pairs_is_empty():
+    counts, x_centers, _ = density_grid([np.nan], [1.0], bins=4)
+    assert counts.sum() == 0 and counts.shape == (4, 4) and len(x_centers) == 4
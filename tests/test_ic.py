@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.ic import compute_ic, cross_sectional_ic, masked_correlation, rank_last_axis
+
+
+# --- Ranks and correlations ---
+def test_rank_last_axis_averages_ties_and_keeps_nans():
+    ranks = rank_last_axis(np.array([3.0, 1.0, 3.0, np.nan, 2.0]))
+    np.testing.assert_array_equal(ranks, [3.5, 1.0, 3.5, np.nan, 2.0])
+
+
+def test_rank_last_axis_matches_pandas_over_leading_axes():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 5, size=(3, 4, 20)).astype(float)
+    values[rng.random(values.shape) < 0.2] = np.nan
+    expected = np.stack([pd.DataFrame(block).rank(axis=1, method="average").to_numpy() for block in values])
+    np.testing.assert_array_equal(rank_last_axis(values), expected)
+
+
+def test_masked_correlation_uses_only_jointly_finite_pairs():
+    x = np.array([[1.0, 2.0, 3.0, 4.0, np.nan], [1.0, 2.0, np.nan, np.nan, np.nan]])
+    y = np.array([[2.0, 4.0, 6.0, 9.0, 100.0], [1.0, 2.0, 3.0, 4.0, 5.0]])
+    corr = masked_correlation(x, y, min_obs=3)
+    assert corr[0] == pytest.approx(np.corrcoef([1, 2, 3, 4], [2, 4, 6, 9])[0, 1])
+    assert np.isnan(corr[1])
+
+
+def test_rank_ic_is_spearman():
+    rng = np.random.default_rng(1)
+    factor = rng.normal(size=(2, 30, 15))
+    returns = rng.normal(size=(30, 15))
+    returns[3, :4] = np.nan
+    ic, rank_ic = cross_sectional_ic(factor, returns)
+    for k in range(2):
+        for t in (0, 3):
+            pair = pd.DataFrame({"x": factor[k, t], "y": returns[t]}).dropna()
+            assert ic[k, t] == pytest.approx(pair["x"].corr(pair["y"]))
+            assert rank_ic[k, t] == pytest.approx(pair["x"].rank().corr(pair["y"].rank()))
+
+
+# --- Engine ---
+def test_compute_ic_lags_the_factor_before_scoring():
+    rng = np.random.default_rng(2)
+    dates = pd.date_range("2025-01-01", periods=40, freq="B")
+    prices = pd.DataFrame(100 * np.exp(rng.normal(0, 0.02, (40, 8)).cumsum(axis=0)), index=dates, columns=list("ABCDEFGH"))
+    # A factor equal to the next-day return, published one day early, is a perfect signal once lagged
+    factor = (prices.shift(-2) / prices.shift(-1) - 1)
+    result = compute_ic({"oracle": factor}, prices, horizons=(1,))
+
+    daily = result.daily.dropna(subset=["IC"])
+    assert daily["IC"].to_numpy() == pytest.approx(1.0)
+    assert daily["Rank IC"].to_numpy() == pytest.approx(1.0)
+    assert result.summary.loc[("oracle", 1), "IC Hit Rate"] == 1.0
+    assert result.decay("IC").loc["oracle", 1] == pytest.approx(1.0)
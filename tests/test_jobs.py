@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from dashboard.jobs import CANCELLED, DONE, FAILED, JobCancelled, JobRunner
+
+
+def wait(job):
+    for _ in range(500):
+        if job.finished:
+            return job
+        threading.Event().wait(0.01)
+    pytest.fail(f"job {job.key} did not finish")
+
+
+def test_identical_in_flight_jobs_are_shared():
+    runner = JobRunner(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def func(progress, cancelled):
+        calls.append(True)
+        release.wait(5)
+        return 42
+
+    first = runner.submit("key", func, watermark=1)
+    second = runner.submit("key", func, watermark=1)
+    assert second is first
+    release.set()
+    assert wait(first).result == 42
+    assert len(calls) == 1
+
+
+def test_finished_results_are_cached_per_watermark():
+    runner = JobRunner(max_workers=1)
+    calls = []
+
+    def func(progress, cancelled):
+        calls.append(True)
+        return len(calls)
+
+    wait(runner.submit("key", func, watermark=1))
+    cached = runner.submit("key", func, watermark=1)
+    assert cached.status == DONE and cached.result == 1 and cached.message == "Cached result"
+    assert wait(runner.submit("key", func, watermark=2)).result == 2
+    assert len(calls) == 2
+
+
+def test_progress_is_clamped_and_reported():
+    runner = JobRunner(max_workers=1)
+    reported, resume = threading.Event(), threading.Event()
+
+    def func(progress, cancelled):
+        progress(1.5, "Almost there")
+        reported.set()
+        resume.wait(5)
+
+    job = runner.submit("key", func)
+    reported.wait(5)
+    assert (job.status, job.progress, job.message) == ("running", 1.0, "Almost there")
+    resume.set()
+    assert wait(job).message == "Completed"
+    assert runner.get(job.id) is job
+
+
+def test_cancelled_job_stops_and_is_not_cached():
+    runner = JobRunner(max_workers=1)
+    started = threading.Event()
+
+    def func(progress, cancelled):
+        started.set()
+        while not cancelled():
+            threading.Event().wait(0.01)
+        raise JobCancelled()
+
+    job = runner.submit("key", func)
+    started.wait(5)
+    job.cancel()
+    assert wait(job).status == CANCELLED
+    # A cancelled job is not reused by the next submit
+    rerun = runner.submit("key", func)
+    assert rerun is not job
+    rerun.cancel()
+    assert wait(rerun).status == CANCELLED
+
+
+def test_failures_carry_the_exception_message():
+    runner = JobRunner(max_workers=1)
+
+    def func(progress, cancelled):
+        raise ValueError("no prices")
+
+    job = wait(runner.submit("key", func))
+    assert job.status == FAILED
+    assert job.message == "ValueError: no prices"
+    assert isinstance(job.error, ValueError)
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from dashboard import mirror
+
+
+@pytest.fixture(autouse=True)
+def mirror_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(mirror, "MIRROR_DIR", str(tmp_path))
+    return tmp_path
+
+
+def prices(rows):
+    return pd.DataFrame(rows, columns=["Ticker", "Date", "Close"])
+
+
+# --- Dedup ---
+def test_normalize_keeps_the_last_row_per_key():
+    df = prices([("AAPL", "2025-01-02", 1), ("AAPL", "2025-01-02", 2), ("MSFT", "2025-01-02", 3)])
+    normalized = mirror._normalize("stock_data", df)
+    assert normalized.set_index("Ticker")["Close"].to_dict() == {"AAPL": 2, "MSFT": 3}
+
+
+def test_normalize_drops_bad_dates_and_coerces_scores():
+    df = prices([("AAPL", "2025-01-02", "oops"), ("AAPL", "not a date", 1)])
+    normalized = mirror._normalize("stock_data", df)
+    assert len(normalized) == 1
+    assert normalized["Close"].isna().all()
+
+
+def test_holdings_keep_one_position_per_ticker_and_day():
+    df = pd.DataFrame(
+        [("AAPL", "2025-01-02", "Long"), ("AAPL", "2025-01-02", "Short"), ("AAPL", "2025-01-03", "Long")],
+        columns=["Ticker", "Date", "Position_Type"],
+    )
+    normalized = mirror._normalize("dailytrading", df)
+    assert normalized["Position_Type"].tolist() == ["Short", "Long"]
+
+
+# --- Write and read ---
+def test_replace_dataset_round_trips_with_pushed_down_filters():
+    mirror.replace_dataset("stock_data", prices([
+        ("AAPL", "2025-01-31", 1), ("AAPL", "2025-02-03", 2), ("MSFT", "2025-02-03", 3), ("MSFT", "2025-03-03", 4),
+    ]))
+    assert mirror.get_watermark("stock_data") == pd.Timestamp("2025-03-03")
+
+    df = mirror.read("stock_data", tickers=["MSFT"], start_date="2025-02-01", end_date="2025-02-28")
+    assert df["Close"].tolist() == [3]
+    df = mirror.read("stock_data", columns=["Ticker", "Close"], dates=["2025-02-03"])
+    assert sorted(df["Close"]) == [2, 3]
+
+
+def test_read_without_partitions_is_empty():
+    df = mirror.read("sentiment", columns=["Ticker", "Date"])
+    assert df.empty and list(df.columns) == ["Ticker", "Date"]
+
+
+def test_sync_merges_the_overlap_into_existing_partitions(monkeypatch):
+    mirror.replace_dataset("stock_data", prices([("AAPL", "2025-02-03", 1), ("AAPL", "2025-02-04", 2)]))
+    fetched = []
+
+    def fetch(dataset, since, use_store):
+        fetched.append(since)
+        return prices([("AAPL", "2025-02-04", 20), ("AAPL", "2025-02-05", 30)])
+
+    monkeypatch.setattr(mirror, "_fetch", fetch)
+    assert mirror.sync("stock_data") == 2
+    assert fetched == [pd.Timestamp("2025-02-04") - pd.Timedelta(days=mirror.SYNC_OVERLAP_DAYS)]
+    assert mirror.read("stock_data")["Close"].tolist() == [1, 20, 30]
+    assert mirror.get_watermark("stock_data") == pd.Timestamp("2025-02-05")
+
+
+def test_empty_mirror_is_synced_inline(monkeypatch):
+    monkeypatch.setattr(mirror, "MIRROR_MODE", "on")
+    monkeypatch.setattr(mirror, "_fetch", lambda dataset, since, use_store: prices([("AAPL", "2025-02-03", 1)]))
+    mirror.ensure_synced("stock_data")
+    assert mirror.read("stock_data")["Close"].tolist() == [1]
+
+
+def test_offline_mode_never_fetches(monkeypatch):
+    monkeypatch.setattr(mirror, "MIRROR_MODE", "offline")
+    monkeypatch.setattr(mirror, "_fetch", lambda *args: pytest.fail("fetched while offline"))
+    mirror.ensure_synced("stock_data")
+    assert mirror.read("stock_data").empty
@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+from dashboard.loaders import SENTIMENT_TABLES, _source_queries
+from dashboard.queries import FILTERS, select
+
+
+def test_values_are_bound_never_rendered():
+    query, params = select("datacollection.stock_data", ["Date", "Close"], tickers=["AAPL'; DROP TABLE x; --"], start_date=date(2025, 1, 2))
+    assert "AAPL" not in query and "2025" not in query
+    assert '"Ticker" = ANY(:tickers)' in query and '"Date" >= :start_date' in query
+    assert params == {"tickers": ["AAPL'; DROP TABLE x; --"], "start_date": date(2025, 1, 2)}
+
+
+def test_one_statement_text_per_shape():
+    first, _ = select("t", ["Date"], tickers=["A"], start_date="2025-01-01")
+    second, _ = select("t", ["Date"], start_date="2024-06-30", tickers=["B", "C"])
+    assert first is second
+    assert select("t", ["Date"], tickers=["A"])[0] is not first
+
+
+def test_none_filters_are_left_out():
+    query, params = select("t", ["Date"], tickers=None, end_date=None)
+    assert params == {}
+    assert "WHERE TRUE" in query
+
+
+def test_tuples_bind_as_lists():
+    assert select("t", ["Date"], tickers=("A", "B"))[1] == {"tickers": ["A", "B"]}
+
+
+def test_distinct_and_order_by():
+    query, _ = select("t", ["Date"], distinct=True, order_by=["Date"])
+    assert 'SELECT DISTINCT "Date"' in query and 'ORDER BY "Date"' in query
+
+
+def test_unknown_filters_are_rejected():
+    with pytest.raises(KeyError):
+        select("t", ["Date"], ticker="AAPL")
+
+
+def test_source_queries_compare_dates_as_dates():
+    queries = _source_queries(["Positive"], ["AAPL"], "2025/01/02", date(2025, 2, 1))
+    assert [query.split("FROM")[1].split()[0] for query, _ in queries] == list(SENTIMENT_TABLES)
+    query, params = queries[0]
+    assert FILTERS["source_start_date"] in query and FILTERS["source_end_date"] in query
+    assert params == {
+        "companies": ["AAPL", "$AAPL"],
+        "source_start_date": date(2025, 1, 2),
+        "source_end_date": date(2025, 2, 1),
+    }
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from dashboard import resampling
+
+
+@pytest.fixture
+def inline(monkeypatch):
+    monkeypatch.setattr(resampling, "RESAMPLE_WORKERS", 1)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def test_block_bootstrap_indices_are_contiguous_blocks(rng):
+    idx = resampling.block_bootstrap_indices(rng, length=23, n=50, block=5)
+    assert idx.shape == (50, 23)
+    assert idx.min() >= 0 and idx.max() < 23
+    # Every block of five runs over consecutive rows
+    assert (np.diff(idx[:, :20].reshape(50, 4, 5), axis=-1) == 1).all()
+
+
+def test_slope_test_brackets_the_true_slope(inline, rng):
+    x = rng.normal(size=300)
+    y = 2.0 * x + rng.normal(scale=0.5, size=300)
+    result = resampling.slope_test(x, y, n_resamples=400, seed=1)
+    assert result["ci_low"] < 2.0 < result["ci_high"]
+    assert result["p_value"] == pytest.approx(1 / 401)
+    assert result["n"] == 300
+
+
+def test_too_few_pairs_give_no_test(inline):
+    result = resampling.slope_test([1.0, np.nan, 2.0], [1.0, 2.0, np.nan])
+    assert result["n"] == 1 and np.isnan(result["p_value"])
+
+
+def test_mean_ic_test_detects_the_sign_of_the_mean(inline, rng):
+    result = resampling.mean_ic_test(0.05 + rng.normal(scale=0.01, size=250), n_resamples=400)
+    assert 0 < result["ci_low"] < result["estimate"] < result["ci_high"]
+    assert result["p_value"] == 0.0
+
+
+def test_ic_permutation_draws_uniformly_over_valid_cells():
+    # One date, three valid tickers compacted to the front and three invalid ones
+    x = np.array([[1.0, 2.0, 3.0, np.nan, np.nan, np.nan]])
+    valid = np.isfinite(x).astype(float)
+    data = np.stack([x, x, valid])
+    null = resampling._ic_permutation_task(data, 6000, np.random.SeedSequence(0))
+
+    # The six orderings of three values correlate at 1, 0.5, 0.5, -0.5, -0.5 and -1
+    values, counts = np.unique(np.round(null, 6), return_counts=True)
+    assert values.tolist() == [-1.0, -0.5, 0.5, 1.0]
+    np.testing.assert_allclose(counts / len(null), [1 / 6, 1 / 3, 1 / 3, 1 / 6], atol=0.02)
+
+
+def test_ic_permutation_test_separates_signal_from_noise(inline, rng):
+    returns = rng.normal(size=(60, 30))
+    returns[rng.random(returns.shape) < 0.1] = np.nan
+    signal = returns + rng.normal(scale=0.5, size=returns.shape)
+    noise = rng.normal(size=returns.shape)
+
+    strong = resampling.ic_permutation_test(signal, returns, n_resamples=200)
+    weak = resampling.ic_permutation_test(noise, returns, n_resamples=200)
+    assert strong["estimate"] > 0.5 and strong["p_value"] == pytest.approx(1 / 201)
+    assert weak["p_value"] > 0.05
+
+
+def test_pool_and_inline_runs_agree(monkeypatch, rng):
+    x = rng.normal(size=200)
+    y = x + rng.normal(size=200)
+    monkeypatch.setattr(resampling, "RESAMPLE_WORKERS", 2)
+    pooled = resampling.slope_test(x, y, n_resamples=600, seed=3)
+    monkeypatch.setattr(resampling, "RESAMPLE_WORKERS", 1)
+    assert resampling.slope_test(x, y, n_resamples=600, seed=3) == pooled
+
+
+def test_cached_test_computes_once_per_settings():
+    calls = []
+
+    def compute(n_resamples):
+        calls.append(n_resamples)
+        return {"p_value": 0.5}
+
+    key = ("slope", "Positive", "TEST", 30, object())
+    for _ in range(2):
+        resampling.cached_test(*key, compute, n_resamples=100)
+    resampling.cached_test(*key, compute, n_resamples=200)
+    assert calls == [100, 200]
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from datetime import date
+
+from dashboard import store
+
+
+class FakeEngine:
+    """Records executed statements; MAX("Date") answers `watermark`."""
+
+    def __init__(self, watermark=None):
+        self.watermark = watermark
+        self.statements = []
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    connect = begin
+
+    def execute(self, statement, params=None):
+        self.statements.append((" ".join(str(statement).split()), params))
+        return self
+
+    def scalar(self):
+        return self.watermark
+
+    rowcount = 0
+
+
+def _merge_params(engine):
+    return [params for statement, params in engine.statements if statement.startswith("INSERT INTO")]
+
+
+def test_merge_reads_every_source_with_its_priority():
+    sql = store._merge_sql()
+    for table, priority in store.SOURCE_PRIORITY.items():
+        assert f"FROM {table}" in sql
+        assert f"{priority} AS source_priority" in sql
+
+
+def test_merge_prefers_later_source_then_unprefixed_ticker():
+    sql = " ".join(store._merge_sql().split())
+    assert 'ORDER BY "Ticker", "Date", source_priority DESC, source_plain DESC, "Surprise" NULLS LAST' in sql
+    # The upsert keeps the stored row unless the new one ranks at least as high
+    assert "WHERE (EXCLUDED.source_priority, EXCLUDED.source_plain) >= (nlp.sentiment_consolidated.source_priority, nlp.sentiment_consolidated.source_plain)" in sql
+
+
+def test_incremental_refresh_remerges_the_overlap_before_the_watermark():
+    engine = FakeEngine(watermark=date(2025, 3, 10))
+    store.refresh_store(engine=engine)
+    assert _merge_params(engine) == [{"since": date(2025, 3, 8)}]
+    assert not any(statement.startswith("TRUNCATE") for statement, _ in engine.statements)
+
+
+def test_full_refresh_truncates_and_merges_everything():
+    engine = FakeEngine(watermark=date(2025, 3, 10))
+    store.refresh_store(full=True, engine=engine)
+    assert _merge_params(engine) == [{"since": date.min}]
+    assert any(statement.startswith("TRUNCATE") for statement, _ in engine.statements)